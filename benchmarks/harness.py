@@ -0,0 +1,207 @@
+# benchmarks/harness.py
+# ベンチマークの計測・結果の保存・ベースラインとの比較（model_bench などから使う）
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from datetime import datetime
+
+# 小さいほど良い項目（これ以外はスループットなど大きいほど良い項目）
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "mean_ms", "max_ms", "statements_per_call")
+METRICS = LOWER_IS_BETTER + ("ops_per_sec",)
+
+
+def percentile(sorted_samples, q):
+    """q（0〜1）分位の値（最近傍順位法、sorted_samples は昇順）"""
+    if not sorted_samples:
+        return 0.0
+    index = max(0, min(len(sorted_samples) - 1, int(q * len(sorted_samples) + 0.5) - 1))
+    return sorted_samples[index]
+
+
+def summarize(samples_ms, wall_seconds, errors=0):
+    """1ケース分のレイテンシ（ミリ秒）のリストから集計を作る"""
+    samples = sorted(samples_ms)
+    count = len(samples)
+    return {
+        'count': count,
+        'errors': errors,
+        'wall_seconds': round(wall_seconds, 3),
+        'ops_per_sec': round(count / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+        'mean_ms': round(sum(samples) / count, 3) if count else 0.0,
+        'p50_ms': round(percentile(samples, 0.50), 3),
+        'p95_ms': round(percentile(samples, 0.95), 3),
+        'p99_ms': round(percentile(samples, 0.99), 3),
+        'max_ms': round(samples[-1], 3) if count else 0.0,
+    }
+
+
+def warm_up(func, inputs):
+    """計測前に実行して接続プール・キャッシュ・プロセスプールを温める（結果は捨てる）"""
+    for args in inputs:
+        try:
+            func(*args)
+        except Exception:
+            pass
+
+
+def measure(func, inputs, concurrency=1):
+    """inputs の引数で func を1回ずつ呼び、レイテンシとスループットを集計する
+
+    concurrency > 1 のときは inputs をスレッドに振り分けて同時に実行する
+    （スループットは全体の経過時間で割る）。例外は数えるだけでレイテンシには含めない。
+    """
+    samples = []
+    errors = [0]
+    lock = threading.Lock()
+    first_error = []
+
+    def worker(chunk):
+        local = []
+        failed = 0
+        for args in chunk:
+            start = time.perf_counter()
+            try:
+                func(*args)
+            except Exception as e:
+                failed += 1
+                if not first_error:
+                    first_error.append(e)
+                continue
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            samples.extend(local)
+            errors[0] += failed
+
+    start = time.perf_counter()
+    if concurrency <= 1:
+        worker(inputs)
+    else:
+        threads = [
+            threading.Thread(target=worker, args=(inputs[i::concurrency],), daemon=True)
+            for i in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    wall_seconds = time.perf_counter() - start
+
+    summary = summarize(samples, wall_seconds, errors[0])
+    if first_error:
+        summary['first_error'] = f"{type(first_error[0]).__name__}: {first_error[0]}"
+    return summary
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def write_results(path, results):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def new_results(name, dataset, config):
+    return {
+        'benchmark': name,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'dataset': dataset,
+        'config': config,
+        'cases': {},
+    }
+
+
+def compare(current, baseline, metric="p50_ms", threshold=0.2):
+    """ベースラインと比べて metric が threshold（割合）を超えて悪化したケースを調べる
+
+    戻り値は (ケース名, ベースラインの値, 今回の値, 変化率, 状態) のリスト。
+    状態は "regression" / "improved" / "ok" / "new"（ベースラインにない）。
+    """
+    rows = []
+    lower_is_better = metric in LOWER_IS_BETTER
+    for name, case in current['cases'].items():
+        base_case = baseline.get('cases', {}).get(name)
+        value = case.get(metric)
+        if base_case is None or base_case.get(metric) is None or value is None:
+            rows.append((name, None, value, None, "new"))
+            continue
+        base = base_case[metric]
+        change = (value - base) / base if base else 0.0
+        worse = change if lower_is_better else -change
+        if worse > threshold:
+            status = "regression"
+        elif worse < -threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((name, base, value, change, status))
+    return rows
+
+
+def dataset_mismatch(current, baseline):
+    """データセットの大きさがベースラインと違う表（比較の参考にならない可能性がある）"""
+    base = baseline.get('dataset', {})
+    return {
+        table: (base.get(table), count)
+        for table, count in current.get('dataset', {}).items()
+        if base.get(table) != count
+    }
+
+
+def print_results(results):
+    print(f"{'case':<32} {'count':>6} {'ops/s':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} {'stmts':>6} {'err':>4}")
+    for name, case in results['cases'].items():
+        statements = case.get('statements_per_call')
+        statements = f"{statements:6.1f}" if statements is not None else f"{'-':>6}"
+        print(
+            f"{name:<32} {case['count']:6d} {case['ops_per_sec']:9.1f} {case['p50_ms']:9.2f} "
+            f"{case['p95_ms']:9.2f} {case['p99_ms']:9.2f} {case['max_ms']:9.2f} {statements} {case['errors']:4d}"
+        )
+        if case.get('first_error'):
+            print(f"    最初のエラー: {case['first_error']}")
+
+
+def print_comparison(rows, metric, threshold):
+    print(f"ベースラインとの比較（{metric}、しきい値 {threshold:.0%}）")
+    for name, base, value, change, status in rows:
+        if status == "new":
+            shown = f"{value:10.2f}" if value is not None else f"{'-':>10}"
+            print(f"  {name:<32} {'':>10} {shown}  (ベースラインなし)")
+            continue
+        mark = {"regression": "REGRESSION", "improved": "improved", "ok": "ok"}[status]
+        print(f"  {name:<32} {base:10.2f} {value:10.2f} {change:+8.1%}  {mark}")
+
+
+def check_baseline(results, baseline_path, metric, threshold):
+    """ベースラインと比較して結果を表示し、悪化したケースがあれば True を返す"""
+    try:
+        baseline = load_results(baseline_path)
+    except FileNotFoundError:
+        print(f"\n{baseline_path} がありません（--save-baseline で今回の結果を保存できます）")
+        return False
+
+    print()
+    mismatch = dataset_mismatch(results, baseline)
+    if mismatch:
+        details = ", ".join(f"{table} {base} -> {count}" for table, (base, count) in mismatch.items())
+        print(f"注意: データセットの大きさがベースラインと違います（{details}）", file=sys.stderr)
+    rows = compare(results, baseline, metric, threshold)
+    print_comparison(rows, metric, threshold)
+    return any(status == "regression" for *_, status in rows)
@@ -0,0 +1,277 @@
+# benchmarks/model_bench.py
+# 使い方: python -m benchmarks.model_bench [--generate --users 1000 --posts 10000] [--iterations 200]
+#         [--concurrency 1] [--baseline benchmarks/baselines/model_bench.json] [--threshold 0.2] [--save-baseline]
+# モデル層の主な処理を合成データ（utils.data_generator）に対して実行し、
+# スループットとレイテンシの分位点を測ってベースラインと比べる
+import argparse
+import logging
+import random
+import sys
+import threading
+
+from benchmarks import harness
+from config.database import DatabasePool
+from config.query_stats import QueryStats
+from models.comment import Comment
+from models.follow import Follow
+from models.like import Like
+from models.post import Post
+from models.timeline import Timeline
+from models.user import User
+from utils.data_generator import SocialGraphGenerator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT = "benchmarks/results/model_bench.json"
+DEFAULT_BASELINE = "benchmarks/baselines/model_bench.json"
+DATASET_TABLES = ("users", "follows", "posts", "post_hashtags", "likes", "comments")
+COMMENT_TEXT = "benchmark comment"
+
+
+class StatementCounter:
+    """計測中に実行したSQLの文の数を数える（QueryStats のリスナー）"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _on_query(self, key, elapsed_ms):
+        with self._lock:
+            self.count += 1
+
+    def __enter__(self):
+        QueryStats.get_instance().add_listener(self._on_query)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        QueryStats.get_instance().remove_listener(self._on_query)
+        return False
+
+
+class Workload:
+    """ベンチマークの入力（ユーザー・投稿・ハッシュタグ）をDBから seed に従って選ぶ
+
+    生成したユーザー（SocialGraphGenerator のユーザー名）だけを使うので、
+    認証のベンチマークにも GENERATOR_CONFIG のパスワードがそのまま使える。
+    """
+
+    def __init__(self, db, seed=0):
+        self.db = db
+        self.rng = random.Random(seed)
+        self.users = db.execute_query(
+            "SELECT user_id, username FROM users WHERE username LIKE %s ORDER BY user_id",
+            ("gen%",)
+        )
+        if not self.users:
+            raise RuntimeError("生成したユーザーがいません（--generate でデータを作成してください）")
+        bounds = db.fetch_one("SELECT MIN(post_id) AS min_id, MAX(post_id) AS max_id FROM posts")
+        self.min_post_id = bounds['min_id']
+        self.max_post_id = bounds['max_id']
+
+    def dataset(self):
+        """表ごとの行数（ベースラインとデータセットの大きさが同じか確かめるため結果に残す）"""
+        return {
+            table: self.db.fetch_one(f"SELECT COUNT(*) AS n FROM {table}")['n']
+            for table in DATASET_TABLES
+        }
+
+    def user_ids(self, n):
+        return [self.rng.choice(self.users)['user_id'] for _ in range(n)]
+
+    def usernames(self, n):
+        return [self.rng.choice(self.users)['username'] for _ in range(n)]
+
+    def post_ids(self, n):
+        """存在する投稿のIDを n 件（重複あり）"""
+        if self.min_post_id is None:
+            return []
+        found = []
+        while len(found) < n:
+            candidates = [self.rng.randint(self.min_post_id, self.max_post_id) for _ in range(n * 2)]
+            placeholders = ", ".join(["%s"] * len(candidates))
+            existing = {
+                row['post_id'] for row in self.db.execute_query(
+                    f"SELECT post_id FROM posts WHERE post_id IN ({placeholders})", tuple(candidates)
+                )
+            }
+            if not existing:
+                return found
+            found.extend(post_id for post_id in candidates if post_id in existing)
+        return found[:n]
+
+    def hashtags(self, n):
+        """ランダムな投稿に付いたハッシュタグ（よく使われるタグほど選ばれやすい）"""
+        post_ids = self.post_ids(n * 3)
+        if not post_ids:
+            return []
+        placeholders = ", ".join(["%s"] * len(post_ids))
+        tags = [row['tag_name'] for row in self.db.execute_query(f"""
+            SELECT h.tag_name
+            FROM post_hashtags ph
+            JOIN hashtags h ON h.hashtag_id = ph.hashtag_id
+            WHERE ph.post_id IN ({placeholders})
+            ORDER BY ph.post_id, h.tag_name
+        """, tuple(post_ids))]
+        return [self.rng.choice(tags) for _ in range(n)] if tags else []
+
+    def search_terms(self, n):
+        """ユーザー名の一部（3文字）"""
+        terms = []
+        for username in self.usernames(n):
+            start = self.rng.randint(0, max(len(username) - 3, 0))
+            terms.append(username[start:start + 3])
+        return terms
+
+
+def is_liked(db, user_id, post_id):
+    return db.fetch_one(
+        "SELECT 1 AS liked FROM likes WHERE user_id = %s AND post_id = %s", (user_id, post_id)
+    ) is not None
+
+
+def build_cases(workload, iterations, auth_iterations, concurrency=1):
+    """ケース名 -> (呼び出す関数, 引数のリスト, 後片付け) を作る"""
+    post = Post()
+    user = User()
+    follow = Follow()
+    like = Like()
+    comment = Comment()
+    password = SocialGraphGenerator.GENERATOR_CONFIG["password"]
+
+    # いいねは同じ組み合わせを2回ずつ切り替え、終わったときにデータが元に戻るようにする
+    # harness.measure は inputs[i::concurrency] でスレッドに振り分けるため、concurrency 個ずつの組を
+    # 2回続けて並べ、同じ組み合わせの2回の切り替えが同じスレッドで順に実行されるようにする
+    concurrency = max(concurrency, 1)
+    like_pairs = list(dict.fromkeys(zip(workload.user_ids(iterations // 2), workload.post_ids(iterations // 2))))
+    like_pairs = like_pairs[:len(like_pairs) - len(like_pairs) % concurrency]
+    like_inputs = []
+    for start in range(0, len(like_pairs), concurrency):
+        block = like_pairs[start:start + concurrency]
+        like_inputs.extend(block + block)
+    liked_before = {pair for pair in like_pairs if is_liked(workload.db, *pair)}
+
+    def restore_likes():
+        """いいねを計測前の状態に戻す（ウォームアップや失敗した呼び出しで切り替えが奇数回になった組み合わせ）"""
+        for pair in like_pairs:
+            if is_liked(workload.db, *pair) != (pair in liked_before):
+                like.toggle_like(*pair)
+
+    created_comments = []
+
+    def create_comment(user_id, post_id, content):
+        created_comments.append(comment.create_comment(user_id, post_id, content))
+
+    def delete_comments():
+        """ベンチマークで作ったコメントを消し、投稿のコメント数を戻す"""
+        def work(cursor):
+            for created in created_comments:
+                if not created:
+                    continue
+                cursor.execute("DELETE FROM comments WHERE comment_id = %s", (created['comment_id'],))
+                cursor.execute("""
+                    UPDATE posts SET comment_count = GREATEST(comment_count - 1, 0), updated_at = updated_at
+                    WHERE post_id = %s
+                """, (created['post_id'],))
+        workload.db.execute_in_transaction(work)
+        created_comments.clear()
+
+    return {
+        "post.get_timeline_posts": (
+            post.get_timeline_posts, [(i,) for i in workload.user_ids(iterations)], None),
+        "post.get_user_posts": (
+            post.get_user_posts, [(i,) for i in workload.user_ids(iterations)], None),
+        "post.search_posts_by_hashtag": (
+            post.search_posts_by_hashtag, [(t,) for t in workload.hashtags(iterations)], None),
+        "user.search_users": (
+            user.search_users, [(t,) for t in workload.search_terms(iterations)], None),
+        "follow.get_followers": (
+            follow.get_followers, [(i,) for i in workload.user_ids(iterations)], None),
+        "like.toggle_like": (
+            like.toggle_like, like_inputs, restore_likes),
+        "comment.create_comment": (
+            create_comment,
+            [(u, p, COMMENT_TEXT) for u, p in zip(workload.user_ids(iterations), workload.post_ids(iterations))],
+            delete_comments),
+        # bcrypt の検証が大半を占めるため回数を分ける
+        "user.authenticate": (
+            user.authenticate, [(name, password) for name in workload.usernames(auth_iterations)], None),
+    }
+
+
+def run_case(name, func, inputs, cleanup, warmup, concurrency):
+    logger.info(f"Running {name} ({len(inputs)} calls)")
+    try:
+        harness.warm_up(func, inputs[:warmup])
+        with StatementCounter() as counter:
+            summary = harness.measure(func, inputs, concurrency)
+    finally:
+        if cleanup:
+            cleanup()
+    if inputs:
+        summary['statements_per_call'] = round(counter.count / len(inputs), 2)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="モデル層のベンチマークを実行し、ベースラインと比べる")
+    parser.add_argument("--generate", action="store_true", help="先に合成データを作成する")
+    parser.add_argument("--users", type=int, default=1000, help="--generate で作成するユーザー数")
+    parser.add_argument("--posts", type=int, default=10000, help="--generate で作成する投稿数")
+    parser.add_argument("--seed", type=int, default=0, help="データと入力の乱数のシード")
+    parser.add_argument("--iterations", type=int, default=200, help="ケースごとの呼び出し回数")
+    parser.add_argument("--auth-iterations", type=int, default=20, help="user.authenticate の呼び出し回数")
+    parser.add_argument("--warmup", type=int, default=5, help="計測前に実行する回数")
+    parser.add_argument("--concurrency", type=int, default=1, help="同時に呼び出すスレッド数")
+    parser.add_argument("--cases", nargs="*", help="実行するケース（省略時はすべて）")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="結果を書き出すJSONファイル")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="比較するベースラインのJSONファイル")
+    parser.add_argument("--metric", choices=harness.METRICS, default="p50_ms", help="比較に使う項目")
+    parser.add_argument("--threshold", type=float, default=0.2, help="これを超えて悪化したら失敗にする割合")
+    parser.add_argument("--save-baseline", action="store_true", help="今回の結果をベースラインとして保存する")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = DatabasePool.get_instance()
+    try:
+        if args.generate:
+            SocialGraphGenerator(args.users, args.posts, seed=args.seed, db=db).run()
+
+        workload = Workload(db, seed=args.seed)
+        cases = build_cases(workload, args.iterations, args.auth_iterations, args.concurrency)
+        unknown = set(args.cases or ()) - set(cases)
+        if unknown:
+            parser.error(f"不明なケース: {', '.join(sorted(unknown))}（{', '.join(cases)}）")
+
+        results = harness.new_results("model_bench", workload.dataset(), {
+            'seed': args.seed,
+            'iterations': args.iterations,
+            'auth_iterations': args.auth_iterations,
+            'warmup': args.warmup,
+            'concurrency': args.concurrency,
+            'materialized_timeline': Timeline.is_enabled(),
+        })
+        for name, (func, inputs, cleanup) in cases.items():
+            if args.cases and name not in args.cases:
+                continue
+            if not inputs:
+                logger.warning(f"Skipping {name}: no input data")
+                continue
+            results['cases'][name] = run_case(name, func, inputs, cleanup, args.warmup, args.concurrency)
+    except KeyboardInterrupt:
+        sys.exit(1)
+
+    print()
+    harness.print_results(results)
+    harness.write_results(args.output, results)
+    print(f"\n結果: {args.output}")
+
+    if args.save_baseline:
+        harness.write_results(args.baseline, results)
+        print(f"ベースラインを保存しました: {args.baseline}")
+        return
+    if harness.check_baseline(results, args.baseline, args.metric, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,495 @@
+# benchmarks/ui_bench.py
+# 使い方: python -m benchmarks.ui_bench [--posts 1000] [--scroll 200] [--repeat 5] [--save-baseline]
+#         DISPLAY がなければ Xvfb を起動して実行する（xvfb-run -a python -m benchmarks.ui_bench でもよい）
+# 主な画面（TimelineView, ProfileView, SearchView, FollowListView）をDBなしのスタブデータで作成し、
+# 作成・最初の描画・スクロールの時間と、ウィジェット数・メモリを測る
+import argparse
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import time
+import tkinter as tk
+from contextlib import contextmanager
+from datetime import timedelta
+from types import SimpleNamespace
+
+from benchmarks import harness
+from models.follow import Follow
+from models.like import Like
+from models.post import Post
+from models.user import User
+from utils.data_generator import SocialGraphGenerator, zipf_cum_weights
+from utils.hashtag import extract_hashtags, normalize_hashtag
+from utils.post_text import clear_token_cache
+from utils.session import SessionManager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT = "benchmarks/results/ui_bench.json"
+DEFAULT_BASELINE = "benchmarks/baselines/ui_bench.json"
+WINDOW_SIZE = "1200x900"
+LOAD_TIMEOUT = 30            # データの反映を待つ最大時間（秒）
+SCROLL_UNITS = 3             # 1回のスクロール量（キャンバスの units）
+HIGHLIGHT_TEXT_TAGS = 40     # highlight_hashtags の計測に使う本文のハッシュタグ数
+
+
+class StubDataSource:
+    """ビューが使うモデルのメソッドを、メモリ上の合成データを返す関数に差し替える
+
+    データは SocialGraphGenerator と同じ分布（フォローは優先的選択、ハッシュタグは Zipf）で作り、
+    DBには接続しない。ビューは返された辞書を書き換えるため、毎回コピーを返す。
+    """
+
+    def __init__(self, users=500, posts=1000, seed=0):
+        # 生成器はメモリ上の部分（フォロー関係と本文）だけを使う
+        generator = SocialGraphGenerator(users, posts, seed=seed, db=self)
+        generator.user_offset = 0
+        generator.tags = generator.tag_vocabulary()
+        generator.tag_weights = zipf_cum_weights(len(generator.tags), generator.config["hashtag_exponent"])
+        followers, following = generator.generate_follow_graph()
+        rng = generator.rng
+
+        self.tags = generator.tags
+        self.users = [
+            {
+                'user_id': i + 1, 'username': f"gen{seed}_0_{i}", 'email': f"gen{seed}_0_{i}@example.com",
+                'profile_image_path': None, 'is_active': True, 'is_email_verified': True,
+                'created_at': generator.now, 'updated_at': generator.now,
+                'follower_count': followers[i], 'following_count': len(following[i]),
+            }
+            for i in range(users)
+        ]
+        self.users_by_name = {user['username']: user for user in self.users}
+        self.following = {i + 1: [target + 1 for target in targets] for i, targets in enumerate(following)}
+        self.followers = {user['user_id']: [] for user in self.users}
+        for follower_id, targets in self.following.items():
+            for target in targets:
+                self.followers[target].append(follower_id)
+
+        # 新しい順に並べた投稿
+        self.posts = []
+        self.posts_by_user = {user['user_id']: [] for user in self.users}
+        self.posts_by_tag = {}
+        span = generator.config["days"] * 86400
+        for i in range(posts):
+            author = self.users[int(rng.random() * users)]
+            created_at = generator.now - timedelta(seconds=span * (i + rng.random()) / posts)
+            post = {
+                'post_id': posts - i, 'user_id': author['user_id'], 'author_id': author['user_id'],
+                'username': author['username'], 'content': generator.content(),
+                'created_at': created_at, 'updated_at': created_at,
+                'like_count': generator.heavy_tail(generator.config["avg_likes"]),
+                'comment_count': generator.heavy_tail(generator.config["avg_comments"]),
+            }
+            self.posts.append(post)
+            self.posts_by_user[author['user_id']].append(post)
+            for tag in extract_hashtags(post['content']):
+                self.posts_by_tag.setdefault(tag, []).append(post)
+        self._timelines = {}
+
+    # ---- モデルの代わりのメソッド ----
+
+    def timeline(self, user_id):
+        if user_id not in self._timelines:
+            authors = set(self.following.get(user_id, ())) | {user_id}
+            self._timelines[user_id] = [post for post in self.posts if post['user_id'] in authors]
+        return self._timelines[user_id]
+
+    def timeline_page(self, user_id, cursor=None, limit=20):
+        """タイムラインの1ページ（カーソルは先頭からの位置）"""
+        start = int(cursor) if cursor else 0
+        posts = self.timeline(user_id)
+        page = [dict(post) for post in posts[start:start + limit]]
+        next_cursor = str(start + limit) if start + limit < len(posts) else None
+        return {'posts': page, 'next_cursor': next_cursor}
+
+    def user_posts(self, user_id):
+        return [dict(post) for post in self.posts_by_user.get(user_id, ())]
+
+    def hashtag_posts(self, hashtag):
+        return [dict(post) for post in self.posts_by_tag.get(normalize_hashtag(hashtag), ())]
+
+    def get_user(self, user_id):
+        return dict(self.users[user_id - 1]) if 0 < user_id <= len(self.users) else None
+
+    def get_user_by_username(self, username):
+        user = self.users_by_name.get(username)
+        return dict(user) if user else None
+
+    def search_users(self, query):
+        return [
+            {'user_id': user['user_id'], 'username': user['username']}
+            for user in self.users if query in user['username']
+        ]
+
+    def user_list(self, user_ids):
+        users = [self.users[user_id - 1] for user_id in user_ids]
+        return sorted(({'user_id': u['user_id'], 'username': u['username']} for u in users),
+                      key=lambda u: u['username'])
+
+    @staticmethod
+    def mark_liked(user_id, posts):
+        for post in posts:
+            post['liked'] = (post['post_id'] + user_id) % 5 == 0
+        return posts
+
+    def most_following_user(self):
+        return max(self.users, key=lambda user: user['following_count'])
+
+    def most_posting_user(self):
+        return max(self.users, key=lambda user: len(self.posts_by_user[user['user_id']]))
+
+    def most_followed_user(self):
+        return max(self.users, key=lambda user: user['follower_count'])
+
+    def patches(self):
+        """(クラス, メソッド名, 差し替える関数) の一覧"""
+        return [
+            (Post, 'get_timeline_page', lambda model, user_id, cursor=None, limit=20:
+                self.timeline_page(user_id, cursor, limit)),
+            (Post, 'get_user_posts', lambda model, user_id: self.user_posts(user_id)),
+            (Post, 'search_posts_by_hashtag', lambda model, hashtag: self.hashtag_posts(hashtag)),
+            (Like, 'mark_liked', lambda model, user_id, posts: self.mark_liked(user_id, posts)),
+            (User, 'get_user', lambda model, user_id: self.get_user(user_id)),
+            (User, 'get_user_by_username', lambda model, username: self.get_user_by_username(username)),
+            (User, 'search_users', lambda model, query: self.search_users(query)),
+            (Follow, 'get_following', lambda model, user_id: self.user_list(self.following.get(user_id, ()))),
+            (Follow, 'get_followers', lambda model, user_id: self.user_list(self.followers.get(user_id, ()))),
+            (Follow, 'get_following_count', lambda model, user_id: len(self.following.get(user_id, ()))),
+            (Follow, 'get_follower_count', lambda model, user_id: len(self.followers.get(user_id, ()))),
+            (Follow, 'is_following', lambda model, follower_id, followed_id:
+                followed_id in self.following.get(follower_id, ())),
+        ]
+
+    @contextmanager
+    def installed(self):
+        """モデルのメソッドを差し替え、終わったら元に戻す"""
+        originals = []
+        try:
+            for cls, name, func in self.patches():
+                originals.append((cls, name, cls.__dict__[name]))
+                setattr(cls, name, func)
+            yield self
+        finally:
+            for cls, name, original in reversed(originals):
+                setattr(cls, name, original)
+
+
+# ---- 画面の作成と計測 ----
+
+def start_virtual_display():
+    """DISPLAY がなければ Xvfb を空いている番号で起動する（起動したプロセスを返す）"""
+    if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        raise RuntimeError("DISPLAY が設定されておらず Xvfb も見つかりません（apt install xvfb）")
+    for number in range(99, 199):
+        if os.path.exists(f"/tmp/.X{number}-lock"):
+            continue
+        process = subprocess.Popen(
+            [xvfb, f":{number}", "-screen", "0", "1920x1080x24", "-nolisten", "tcp"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and process.poll() is None:
+            if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+                os.environ["DISPLAY"] = f":{number}"
+                return process
+            time.sleep(0.05)
+        process.kill()
+    raise RuntimeError("Xvfb を起動できませんでした")
+
+
+def rss_bytes():
+    """プロセスの常駐メモリ（Tk のウィジェットは Python の外で確保されるため RSS で測る）"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def find_canvases(widget):
+    if isinstance(widget, tk.Canvas):
+        return [widget]
+    return [canvas for child in widget.winfo_children() for canvas in find_canvases(child)]
+
+
+def pump(root, done, timeout=LOAD_TIMEOUT):
+    """done() が真になるまでイベントを処理する（BackgroundLoader の結果の反映を待つ）"""
+    deadline = time.perf_counter() + timeout
+    while not done():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("画面へのデータの反映が時間内に終わりませんでした")
+        root.update()
+        time.sleep(0.001)
+
+
+class ViewScenario:
+    """1つの画面の作り方と、読み込み完了・スクロール対象の判定"""
+
+    name = None
+
+    def __init__(self, data, session, app):
+        self.data = data
+        self.session = session
+        self.app = app
+
+    def create(self, root):
+        raise NotImplementedError
+
+    def start(self, view):
+        """作成後の操作（検索の実行など）"""
+
+    def is_loaded(self, view):
+        return bool(view.post_list is not None and view.post_list.items)
+
+    def scroll_canvas(self, view):
+        return view.post_list.canvas
+
+    def load_more(self, view):
+        """次のページを読み込み始めたら True"""
+        return False
+
+    def rows(self, view):
+        """(作成済みの行ウィジェット数, 表示中の行番号)"""
+        post_list = view.post_list
+        return len(post_list._visible) + len(post_list._pool), set(post_list._visible)
+
+
+class TimelineScenario(ViewScenario):
+    name = "TimelineView"
+
+    def create(self, root):
+        from views.timeline_view import TimelineView
+        return TimelineView(root, self.session, self.app)
+
+    def load_more(self, view):
+        if not view.next_cursor:
+            return False
+        view.load_more_posts()
+        return True
+
+
+class ProfileScenario(ViewScenario):
+    name = "ProfileView"
+
+    def create(self, root):
+        # 投稿の最も多いユーザーのプロフィール（ユーザー情報の読み込みから行う）
+        from views.profile_view import ProfileView
+        return ProfileView(root, self.session, self.app, user_id=self.data.most_posting_user()['user_id'])
+
+
+class SearchScenario(ViewScenario):
+    name = "SearchView"
+
+    def create(self, root):
+        from views.search_view import SearchView
+        return SearchView(root, self.session, self.app)
+
+    def start(self, view):
+        # 最もよく使われるハッシュタグで検索（結果が最も多い）
+        view.search_type.set("hashtag")
+        view.search_entry.insert(0, f"#{self.data.tags[0]}")
+        view.search()
+
+
+class FollowListScenario(ViewScenario):
+    name = "FollowListView"
+
+    def create(self, root):
+        from views.follow_list_view import FollowListView
+        return FollowListView(root, self.session, self.app, self.data.most_followed_user()['user_id'])
+
+    def is_loaded(self, view):
+        return view.followers_list is not None
+
+    def scroll_canvas(self, view):
+        view.tab_control.select(1)  # フォロワータブ
+        tab = view.tab_control.nametowidget(view.tab_control.select())
+        self.canvas = find_canvases(tab)[0]
+        return self.canvas
+
+    def rows(self, view):
+        # 一覧は仮想化されておらず、読み込んだ時点ですべての行を作成している
+        count = len(view.following_list) + len(view.followers_list)
+        total = len(view.followers_list)
+        top, bottom = self.canvas.yview()
+        return count, set(range(int(top * total), min(int(bottom * total) + 1, total)))
+
+
+SCENARIOS = (TimelineScenario, ProfileScenario, SearchScenario, FollowListScenario)
+
+
+def scroll_through(root, scenario, view, target_posts):
+    """target_posts 件分の投稿が表示されるまでスクロールし、1回ごとの描画時間を返す"""
+    canvas = scenario.scroll_canvas(view)
+    root.update_idletasks()
+    samples = []
+    seen = set(scenario.rows(view)[1])
+    while len(seen) < target_posts:
+        start = time.perf_counter()
+        canvas.yview_scroll(SCROLL_UNITS, "units")
+        root.update_idletasks()
+        samples.append((time.perf_counter() - start) * 1000)
+        seen |= scenario.rows(view)[1]
+        if canvas.yview()[1] >= 1.0:
+            count = len(view.post_list.items) if hasattr(view, 'post_list') else 0
+            if not scenario.load_more(view):
+                break
+            pump(root, lambda: len(view.post_list.items) > count)
+    return samples, len(seen)
+
+
+def time_highlight(view, repeat=50):
+    """投稿フォームのハッシュタグの強調表示にかかる時間"""
+    words = " ".join(f"#タグ{i} テキスト" for i in range(HIGHLIGHT_TEXT_TAGS))
+    view.post_text.insert("1.0", words)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        view.highlight_hashtags(None)
+        samples.append((time.perf_counter() - start) * 1000)
+    view.post_text.delete("1.0", tk.END)
+    return samples
+
+
+def run_scenario(root, scenario, repeat, warmup, target_posts):
+    """画面を repeat 回作り直して計測する（最初の warmup 回は集計しない）"""
+    samples = {"construct": [], "first_paint": [], "scroll_step": [], "highlight_hashtags": []}
+    details = {}
+    for iteration in range(warmup + repeat):
+        measured = iteration >= warmup
+        clear_token_cache()  # 本文の分割結果のキャッシュも含めて毎回作り直す
+        rss_before = rss_bytes()
+
+        start = time.perf_counter()
+        view = scenario.create(root)
+        construct_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        scenario.start(view)
+        pump(root, lambda: scenario.is_loaded(view))
+        root.update_idletasks()
+        first_paint_ms = (time.perf_counter() - start) * 1000
+        widgets_after_paint = count_widgets(root)
+
+        scroll_samples, rendered = scroll_through(root, scenario, view, target_posts)
+        rows_created, _ = scenario.rows(view)
+        rss_after = rss_bytes()
+
+        if measured:
+            samples["construct"].append(construct_ms)
+            samples["first_paint"].append(first_paint_ms)
+            samples["scroll_step"].extend(scroll_samples)
+            if hasattr(view, "highlight_hashtags"):
+                samples["highlight_hashtags"].extend(time_highlight(view))
+            rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+            details = {
+                'widgets_after_paint': widgets_after_paint,
+                'widgets_after_scroll': count_widgets(root),
+                'rows_created': rows_created,
+                'posts_rendered': rendered,
+                'scroll_steps': len(scroll_samples),
+                'rss_delta_kb': round(rss_delta / 1024, 1) if rss_delta is not None else None,
+                'rss_kb_per_rendered_post': (
+                    round(rss_delta / 1024 / rendered, 2) if rss_delta is not None and rendered else None
+                ),
+            }
+
+        for widget in root.winfo_children():
+            widget.destroy()
+        root.update()
+
+    cases = {
+        f"{scenario.name}.{phase}": harness.summarize(values, sum(values) / 1000)
+        for phase, values in samples.items() if values
+    }
+    return cases, details
+
+
+def print_views(views):
+    print(f"{'view':<16} {'widgets':>8} {'after scroll':>13} {'rows':>6} {'posts':>6} {'RSS KB':>9} {'KB/post':>8}")
+    for name, v in views.items():
+        per_post = f"{v['rss_kb_per_rendered_post']:8.2f}" if v['rss_kb_per_rendered_post'] is not None else f"{'-':>8}"
+        rss = f"{v['rss_delta_kb']:9.1f}" if v['rss_delta_kb'] is not None else f"{'-':>9}"
+        print(
+            f"{name:<16} {v['widgets_after_paint']:8d} {v['widgets_after_scroll']:13d} "
+            f"{v['rows_created']:6d} {v['posts_rendered']:6d} {rss} {per_post}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tk の画面の作成・描画・スクロールの時間を測る（DBなし）")
+    parser.add_argument("--users", type=int, default=500, help="スタブデータのユーザー数")
+    parser.add_argument("--posts", type=int, default=2000, help="スタブデータの投稿数")
+    parser.add_argument("--seed", type=int, default=0, help="スタブデータの乱数のシード")
+    parser.add_argument("--scroll", type=int, default=200, help="スクロールして表示する投稿数")
+    parser.add_argument("--repeat", type=int, default=5, help="画面ごとの計測回数")
+    parser.add_argument("--warmup", type=int, default=1, help="計測前に作り直す回数")
+    parser.add_argument("--views", nargs="*", choices=[s.name for s in SCENARIOS], help="計測する画面")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="結果を書き出すJSONファイル")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="比較するベースラインのJSONファイル")
+    parser.add_argument("--metric", choices=harness.METRICS, default="p50_ms", help="比較に使う項目")
+    parser.add_argument("--threshold", type=float, default=0.2, help="これを超えて悪化したら失敗にする割合")
+    parser.add_argument("--save-baseline", action="store_true", help="今回の結果をベースラインとして保存する")
+    args = parser.parse_args()
+
+    # ビューの import 時の設定より後に呼ぶため、ここでまとめて抑える（メール設定の警告など）
+    logging.disable(logging.ERROR)
+
+    display = start_virtual_display()
+    try:
+        data = StubDataSource(args.users, args.posts, seed=args.seed)
+        session = SessionManager()
+        session.login(data.most_following_user())
+        app = SimpleNamespace(show_login=lambda: None, show_timeline=lambda: None)
+
+        root = tk.Tk()
+        root.geometry(WINDOW_SIZE)
+        results = harness.new_results(
+            "ui_bench",
+            {'users': args.users, 'posts': args.posts},
+            {'seed': args.seed, 'scroll': args.scroll, 'repeat': args.repeat, 'warmup': args.warmup,
+             'window': WINDOW_SIZE, 'tk': tk.TkVersion}
+        )
+        results['views'] = {}
+        with data.installed():
+            for scenario_class in SCENARIOS:
+                if args.views and scenario_class.name not in args.views:
+                    continue
+                scenario = scenario_class(data, session, app)
+                cases, details = run_scenario(root, scenario, args.repeat, args.warmup, args.scroll)
+                results['cases'].update(cases)
+                results['views'][scenario.name] = details
+        root.destroy()
+    except KeyboardInterrupt:
+        sys.exit(1)
+    finally:
+        if display is not None:
+            display.terminate()
+
+    print()
+    harness.print_results(results)
+    print()
+    print_views(results['views'])
+    harness.write_results(args.output, results)
+    print(f"\n結果: {args.output}")
+
+    if args.save_baseline:
+        harness.write_results(args.baseline, results)
+        print(f"ベースラインを保存しました: {args.baseline}")
+        return
+    if harness.check_baseline(results, args.baseline, args.metric, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
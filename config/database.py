@@ -1,106 +1,452 @@
 import pymysql
 import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
 
+from config.dialect import get_dialect
+from config.query_stats import QueryStats, TimedDictCursor
+
 logging.basicConfig(
     filename='database.log',
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+
+class PoolTimeoutError(Exception):
+    """接続プールから制限時間内に接続を取得できなかった"""
+
+
+class PooledConnection:
+    """プールから貸し出した接続のラッパー（close()でプールに返却する）"""
+
+    def __init__(self, pool, raw, acquire_ms=0.0):
+        self._pool = pool
+        self._raw = raw
+        self._released = False
+        self.acquire_ms = acquire_ms  # プールから取得するまでにかかった時間
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        """接続を閉じずにプールへ返却"""
+        if not self._released:
+            self._released = True
+            self._pool._release(self._raw)
+
+    def discard(self):
+        """壊れた接続をプールに戻さず破棄"""
+        if not self._released:
+            self._released = True
+            self._pool._discard(self._raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
 class DatabasePool:
     _instance = None
-    _pool = None
-    
+    _instance_lock = threading.Lock()
+
+    # 接続するデータベース: "mysql"（既定）または組み込みの "sqlite"（config.dialect）
+    BACKEND = os.getenv('DB_BACKEND', 'mysql')
+
     DB_CONFIG = {
         "host": "localhost",
         "user": "root",
         "password": "morijyobi",
         "database": "sns_app",
         "charset": "utf8mb4",
-        "cursorclass": pymysql.cursors.DictCursor  # ここでDictCursorを指定
+        "cursorclass": TimedDictCursor  # DictCursor に処理時間の記録（config.query_stats）を加えたもの
+    }
+
+    SQLITE_CONFIG = {
+        "path": os.getenv('SQLITE_PATH', 'sns_app.db'),  # ":memory:" ならプロセス内のメモリ上
+        # データベースが空のときに実行するスキーマ（カレントディレクトリではなくリポジトリ直下のもの）
+        "schema_file": os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sns_app_sqlite.sql"),
+        "busy_timeout": 10,                                # 書き込みロックの空きを待つ最大時間（秒）
+        "cache_size_kb": int(os.getenv('SQLITE_CACHE_SIZE_KB', 65536)),  # 接続ごとのページキャッシュ
+    }
+
+    POOL_CONFIG = {
+        "min_size": 2,            # アイドル状態でも保持しておく接続数
+        "max_size": 10,           # 同時に開ける接続の上限
+        "max_idle_time": 300,     # これ以上アイドルな接続は閉じる（秒）
+        "ping_after_idle": 30,    # これ以上アイドルな接続は貸し出し前にping（秒）
+        "checkout_timeout": 10,   # 接続の空きを待つ最大時間（秒）
     }
-    
+
+    # execute_many で max_allowed_packet から差し引く余裕（パケットヘッダなど）
+    PACKET_MARGIN = 1024
+
+    def __init__(self, pool_config=None, backend=None):
+        self.pool_config = dict(self.POOL_CONFIG, **(pool_config or {}))
+        self.dialect = get_dialect(backend or self.BACKEND)
+        self._idle = deque()  # (接続, 返却時刻) 右端が最新
+        self._size = 0        # 開いている接続の総数（アイドル + 貸し出し中）
+        self._closed = False
+        self._cond = threading.Condition()
+        self._max_statement_length = None  # execute_many で1文に詰められるバイト数
+
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
-            cls._instance = cls()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
         return cls._instance
-    
-    def create_connection(self):
-        """新しい接続を作成"""
+
+    def _connect(self):
+        """新しい物理接続を作成"""
         try:
-            connection = pymysql.connect(**self.DB_CONFIG)
-            connection.autocommit(False)  # 自動コミットを無効化
-            return connection
+            return self.dialect.connect(self)
         except Exception as e:
             logging.error(f"Error creating database connection: {e}")
             raise
-    
+
+    def create_connection(self, timeout=None):
+        """プールから接続を取得（close()でプールに返却される）"""
+        start = time.perf_counter()
+        raw = self._acquire(timeout)
+        acquire_ms = (time.perf_counter() - start) * 1000
+        QueryStats.get_instance().record_acquire(acquire_ms)
+        return PooledConnection(self, raw, acquire_ms)
+
+    @contextmanager
+    def get_connection(self, timeout=None):
+        """プールの接続を貸し出すコンテキストマネージャ"""
+        connection = self.create_connection(timeout)
+        try:
+            yield connection
+        except self.dialect.disconnect_errors:
+            # サーバー切断などで使えなくなった接続はプールに戻さない
+            connection.discard()
+            raise
+        finally:
+            connection.close()
+
+    def _acquire(self, timeout=None):
+        """アイドル接続の再利用、空きがあれば新規作成、なければ返却を待つ"""
+        if timeout is None:
+            timeout = self.pool_config["checkout_timeout"]
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeoutError("接続プールは終了しています")
+                stale = self._evict_idle_locked()
+                if self._idle:
+                    raw, last_used = self._idle.pop()
+                    break
+                if self._size < self.pool_config["max_size"]:
+                    self._size += 1
+                    raw, last_used = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logging.error(f"Connection pool exhausted (max_size={self.pool_config['max_size']})")
+                    raise PoolTimeoutError(
+                        f"{timeout}秒以内にデータベース接続を取得できませんでした"
+                    )
+                self._cond.wait(remaining)
+
+        self._close_quietly(stale)
+
+        if raw is None:
+            try:
+                return self._connect()
+            except Exception:
+                self._forget_slot()
+                raise
+
+        # 長くアイドルだった接続は貸し出し前に生存確認（切れていれば再接続）
+        if time.monotonic() - last_used > self.pool_config["ping_after_idle"]:
+            try:
+                raw.ping(reconnect=True)
+            except Exception as e:
+                logging.warning(f"Pooled connection failed liveness check, reconnecting: {e}")
+                self._close_quietly([raw])
+                try:
+                    return self._connect()
+                except Exception:
+                    self._forget_slot()
+                    raise
+        return raw
+
+    def _evict_idle_locked(self):
+        """min_sizeを超える分の古いアイドル接続を取り除く（ロック保持中に呼ぶ）"""
+        stale = []
+        now = time.monotonic()
+        max_idle = self.pool_config["max_idle_time"]
+        while (self._idle
+               and self._size > self.pool_config["min_size"]
+               and now - self._idle[0][1] > max_idle):
+            raw, _ = self._idle.popleft()
+            self._size -= 1
+            stale.append(raw)
+        return stale
+
+    def _release(self, raw):
+        """接続をプールに返却（未確定のトランザクションは破棄）"""
+        try:
+            raw.rollback()
+        except Exception as e:
+            logging.warning(f"Discarding connection that failed to reset: {e}")
+            self._discard(raw)
+            return
+        with self._cond:
+            if not self._closed:
+                self._idle.append((raw, time.monotonic()))
+                self._cond.notify()
+                return
+            self._size -= 1
+        self._close_quietly([raw])
+
+    def _discard(self, raw):
+        """接続を閉じてプールの枠を空ける"""
+        self._close_quietly([raw])
+        self._forget_slot()
+
+    def _forget_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _close_quietly(connections):
+        for raw in connections:
+            try:
+                raw.close()
+            except Exception:
+                pass
+
+    def close_all(self):
+        """アイドル接続をすべて閉じ、以降の貸し出しを停止"""
+        with self._cond:
+            self._closed = True
+            stale = [raw for raw, _ in self._idle]
+            self._size -= len(stale)
+            self._idle.clear()
+            self._cond.notify_all()
+        self._close_quietly(stale)
+
+    def stats(self):
+        """プールの状態を取得"""
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.pool_config["max_size"],
+            }
+
     def execute_transaction(self, queries_and_params):
         """トランザクションで複数のクエリを実行"""
-        connection = None
-        try:
-            connection = self.create_connection()
-            with connection.cursor() as cursor:
-                for query, params in queries_and_params:
-                    cursor.execute(query, params or ())
+        with self.get_connection() as connection:
+            try:
+                self.dialect.begin_write(connection)
+                with connection.cursor() as cursor:
+                    for query, params in queries_and_params:
+                        cursor.execute(query, params or ())
+                    connection.commit()
+                    return cursor.lastrowid
+            except Exception as e:
+                connection.rollback()
+                logging.error(f"Transaction execution error: {e}")
+                raise
+
+    def execute_in_transaction(self, work):
+        """work(cursor) を1つのトランザクション内で実行し、その戻り値を返す"""
+        with self.get_connection() as connection:
+            try:
+                self.dialect.begin_write(connection)
+                with connection.cursor() as cursor:
+                    result = work(cursor)
                 connection.commit()
-                return cursor.lastrowid
-        except Exception as e:
-            if connection:
+                return result
+            except Exception as e:
                 connection.rollback()
-            logging.error(f"Transaction execution error: {e}")
-            raise
-        finally:
-            if connection:
-                connection.close()
+                logging.error(f"Transaction execution error: {e}")
+                raise
 
     def execute_query(self, query, params=None):
         """SELECT クエリの実行"""
-        connection = None
+        with self.get_connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, params or ())
+                    start = time.perf_counter()
+                    result = cursor.fetchall()
+                    QueryStats.get_instance().record_phases(
+                        cursor.last_fingerprint,
+                        acquire_ms=connection.acquire_ms,
+                        fetch_ms=(time.perf_counter() - start) * 1000
+                    )
+                    return result
+            except Exception as e:
+                logging.error(f"Query execution error: {e}")
+                logging.error(f"Query: {query}")
+                logging.error(f"Params: {params}")
+                raise
+
+    def execute_many(self, query, seq_of_params, cursor=None):
+        """同じ文を複数のパラメータで実行する（一括登録用）
+
+        INSERT ... VALUES (%s, ...) は複数行の INSERT 1文にまとめ、サーバーの
+        max_allowed_packet を超えないよう分割して実行する。それ以外の文は1件ずつ実行する。
+        SQLite では sqlite3 の executemany でまとめて1文として実行する（SQLiteDialect.execute_many）。
+        cursor を渡すと呼び出し側のトランザクション内で実行し、省略すると
+        全体を1つのトランザクションで実行する。
+
+        戻り値は {'rowcount': 影響を受けた行数, 'first_id': 最初の AUTO_INCREMENT 値,
+        'last_id': 最後の AUTO_INCREMENT 値, 'statements': 実行した文の数}。
+        ID は AUTO_INCREMENT のない表や INSERT 以外では None。
+        ON DUPLICATE KEY UPDATE 付きの場合、last_id は求められないため None になる。
+        """
+        if cursor is None:
+            return self.execute_in_transaction(
+                lambda cursor: self.execute_many(query, seq_of_params, cursor=cursor)
+            )
+
+        if self.dialect.native_executemany:
+            return self.dialect.execute_many(cursor, query, seq_of_params)
+
+        result = {'rowcount': 0, 'first_id': None, 'last_id': None, 'statements': 0}
+        match = pymysql.cursors.RE_INSERT_VALUES.match(query)
+        if match is None:
+            for params in seq_of_params:
+                result['rowcount'] += cursor.execute(query, params)
+                result['statements'] += 1
+            return result
+
+        prefix = match.group(1) % ()
+        values = match.group(2).rstrip()
+        postfix = match.group(3) or ""
+        encoding = cursor.connection.encoding
+        limit = self._get_max_statement_length(cursor)
+        base_length = len((prefix + postfix).encode(encoding))
+
+        def flush(rows):
+            affected = cursor.execute(prefix + ",".join(rows) + postfix)
+            result['rowcount'] += affected
+            result['statements'] += 1
+            # 複数行の INSERT では lastrowid はその文で最初に採番された値
+            if cursor.lastrowid and affected:
+                if result['first_id'] is None:
+                    result['first_id'] = cursor.lastrowid
+                if not postfix.strip():
+                    result['last_id'] = cursor.lastrowid + affected - 1
+
+        rows = []
+        length = base_length
+        for params in seq_of_params:
+            row = cursor.mogrify(values, params)
+            row_length = len(row.encode(encoding)) + 1  # 区切りのカンマ分
+            if rows and length + row_length > limit:
+                flush(rows)
+                rows = []
+                length = base_length
+            rows.append(row)
+            length += row_length
+        if rows:
+            flush(rows)
+        return result
+
+    def _get_max_statement_length(self, cursor):
+        """1文に使えるバイト数（サーバーの max_allowed_packet から求め、以降は使い回す）"""
+        if self._max_statement_length is None:
+            max_allowed_packet = self.dialect.max_statement_length(cursor)
+            self._max_statement_length = max(max_allowed_packet - self.PACKET_MARGIN, 1024)
+        return self._max_statement_length
+
+    def iter_query(self, query, params=None, batch_size=1000, chunks=False):
+        """SELECT の結果をサーバー側カーソルで少しずつ読み込むジェネレータ
+
+        execute_query と違い結果をすべてメモリに載せないため、エクスポートや
+        バックフィルなど行数の多い読み込みに使う。batch_size 行ずつ取得し、
+        chunks=True ならその行のリストを、False なら1行ずつ返す。
+        読み終わるまで接続を1つ占有するので、途中でやめる場合は
+        contextlib.closing で囲むか close() を呼ぶ（接続は破棄される）。
+        """
+        connection = self.create_connection()
+        cursor = None
+        finished = False
+        fetch_ms = 0.0
+        row_count = 0
         try:
-            connection = self.create_connection()
-            with connection.cursor() as cursor:
-                cursor.execute(query, params or ())
-                result = cursor.fetchall()
-                return result
+            # SSCursor の close() は未読の行をすべて読み捨てるため with は使わない
+            cursor = connection.cursor(self.dialect.ss_cursor_class)
+            cursor.execute(query, params or ())
+            while True:
+                # 読み込み時間には呼び出し側の処理時間を含めない
+                start = time.perf_counter()
+                rows = cursor.fetchmany(batch_size)
+                fetch_ms += (time.perf_counter() - start) * 1000
+                if not rows:
+                    break
+                row_count += len(rows)
+                if chunks:
+                    yield rows
+                else:
+                    yield from rows
+            cursor.close()
+            finished = True
+        except GeneratorExit:
+            raise
         except Exception as e:
             logging.error(f"Query execution error: {e}")
             logging.error(f"Query: {query}")
             logging.error(f"Params: {params}")
             raise
         finally:
-            if connection:
+            if cursor is not None:
+                QueryStats.get_instance().record_phases(
+                    cursor.last_fingerprint,
+                    acquire_ms=connection.acquire_ms,
+                    fetch_ms=fetch_ms,
+                    rows=row_count
+                )
+            if finished:
                 connection.close()
-    
+            else:
+                # 途中でやめた場合は未読の行が残っているので、読み捨てずに接続ごと破棄する
+                connection.discard()
+
     def execute_update(self, query, params=None):
         """INSERT/UPDATE/DELETE クエリの実行"""
-        connection = None
-        try:
-            connection = self.create_connection()
-            with connection.cursor() as cursor:
-                cursor.execute(query, params or ())
-                connection.commit()
-                return cursor.lastrowid
-        except Exception as e:
-            if connection:
+        with self.get_connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, params or ())
+                    connection.commit()
+                    QueryStats.get_instance().record_phases(
+                        cursor.last_fingerprint, acquire_ms=connection.acquire_ms
+                    )
+                    return cursor.lastrowid
+            except Exception as e:
                 connection.rollback()
-            logging.error(f"Update execution error: {e}")
-            logging.error(f"Query: {query}")
-            logging.error(f"Params: {params}")
-            raise
-        finally:
-            if connection:
-                connection.close()
-                
+                logging.error(f"Update execution error: {e}")
+                logging.error(f"Query: {query}")
+                logging.error(f"Params: {params}")
+                raise
+
     def fetch_one(self, query, params=None):
         """単一行を取得するメソッド"""
         with self.get_connection() as conn:
-            with conn.cursor(dictionary=True) as cursor:
-                cursor.execute(query, params)
+            with conn.cursor() as cursor:
+                cursor.execute(query, params or ())
+                QueryStats.get_instance().record_phases(cursor.last_fingerprint, acquire_ms=conn.acquire_ms)
                 return cursor.fetchone()
 
 class BaseModel:
     def __init__(self):
-        self.db = DatabasePool.get_instance()
\ No newline at end of file
+        self.db = DatabasePool.get_instance()
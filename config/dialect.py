@@ -0,0 +1,325 @@
+import re
+from functools import lru_cache
+
+import pymysql
+
+from config.query_stats import TimedDictCursor, TimedSSDictCursor
+
+# SQLite に変換したSQLをキャッシュする最大の長さ（一括 INSERT の巨大な文はキャッシュしない）
+MAX_CACHED_QUERY = 4000
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_MASK = re.compile(r"\x00(\d+)\x00")
+_COMMENT = re.compile(r"/\*.*?\*/|--[^\n]*", re.DOTALL)
+_NAMED_PLACEHOLDER = re.compile(r"%\((\w+)\)s")
+_NOW = re.compile(r"\bNOW\(\s*\)", re.IGNORECASE)
+_INSERT_IGNORE = re.compile(r"\bINSERT\s+IGNORE\s+INTO\b", re.IGNORECASE)
+_ON_DUPLICATE = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\s+(.*)$", re.IGNORECASE | re.DOTALL)
+_NOOP_ASSIGNMENT = re.compile(r"^\s*(\w+)\s*=\s*\1\s*$")
+_VALUES_FUNCTION = re.compile(r"\bVALUES\(\s*(\w+)\s*\)", re.IGNORECASE)
+_GREATEST = re.compile(r"\bGREATEST\s*\(", re.IGNORECASE)
+_LEAST = re.compile(r"\bLEAST\s*\(", re.IGNORECASE)
+_FOR_UPDATE = re.compile(r"\s+FOR\s+UPDATE(?:\s+(?:SKIP\s+LOCKED|NOWAIT))?", re.IGNORECASE)
+_DELETE_JOIN = re.compile(
+    r"^\s*DELETE\s+(\w+)\s+FROM\s+(\w+)\s+(?:AS\s+)?(\w+)\b(.*)$", re.IGNORECASE | re.DOTALL
+)
+_UPDATE_JOIN = re.compile(
+    r"^\s*UPDATE\s+(\w+)\s+(?:AS\s+)?(\w+)\s+"
+    r"((?:(?:LEFT|INNER|CROSS)\s+(?:OUTER\s+)?)?JOIN\b.*?)"
+    r"\s+SET\s+(.*?)(?:\s+WHERE\s+(.*?))?\s*$",
+    re.IGNORECASE | re.DOTALL
+)
+_SUBSELECT = re.compile(r"\(\s*SELECT\b", re.IGNORECASE)
+_COMPOUND_BEFORE = re.compile(r"\b(?:UNION(?:\s+ALL)?|INTERSECT|EXCEPT)\s*$", re.IGNORECASE)
+_COMPOUND_AFTER = re.compile(r"^\s*(?:UNION|INTERSECT|EXCEPT)\b", re.IGNORECASE)
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?")
+_SQLITE_SEARCH = re.compile(r"^SEARCH (\w+) USING (?:(?:COVERING )?INDEX (\w+)|INTEGER PRIMARY KEY)")
+
+
+def translate_sqlite(query, has_args=True):
+    """MySQL 向けのSQLを SQLite で実行できる形に変換する
+
+    戻り値は (SQL, 書き込みロックが必要か)。FOR UPDATE は SQLite にないため取り除き、
+    代わりに呼び出し側が書き込みトランザクション（BEGIN IMMEDIATE）を始める。
+    has_args が False の場合はプレースホルダを変換しない（pymysql と同じく % をそのまま扱う）。
+    """
+    if len(query) <= MAX_CACHED_QUERY:
+        return _translate_cached(query, has_args)
+    return _translate(query, has_args)
+
+
+@lru_cache(maxsize=1024)
+def _translate_cached(query, has_args):
+    return _translate(query, has_args)
+
+
+def _translate(query, has_args):
+    # 文字列リテラルを退避し、その中身が変換されないようにする
+    literals = []
+
+    def mask(match):
+        literals.append(match.group(0))
+        return f"\x00{len(literals) - 1}\x00"
+
+    sql = _STRING.sub(mask, query)
+    sql = _COMMENT.sub(" ", sql)
+
+    if has_args:
+        sql = _NAMED_PLACEHOLDER.sub(r":\1", sql)
+        sql = sql.replace("%s", "?").replace("%%", "%")
+
+    sql = _NOW.sub("datetime('now', 'localtime')", sql)
+    sql = _INSERT_IGNORE.sub("INSERT OR IGNORE INTO", sql)
+    sql = _ON_DUPLICATE.sub(_upsert, sql)
+    sql = _GREATEST.sub("MAX(", sql)
+    sql = _LEAST.sub("MIN(", sql)
+
+    sql, count = _FOR_UPDATE.subn("", sql)
+    write_lock = count > 0
+
+    sql = _DELETE_JOIN.sub(_delete_join, sql)
+    sql = _UPDATE_JOIN.sub(_update_join, sql)
+    sql = _wrap_compound_members(sql)
+
+    sql = _MASK.sub(lambda match: literals[int(match.group(1))], sql)
+    return sql, write_lock
+
+
+def _upsert(match):
+    """ON DUPLICATE KEY UPDATE -> ON CONFLICT（a = a だけなら DO NOTHING）"""
+    assignments = match.group(1)
+    if all(_NOOP_ASSIGNMENT.match(part) for part in assignments.split(",")):
+        return "ON CONFLICT DO NOTHING"
+    return "ON CONFLICT DO UPDATE SET " + _VALUES_FUNCTION.sub(r"excluded.\1", assignments)
+
+
+def _delete_join(match):
+    """DELETE t FROM table t JOIN ... -> DELETE FROM table WHERE rowid IN (SELECT t.rowid ...)"""
+    target, table, alias, rest = match.groups()
+    if target.lower() != alias.lower():
+        return match.group(0)
+    return f"DELETE FROM {table} WHERE rowid IN (SELECT {alias}.rowid FROM {table} {alias}{rest})"
+
+
+def _update_join(match):
+    """UPDATE table t JOIN ... SET t.a = ... -> UPDATE table AS t SET a = ... FROM (SELECT rowid, * FROM table) AS _target JOIN ...
+
+    SQLite の UPDATE ... FROM では更新対象を JOIN に書けないため、同じ表を別名で結合し直し、
+    rowid で対応させる（LEFT JOIN もそのまま使える）。FROM の中では表の rowid を
+    参照できないので、副問い合わせで列として取り出しておく。
+    """
+    table, alias, joins, assignments, where = match.groups()
+    target = "_target"
+    joins = re.sub(rf"\b{alias}\.", f"{target}.", joins)
+    assignments = re.sub(rf"(^|,)\s*{alias}\.(\w+)\s*=", r"\1 \2 =", assignments.strip())
+    condition = f"{alias}.rowid = {target}._rowid"
+    if where:
+        condition += f" AND ({where})"
+    return (
+        f"UPDATE {table} AS {alias} SET {assignments} "
+        f"FROM (SELECT rowid AS _rowid, * FROM {table}) AS {target} {joins} WHERE {condition}"
+    )
+
+
+def _wrap_compound_members(sql):
+    """(SELECT ...) UNION (SELECT ...) の括弧付きの要素を SELECT * FROM (...) にする"""
+    positions = []
+    for match in _SUBSELECT.finditer(sql):
+        start = match.start()
+        end = _matching_paren(sql, start)
+        if end is None:
+            continue
+        if _COMPOUND_BEFORE.search(sql, 0, start) or _COMPOUND_AFTER.match(sql[end + 1:]):
+            positions.append(start)
+    for start in reversed(positions):
+        sql = sql[:start] + "SELECT * FROM " + sql[start:]
+    return sql
+
+
+def _matching_paren(sql, start):
+    depth = 0
+    for index in range(start, len(sql)):
+        char = sql[index]
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return index
+    return None
+
+
+class MySQLDialect:
+    """MySQL（pymysql）: SQLはそのまま実行する"""
+
+    name = "mysql"
+    # DatabasePool.execute_many で dialect.execute_many を使うか（MySQL は複数行の INSERT を組み立てる）
+    native_executemany = False
+    # 一括登録で1トランザクションにまとめる行数の既定値（大きすぎるとロックと undo ログが増える）
+    bulk_batch_size = 5000
+    cursor_class = TimedDictCursor
+    ss_cursor_class = TimedSSDictCursor
+    # 接続が使えなくなった（プールに戻さない）ことを示す例外
+    disconnect_errors = (pymysql.err.OperationalError, pymysql.err.InterfaceError)
+
+    def connect(self, pool):
+        connection = pymysql.connect(**pool.DB_CONFIG)
+        connection.autocommit(False)  # 自動コミットを無効化
+        return connection
+
+    def begin_write(self, connection):
+        """書き込むトランザクションの開始（InnoDB は行ロックなので不要）"""
+
+    def max_statement_length(self, cursor):
+        """1文に使えるバイト数の上限（サーバーの max_allowed_packet）"""
+        cursor.execute("SELECT @@max_allowed_packet AS max_allowed_packet")
+        row = cursor.fetchone()
+        return int(row['max_allowed_packet'] if isinstance(row, dict) else row[0])
+
+    def list_tables(self, cursor):
+        cursor.execute("SHOW TABLES")
+        return [next(iter(row.values())) for row in cursor.fetchall()]
+
+    def list_indexes(self, cursor, table):
+        """表の索引 [{'name', 'columns', 'unique', 'primary'}]（前方一致の索引は 'col(n)'）"""
+        cursor.execute(f"SHOW INDEX FROM `{table}`")
+        indexes = {}
+        # SHOW INDEX は索引ごと・列の順に並んでいる
+        for row in cursor.fetchall():
+            index = indexes.setdefault(row['Key_name'], {
+                'name': row['Key_name'],
+                'columns': [],
+                'unique': not row['Non_unique'],
+                'primary': row['Key_name'] == 'PRIMARY',
+            })
+            column = row['Column_name']
+            if row.get('Sub_part'):
+                column = f"{column}({row['Sub_part']})"
+            index['columns'].append(column)
+        return list(indexes.values())
+
+    def explain(self, cursor, query, params=None):
+        """EXPLAIN の各行を共通の形にする
+
+        {'table': 表の別名, 'access': 'scan'（全件）/ 'index_scan'（索引全体）/ 'lookup',
+         'index': 使った索引, 'rows': 推定行数, 'filesort': bool, 'temporary': bool, 'detail': 元の内容}
+        """
+        cursor.execute("EXPLAIN " + query, params)
+        steps = []
+        for row in cursor.fetchall():
+            extra = row.get('Extra') or ""
+            access = row.get('type')
+            steps.append({
+                'table': row.get('table'),
+                'access': {'ALL': 'scan', 'index': 'index_scan'}.get(access, 'lookup' if access else None),
+                'index': row.get('key'),
+                'rows': row.get('rows'),
+                'filesort': "Using filesort" in extra,
+                'temporary': "Using temporary" in extra,
+                'detail': (
+                    f"{row.get('select_type')} {row.get('table')} type={access} "
+                    f"key={row.get('key')} rows={row.get('rows')} {extra}"
+                ).strip(),
+            })
+        return steps
+
+
+class SQLiteDialect:
+    """組み込みの SQLite: MySQL 向けのSQLを translate_sqlite で変換して実行する
+
+    接続とカーソルは config.sqlite_backend のラッパーで、pymysql と同じ使い方
+    （辞書の行、%s のプレースホルダ、autocommit なしのトランザクション）ができる。
+    """
+
+    name = "sqlite"
+    # 同じプロセス内なので、値をSQLに埋め込んで変換し直すより sqlite3 の executemany のほうが速い
+    native_executemany = True
+    # コミットのたびに WAL のチェックポイントで索引のページを書き戻すため、大きめにまとめる
+    bulk_batch_size = 50000
+    # SQLite の文の長さの上限は既定で 1GB だが、一括 INSERT は適当な大きさで区切る
+    MAX_STATEMENT_LENGTH = 1024 * 1024
+
+    def __init__(self):
+        import sqlite3
+        from config import sqlite_backend
+        self.cursor_class = sqlite_backend.TimedSQLiteCursor
+        self.ss_cursor_class = sqlite_backend.TimedSQLiteSSCursor
+        self.disconnect_errors = (sqlite3.InterfaceError, sqlite3.ProgrammingError)
+        self._backend = sqlite_backend
+
+    def connect(self, pool):
+        return self._backend.connect(pool.SQLITE_CONFIG, self.cursor_class)
+
+    def begin_write(self, connection):
+        """書き込むトランザクションは最初から書き込みロックを取る（読んでから書く処理の競合を防ぐ）"""
+        connection.begin(write=True)
+
+    def max_statement_length(self, cursor):
+        return self.MAX_STATEMENT_LENGTH
+
+    def execute_many(self, cursor, query, seq_of_params):
+        """DatabasePool.execute_many の SQLite 版（sqlite3 の executemany で1文として実行する）"""
+        affected = cursor.executemany(query, seq_of_params)
+        result = {'rowcount': affected, 'first_id': None, 'last_id': None, 'statements': 1}
+        match = pymysql.cursors.RE_INSERT_VALUES.match(query)
+        # ON DUPLICATE KEY UPDATE 付きでは更新した行も数えるため、ID の範囲は求めない
+        if match and not (match.group(3) or "").strip() and affected and cursor.lastrowid:
+            result['first_id'] = cursor.lastrowid - affected + 1
+            result['last_id'] = cursor.lastrowid
+        return result
+
+    def list_tables(self, cursor):
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )
+        return [row['name'] for row in cursor.fetchall()]
+
+    def list_indexes(self, cursor, table):
+        """表の索引（INTEGER PRIMARY KEY は rowid そのものなので含まれない）"""
+        cursor.execute(f"PRAGMA index_list('{table}')")
+        indexes = []
+        # index_list は新しい索引から並ぶので、作成した順に直す
+        for row in sorted(cursor.fetchall(), key=lambda row: row['seq'], reverse=True):
+            cursor.execute(f"PRAGMA index_info('{row['name']}')")
+            columns = [info['name'] for info in sorted(cursor.fetchall(), key=lambda info: info['seqno'])]
+            indexes.append({
+                'name': row['name'],
+                'columns': columns,
+                'unique': bool(row['unique']),
+                'primary': row['origin'] == 'pk',
+            })
+        return indexes
+
+    def explain(self, cursor, query, params=None):
+        """EXPLAIN QUERY PLAN の各行を MySQLDialect.explain と同じ形にする（推定行数はない）"""
+        steps = []
+        for detail in cursor.connection.explain(query, params):
+            step = {
+                'table': None, 'access': None, 'index': None, 'rows': None,
+                'filesort': False, 'temporary': False, 'detail': detail,
+            }
+            scan = _SQLITE_SCAN.match(detail)
+            search = _SQLITE_SEARCH.match(detail)
+            if scan:
+                step['table'] = scan.group(1)
+                step['index'] = scan.group(2)
+                step['access'] = 'index_scan' if scan.group(2) else 'scan'
+            elif search:
+                step['table'] = search.group(1)
+                step['index'] = search.group(2)
+                step['access'] = 'lookup'
+            elif detail.startswith("USE TEMP B-TREE FOR"):
+                if "ORDER BY" in detail:
+                    step['filesort'] = True
+                else:
+                    step['temporary'] = True
+            steps.append(step)
+        return steps
+
+
+def get_dialect(name):
+    if name == "mysql":
+        return MySQLDialect()
+    if name == "sqlite":
+        return SQLiteDialect()
+    raise ValueError(f"不明なデータベースの種類です: {name}（mysql または sqlite）")
@@ -0,0 +1,128 @@
+import logging
+import os
+import re
+from datetime import datetime
+
+from config.database import DatabasePool
+
+# migrations/0001_name.mysql.sql のように、番号・名前・データベースの種類をファイル名に含める
+_MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.(\w+)\.sql$")
+_STATEMENT_END = re.compile(r";[ \t]*(?:\n|$)")
+_LINE_COMMENT = re.compile(r"^\s*--.*$", re.MULTILINE)
+# 「-- 適用後: コマンド」の行は適用後に実行するコマンドとして表示する
+_FOLLOW_UP = re.compile(r"^--\s*適用後:\s*(.+?)\s*$", re.MULTILINE)
+_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class MigrationError(Exception):
+    """マイグレーションのファイルや適用の状態がおかしい"""
+
+
+def split_statements(text):
+    """マイグレーションのSQLを文に分ける（行末の ; で区切り、-- の行コメントは除く）"""
+    text = _LINE_COMMENT.sub("", text)
+    return [statement.strip() for statement in _STATEMENT_END.split(text) if statement.strip()]
+
+
+def follow_up_commands(path):
+    """マイグレーションのファイルに書かれた、適用後に実行するコマンドの一覧"""
+    with open(path, encoding="utf-8") as f:
+        return _FOLLOW_UP.findall(f.read())
+
+
+class MigrationRunner:
+    """migrations/ のSQLを番号順に適用し、適用済みの番号を schema_migrations に記録する
+
+    番号ごとに DB_BACKEND の種類（mysql / sqlite）に合ったファイルを使う。
+    1つのマイグレーションは1つのトランザクションで実行するが、MySQL の ALTER TABLE などは
+    暗黙にコミットされるため、途中で失敗した場合は手で状態を確認してから再実行する。
+    """
+
+    MIGRATION_CONFIG = {
+        "directory": os.path.join(_PROJECT_DIR, "migrations"),
+        "table": "schema_migrations",
+    }
+
+    def __init__(self, db=None, config=None):
+        self.db = db or DatabasePool.get_instance()
+        self.config = dict(self.MIGRATION_CONFIG, **(config or {}))
+        self.backend = self.db.dialect.name
+
+    def available(self):
+        """このデータベース用のマイグレーション [{'version', 'name', 'path'}]（番号順）"""
+        directory = self.config["directory"]
+        versions = {}
+        for filename in sorted(os.listdir(directory)):
+            match = _MIGRATION_FILE.match(filename)
+            if match is None:
+                continue
+            version, name, backend = int(match.group(1)), match.group(2), match.group(3)
+            entry = versions.setdefault(version, {'version': version, 'name': name, 'path': None})
+            if entry['name'] != name:
+                raise MigrationError(f"番号 {version} のマイグレーションの名前が揃っていません: {entry['name']}, {name}")
+            if backend == self.backend:
+                entry['path'] = os.path.join(directory, filename)
+
+        missing = [entry['version'] for entry in versions.values() if entry['path'] is None]
+        if missing:
+            raise MigrationError(
+                f"{self.backend} 用のファイルがないマイグレーションがあります: {', '.join(map(str, missing))}"
+            )
+        return [versions[version] for version in sorted(versions)]
+
+    def _ensure_table(self):
+        self.db.execute_update(f"""
+        CREATE TABLE IF NOT EXISTS {self.config["table"]} (
+            version INT NOT NULL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP NULL DEFAULT NULL
+        )
+        """)
+
+    def applied(self):
+        """適用済みのマイグレーション {番号: {'version', 'name', 'applied_at'}}"""
+        self._ensure_table()
+        rows = self.db.execute_query(
+            f"SELECT version, name, applied_at FROM {self.config['table']} ORDER BY version"
+        )
+        return {row['version']: row for row in rows}
+
+    def status(self):
+        """ファイルごとの適用状態 [{'version', 'name', 'path', 'applied_at'}]（未適用は applied_at が None）"""
+        applied = self.applied()
+        return [
+            dict(migration, applied_at=applied.get(migration['version'], {}).get('applied_at'))
+            for migration in self.available()
+        ]
+
+    def pending(self, target=None):
+        """未適用のマイグレーション（target を指定するとその番号まで）"""
+        applied = self.applied()
+        return [
+            migration for migration in self.available()
+            if migration['version'] not in applied and (target is None or migration['version'] <= target)
+        ]
+
+    def apply(self, migration):
+        """1つのマイグレーションを実行して記録する"""
+        with open(migration['path'], encoding="utf-8") as f:
+            statements = split_statements(f.read())
+
+        def work(cursor):
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute(
+                f"INSERT INTO {self.config['table']} (version, name, applied_at) VALUES (%s, %s, %s)",
+                (migration['version'], migration['name'], datetime.now())
+            )
+
+        logging.info(f"Applying migration {migration['version']:04d}_{migration['name']} ({len(statements)} statements)")
+        self.db.execute_in_transaction(work)
+
+    def migrate(self, target=None):
+        """未適用のマイグレーションを番号順にすべて適用し、適用したものを返す"""
+        applied = []
+        for migration in self.pending(target):
+            self.apply(migration)
+            applied.append(migration)
+        return applied
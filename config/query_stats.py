@@ -0,0 +1,339 @@
+import atexit
+import bisect
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+import pymysql
+
+# 処理時間のヒストグラムのバケット境界（ミリ秒）。0.05ms から約52秒まで 2 ** (1/4) 倍ずつ
+BUCKET_BOUNDS_MS = [0.05 * 2 ** (i / 4) for i in range(81)]
+
+# フィンガープリントを作るときに見る最大文字数（一括 INSERT の巨大な文でも時間をかけない）
+MAX_FINGERPRINT_INPUT = 4000
+
+_COMMENT = re.compile(r"/\*.*?\*/|--[^\n]*|#[^\n]*", re.DOTALL)
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.IGNORECASE)
+_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROWS = re.compile(r"(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+")
+_SPACE = re.compile(r"\s+")
+_TRUNCATED_ROW = re.compile(r"\s*,\s*\([^)]*$")
+
+
+def fingerprint(query):
+    """値やプレースホルダを ? にまとめたSQL（同じ形の文を1つに集計するためのキー）
+
+    IN (%s, %s, ...) や複数行の VALUES は件数に関係なく同じフィンガープリントになる。
+    キャッシュするのは MAX_FINGERPRINT_INPUT 以下の文だけ（execute_many の巨大な
+    一括 INSERT は文ごとに内容が違い、キャッシュのキーとして全文が残ってしまうため）。
+    """
+    if len(query) <= MAX_FINGERPRINT_INPUT:
+        return _fingerprint_cached(query)
+    return _fingerprint(query)
+
+
+@lru_cache(maxsize=2048)
+def _fingerprint_cached(query):
+    return _fingerprint(query)
+
+
+def _fingerprint(query):
+    text = query[:MAX_FINGERPRINT_INPUT]
+    text = _STRING.sub("?", text)
+    text = _COMMENT.sub(" ", text)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _LIST.sub("(...)", text)
+    text = _ROWS.sub(r"\1", text)
+    if len(query) > MAX_FINGERPRINT_INPUT:
+        # 途中で切った最後の行を落とし、切る位置によってキーが変わらないようにする
+        text = _TRUNCATED_ROW.sub("", text)
+    return _SPACE.sub(" ", text).strip()
+
+
+def redact_params(params):
+    """スローログ用にパラメータの値を型と長さだけにする（パスワードやメールアドレスを残さない）"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: _redact_value(value) for key, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [_redact_value(value) for value in params]
+    return _redact_value(params)
+
+
+def _redact_value(value):
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    if isinstance(value, (list, tuple)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+class StatementStats:
+    """1つのフィンガープリントの集計"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.acquire_ms = 0.0
+        self.fetch_ms = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def add(self, elapsed_ms, rows):
+        self.count += 1
+        self.rows += rows
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, elapsed_ms)] += 1
+
+    def percentile(self, q):
+        """q（0〜1）分位の処理時間（バケットの上端で近似、ミリ秒）"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target and n:
+                if index >= len(BUCKET_BOUNDS_MS):
+                    return self.max_ms
+                return min(BUCKET_BOUNDS_MS[index], self.max_ms)
+        return self.max_ms
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'rows': self.rows,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(0.50), 3),
+            'p95_ms': round(self.percentile(0.95), 3),
+            'p99_ms': round(self.percentile(0.99), 3),
+            'max_ms': round(self.max_ms, 3),
+            'acquire_ms': round(self.acquire_ms, 3),
+            'fetch_ms': round(self.fetch_ms, 3),
+        }
+
+
+class QueryStats:
+    """実行したSQLの処理時間をフィンガープリントごとに集計する
+
+    DatabasePool の接続はすべて TimedDictCursor を使うため、execute_* だけでなく
+    execute_in_transaction 内で実行した文も集計される。接続の取得待ち（acquire）と
+    結果の読み込み（fetch）は DatabasePool が record_phases で別に加算する。
+    slow_query_ms を超えた文はパラメータを伏せてスローログに書き出す。
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    STATS_CONFIG = {
+        "enabled": os.getenv('QUERY_STATS', '1') != '0',
+        "slow_query_ms": float(os.getenv('SLOW_QUERY_MS', 200)),
+        # 空にすると書き出さない
+        "slow_log_file": os.getenv('SLOW_QUERY_LOG', "slow_query.log"),
+        "stats_file": os.getenv('QUERY_STATS_FILE', "query_stats.json"),  # アプリ終了時に集計を書き出すファイル（scripts/query_stats.py で表示）
+    }
+
+    def __init__(self, config=None):
+        self.config = dict(self.STATS_CONFIG, **(config or {}))
+        self._lock = threading.Lock()
+        self._statements = {}
+        self._acquire = StatementStats()  # 接続の取得待ち（文に関係なく全体で集計）
+        self._listeners = []
+        self._samplers = []
+        self.started_at = time.time()
+        self.slow_logger = logging.getLogger("sns_app.slow_query")
+
+    @classmethod
+    def get_instance(cls):
+        """共有インスタンスを取得（初回はスローログの出力先と終了時の書き出しを設定）"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = cls()
+                    instance._setup_slow_log()
+                    if instance.config["stats_file"]:
+                        atexit.register(instance.save, instance.config["stats_file"])
+                    cls._instance = instance
+        return cls._instance
+
+    def _setup_slow_log(self):
+        path = self.config["slow_log_file"]
+        if not path or self.slow_logger.handlers:
+            return
+        handler = logging.FileHandler(path, encoding="utf-8")
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+        self.slow_logger.addHandler(handler)
+        self.slow_logger.setLevel(logging.WARNING)
+        self.slow_logger.propagate = False
+
+    def add_listener(self, listener):
+        """文を実行するたびに listener(フィンガープリント, 処理時間ms) を呼ぶ"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def add_sampler(self, sampler):
+        """文を実行するたびに sampler(フィンガープリント, SQL, パラメータ) を呼ぶ
+
+        実際の値で EXPLAIN し直す場合など、SQLとパラメータそのものが必要なときに使う
+        （パラメータは伏せずに渡すので、ログなどには書き出さないこと）。
+        """
+        with self._lock:
+            self._samplers.append(sampler)
+
+    def remove_sampler(self, sampler):
+        with self._lock:
+            if sampler in self._samplers:
+                self._samplers.remove(sampler)
+
+    def observed(self):
+        """文の実行を記録する必要があるか（集計が無効でもリスナー・サンプラーには渡す）"""
+        return self.config["enabled"] or bool(self._listeners or self._samplers)
+
+    def record(self, query, elapsed_ms, rows=0, params=None, error=False):
+        """1文の実行を記録し、フィンガープリントを返す
+
+        集計とスローログは enabled のときだけ行い、リスナー・サンプラーは常に呼ぶ
+        （QUERY_STATS=0 でも QueryCounter やインデックス診断が文を数えられるようにする）。
+        """
+        if isinstance(query, bytes):
+            query = query.decode('utf-8', 'replace')
+        key = fingerprint(query)
+        enabled = self.config["enabled"]
+        with self._lock:
+            if enabled:
+                stats = self._statements.get(key)
+                if stats is None:
+                    stats = self._statements[key] = StatementStats()
+                stats.add(elapsed_ms, rows)
+                if error:
+                    stats.errors += 1
+            listeners = list(self._listeners)
+            samplers = list(self._samplers)
+
+        for listener in listeners:
+            listener(key, elapsed_ms)
+        for sampler in samplers:
+            sampler(key, query, params)
+
+        if enabled and elapsed_ms >= self.config["slow_query_ms"]:
+            self.slow_logger.warning(
+                f"{elapsed_ms:.1f} ms rows={rows}{' error' if error else ''} | {key} | "
+                f"params={redact_params(params)}"
+            )
+        return key
+
+    def record_acquire(self, elapsed_ms):
+        """接続プールからの接続の取得待ちを記録"""
+        if not self.config["enabled"]:
+            return
+        with self._lock:
+            self._acquire.add(elapsed_ms, 0)
+
+    def record_phases(self, key, acquire_ms=0.0, fetch_ms=0.0, rows=0):
+        """接続の取得待ち・結果の読み込みにかかった時間（と後から分かった行数）を加算"""
+        if key is None:
+            return
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is not None:
+                stats.acquire_ms += acquire_ms
+                stats.fetch_ms += fetch_ms
+                stats.rows += rows
+
+    def top(self, n=10, sort_by='total_ms'):
+        """指定した項目（total_ms, count, p95_ms など）の大きい順に上位 n 件"""
+        with self._lock:
+            summaries = [dict(stats.summary(), fingerprint=key) for key, stats in self._statements.items()]
+        summaries.sort(key=lambda s: s[sort_by], reverse=True)
+        return summaries[:n]
+
+    def snapshot(self):
+        with self._lock:
+            statements = {key: stats.summary() for key, stats in self._statements.items()}
+            acquire = self._acquire.summary()
+        return {
+            'started_at': self.started_at,
+            'saved_at': time.time(),
+            'acquire': acquire,
+            'statements': statements,
+        }
+
+    def save(self, path):
+        """集計をJSONで書き出す"""
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logging.error(f"Failed to save query stats: {e}")
+
+    @contextmanager
+    def paused(self):
+        """with ブロックの間だけ集計を止める（リスナーとサンプラーはそのまま呼ぶ）"""
+        enabled = self.config["enabled"]
+        self.config["enabled"] = False
+        try:
+            yield self
+        finally:
+            self.config["enabled"] = enabled
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self._acquire = StatementStats()
+            self.started_at = time.time()
+
+
+class TimedCursorMixin:
+    """execute の処理時間を QueryStats に記録するカーソル"""
+
+    last_fingerprint = None
+    unbuffered = False  # サーバー側カーソル（execute の時点では行数が分からない）
+
+    def execute(self, query, args=None):
+        return self._timed(query, args, lambda: super(TimedCursorMixin, self).execute(query, args))
+
+    def _timed(self, query, args, call):
+        """call() を実行し、query の1文として処理時間と行数を記録する"""
+        stats = QueryStats.get_instance()
+        if not stats.observed():
+            return call()
+        start = time.perf_counter()
+        try:
+            result = call()
+        except Exception:
+            self.last_fingerprint = stats.record(
+                query, (time.perf_counter() - start) * 1000, 0, args, error=True
+            )
+            raise
+        # サーバー側カーソルは読み込むまで行数が分からない
+        rows = 0 if self.unbuffered else max(self.rowcount, 0)
+        self.last_fingerprint = stats.record(query, (time.perf_counter() - start) * 1000, rows, args)
+        return result
+
+
+class TimedDictCursor(TimedCursorMixin, pymysql.cursors.DictCursor):
+    pass
+
+
+class TimedSSDictCursor(TimedCursorMixin, pymysql.cursors.SSDictCursor):
+    unbuffered = True
@@ -0,0 +1,306 @@
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from config.dialect import translate_sqlite
+from config.query_stats import TimedCursorMixin
+
+# 日時は MySQL の TIMESTAMP と同じ 'YYYY-MM-DD HH:MM:SS'（ローカル時刻）の文字列で保存する
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_schema_lock = threading.Lock()
+_schema_ready = set()  # スキーマを確認済みのデータベースファイル
+
+
+def _adapt_datetime(value):
+    if value.tzinfo is None:
+        # DATETIME_FORMAT と同じ形式で、strftime より速い（一括登録では行数分呼ばれる）
+        return value.isoformat(" ", "seconds")
+    return value.strftime(DATETIME_FORMAT)
+
+
+def _convert_datetime(value):
+    text = value.decode()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+
+sqlite3.register_adapter(datetime, _adapt_datetime)
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter("TIMESTAMP", _convert_datetime)
+sqlite3.register_converter("DATETIME", _convert_datetime)
+
+
+def _unix_timestamp(value=None):
+    """MySQL の UNIX_TIMESTAMP（ローカル時刻として解釈する）"""
+    if value is None:
+        return int(time.time())
+    try:
+        return int(time.mktime(datetime.fromisoformat(str(value)).timetuple()))
+    except ValueError:
+        return None
+
+
+def _floor(value):
+    return None if value is None else math.floor(value)
+
+
+def literal(value):
+    """値を SQLite のSQLリテラルにする（mogrify 用）"""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    if isinstance(value, datetime):
+        value = _adapt_datetime(value)
+    elif isinstance(value, date):
+        value = value.isoformat()
+    elif isinstance(value, (bytes, bytearray)):
+        return "X'" + bytes(value).hex() + "'"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class SQLiteConnection:
+    """sqlite3 の接続を pymysql の接続と同じように使えるようにするラッパー
+
+    pymysql の autocommit(False) と同じく、最初の文で暗黙にトランザクションを始め、
+    commit() / rollback() で終える。
+    """
+
+    encoding = "utf8"
+
+    def __init__(self, raw, cursorclass):
+        self._raw = raw
+        self.cursorclass = cursorclass
+
+    def cursor(self, cursor_class=None):
+        return (cursor_class or self.cursorclass)(self)
+
+    def begin(self, write=False):
+        """トランザクションを始める（write=True なら最初から書き込みロックを取る）"""
+        if not self._raw.in_transaction:
+            self._raw.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def autocommit(self, value):
+        """常に明示的なトランザクションで実行するため何もしない"""
+
+    def ping(self, reconnect=True):
+        # 閉じた接続なら ProgrammingError になる（プールが作り直す）
+        self._raw.execute("SELECT 1")
+
+    def close(self):
+        self._raw.close()
+
+    def explain(self, query, args=None):
+        """EXPLAIN QUERY PLAN の detail の一覧（MySQL のSQLを変換してから実行する）"""
+        sql, _ = translate_sqlite(query, args is not None)
+        rows = self._raw.execute("EXPLAIN QUERY PLAN " + sql, SQLiteCursor._params(args)).fetchall()
+        return [row[3] for row in rows]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SQLiteCursor:
+    """pymysql の DictCursor 相当（MySQL のSQLを変換して実行し、行を辞書で返す）
+
+    結果はすべて読み込んでから返し、execute() は pymysql と同じく行数を返す。
+    同じ名前の列が複数ある場合（p.*, u.user_id など）は最初の列の値を使う。
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._cursor = connection._raw.cursor()
+        self._rows = []
+        self._index = 0
+        self._columns = None
+        self.description = None
+        self.rowcount = -1
+        self.lastrowid = None
+
+    def execute(self, query, args=None):
+        sql, write_lock = translate_sqlite(query, args is not None)
+        self.connection.begin(write=write_lock)
+        self._cursor.execute(sql, self._params(args))
+        self.description = self._cursor.description
+        self._columns = [column[0] for column in self.description] if self.description else None
+
+        if self._columns is None:
+            self._rows = []
+            self.rowcount = self._cursor.rowcount
+            # 複数行の INSERT では MySQL と同じく最初に採番された値にする
+            lastrowid = self._cursor.lastrowid
+            if lastrowid and self.rowcount > 1 and sql.lstrip()[:6].upper() == "INSERT":
+                lastrowid -= self.rowcount - 1
+            self.lastrowid = lastrowid
+            return self.rowcount
+        return self._after_select()
+
+    def executemany(self, query, seq_of_args):
+        """同じ文を複数のパラメータで実行する（SQLの変換は1回だけで、sqlite3 の executemany を使う）
+
+        戻り値は影響を受けた行数の合計。lastrowid は最後に INSERT した行の rowid。
+        """
+        sql, _ = translate_sqlite(query, True)
+        self.connection.begin(write=True)
+        self._cursor.executemany(sql, (self._params(args) for args in seq_of_args))
+        self.description = None
+        self._columns = None
+        self._rows = []
+        self.rowcount = self._cursor.rowcount
+        self.lastrowid = self.connection._raw.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return self.rowcount
+
+    def _after_select(self):
+        self._rows = [self._to_dict(row) for row in self._cursor.fetchall()]
+        self._index = 0
+        self.rowcount = len(self._rows)
+        return self.rowcount
+
+    @staticmethod
+    def _params(args):
+        if args is None:
+            return ()
+        if isinstance(args, dict):
+            return args
+        if isinstance(args, (list, tuple)):
+            return tuple(args)
+        return (args,)
+
+    def _to_dict(self, row):
+        result = {}
+        for name, value in zip(self._columns, row):
+            result.setdefault(name, value)
+        return result
+
+    def mogrify(self, query, args=None):
+        if args is None:
+            return query
+        if isinstance(args, dict):
+            return query % {key: literal(value) for key, value in args.items()}
+        return query % tuple(literal(value) for value in self._params(args))
+
+    def fetchone(self):
+        if self._index >= len(self._rows):
+            return None
+        row = self._rows[self._index]
+        self._index += 1
+        return row
+
+    def fetchmany(self, size=None):
+        size = size or 1
+        rows = self._rows[self._index:self._index + size]
+        self._index += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._rows[self._index:]
+        self._index = len(self._rows)
+        return rows
+
+    def close(self):
+        self._cursor.close()
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SQLiteSSCursor(SQLiteCursor):
+    """pymysql の SSDictCursor 相当（行を必要な分だけ読み込む）"""
+
+    def _after_select(self):
+        self.rowcount = -1
+        return 0
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return None if row is None else self._to_dict(row)
+
+    def fetchmany(self, size=None):
+        return [self._to_dict(row) for row in self._cursor.fetchmany(size or 1)]
+
+    def fetchall(self):
+        return [self._to_dict(row) for row in self._cursor.fetchall()]
+
+
+class TimedSQLiteCursor(TimedCursorMixin, SQLiteCursor):
+    def executemany(self, query, seq_of_args):
+        # まとめて1文として記録する（パラメータは件数が多いので渡さない）
+        return self._timed(query, None, lambda: SQLiteCursor.executemany(self, query, seq_of_args))
+
+
+class TimedSQLiteSSCursor(TimedCursorMixin, SQLiteSSCursor):
+    unbuffered = True
+
+
+def connect(config, cursorclass):
+    """SQLite のデータベースに接続する（WAL モード、外部キー有効、初回はスキーマを作成）
+
+    path が ":memory:" の場合はプロセス内で共有するメモリ上のデータベースになる
+    （WAL は使えず、すべての接続を閉じると消える）。
+    """
+    path = config["path"]
+    in_memory = path == ":memory:"
+    raw = sqlite3.connect(
+        "file:sns_app?mode=memory&cache=shared" if in_memory else path,
+        timeout=config["busy_timeout"],
+        detect_types=sqlite3.PARSE_DECLTYPES,
+        isolation_level=None,       # トランザクションは SQLiteConnection が明示的に始める
+        check_same_thread=False,    # プールの接続は別のスレッドに貸し出される
+        uri=in_memory,
+    )
+    try:
+        raw.execute("PRAGMA foreign_keys = ON")
+        if not in_memory:
+            raw.execute("PRAGMA journal_mode = WAL")
+            raw.execute("PRAGMA synchronous = NORMAL")
+        # 負の値は KiB 単位（既定の 2MB では大きな表の索引の更新でページの読み直しが多くなる）
+        raw.execute(f"PRAGMA cache_size = -{int(config['cache_size_kb'])}")
+        raw.create_function("UNIX_TIMESTAMP", -1, _unix_timestamp)
+        raw.create_function("FLOOR", 1, _floor, deterministic=True)
+        _ensure_schema(raw, path, config["schema_file"])
+    except Exception:
+        raw.close()
+        raise
+    return SQLiteConnection(raw, cursorclass)
+
+
+def _ensure_schema(raw, path, schema_file):
+    """テーブルがなければスキーマのファイルを実行して作成する"""
+    key = path if path == ":memory:" else os.path.abspath(path)
+    with _schema_lock:
+        if key in _schema_ready:
+            return
+        exists = raw.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users'"
+        ).fetchone()
+        if not exists:
+            logging.info(f"Creating SQLite schema in {path} from {schema_file}")
+            with open(schema_file, encoding="utf-8") as f:
+                raw.executescript(f.read())
+        _schema_ready.add(key)
@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import sys
+import threading
 import traceback
 from views.login_view import LoginView
 from views.timeline_view import TimelineView
@@ -9,6 +10,8 @@ from views.profile_view import ProfileView
 from views.search_view import SearchView
 from utils.session import SessionManager
 from views.password_reset_view import PasswordResetView
+from utils.trending import TrendingHashtags
+from utils.email_worker import EmailOutboxWorker
 
 class SNSApplication:
     def __init__(self):
@@ -23,6 +26,12 @@ class SNSApplication:
             
             # セッション管理の初期化
             self.session_manager = SessionManager()
+
+            # トレンド集計を post_hashtags から再構築（UIを止めないよう別スレッドで）
+            threading.Thread(target=TrendingHashtags.get_instance, daemon=True).start()
+
+            # 送信待ちメール（email_outbox）をバックグラウンドで送信
+            EmailOutboxWorker.get_instance().start()
             
             # メインフレームの設定
             self.main_frame = ttk.Frame(self.root)
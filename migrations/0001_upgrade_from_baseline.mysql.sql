@@ -0,0 +1,51 @@
+-- 元のダンプ（索引・集計列・タイムラインなどを追加する前の sns_app.sql）で作ったデータベースを
+-- 現在の sns_app.sql と同じスキーマにする
+-- 現在の sns_app.sql で作ったデータベースは schema_migrations にこの番号が記録済みなので実行されない
+-- 適用後: python -m scripts.reconcile_counters（追加したカウンタ列を実際の件数にそろえる）
+-- 適用後: python -m scripts.backfill_hashtags（既存の投稿のハッシュタグを登録する）
+
+-- 投稿者ごとの投稿一覧（WHERE user_id = ? ORDER BY created_at DESC）の索引と、いいね数・コメント数のカウンタ列
+ALTER TABLE posts
+  ADD COLUMN like_count int NOT NULL DEFAULT '0',
+  ADD COLUMN comment_count int NOT NULL DEFAULT '0',
+  ADD INDEX idx_posts_user_created (user_id, created_at);
+
+-- フォロワー数・フォロー数のカウンタ列
+ALTER TABLE users
+  ADD COLUMN follower_count int NOT NULL DEFAULT '0',
+  ADD COLUMN following_count int NOT NULL DEFAULT '0';
+
+-- 既定の照合順序ではアクセント違いのかな（は・ば など）が同じタグになるため、バイナリで比較する
+-- （大文字・小文字などの正規化は utils/hashtag.py で行う）
+ALTER TABLE hashtags MODIFY tag_name varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL;
+
+-- トレンドの集計（WHERE created_at >= ?）
+ALTER TABLE post_hashtags ADD INDEX idx_post_hashtags_created (created_at);
+
+-- ホームタイムラインの実体化（TIMELINE_CONFIG で有効にした場合に使う）
+CREATE TABLE IF NOT EXISTS `timeline_entries` (
+  `user_id` int NOT NULL,
+  `post_id` int NOT NULL,
+  `created_at` timestamp NOT NULL,
+  PRIMARY KEY (`user_id`,`created_at`,`post_id`),
+  KEY `post_id` (`post_id`),
+  CONSTRAINT `timeline_entries_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `users` (`user_id`) ON DELETE CASCADE,
+  CONSTRAINT `timeline_entries_ibfk_2` FOREIGN KEY (`post_id`) REFERENCES `posts` (`post_id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- 送信待ちのメール（登録確認・パスワード再設定は utils/email_worker.py が送る）
+CREATE TABLE IF NOT EXISTS `email_outbox` (
+  `outbox_id` int NOT NULL AUTO_INCREMENT,
+  `to_email` varchar(255) NOT NULL,
+  `subject` varchar(255) NOT NULL,
+  `body` text NOT NULL,
+  `status` enum('pending','sending','sent','failed') NOT NULL DEFAULT 'pending',
+  `attempts` int NOT NULL DEFAULT '0',
+  `next_attempt_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  `locked_at` timestamp NULL DEFAULT NULL,
+  `last_error` text,
+  `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+  `sent_at` timestamp NULL DEFAULT NULL,
+  PRIMARY KEY (`outbox_id`),
+  KEY `idx_email_outbox_due` (`status`,`next_attempt_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -0,0 +1,30 @@
+-- 0001_upgrade_from_baseline.mysql.sql の SQLite 版
+-- SQLite のデータベースは常に sns_app_sqlite.sql（現在のスキーマ）から作られるため、
+-- 何度実行しても変わらない CREATE ... IF NOT EXISTS だけを置く
+
+CREATE INDEX IF NOT EXISTS idx_posts_user_created ON posts (user_id, created_at);
+
+CREATE INDEX IF NOT EXISTS idx_post_hashtags_created ON post_hashtags (created_at);
+
+CREATE TABLE IF NOT EXISTS timeline_entries (
+  user_id INTEGER NOT NULL REFERENCES users (user_id) ON DELETE CASCADE,
+  post_id INTEGER NOT NULL REFERENCES posts (post_id) ON DELETE CASCADE,
+  created_at TIMESTAMP NOT NULL,
+  PRIMARY KEY (user_id, created_at, post_id)
+);
+CREATE INDEX IF NOT EXISTS timeline_entries_post_id ON timeline_entries (post_id);
+
+CREATE TABLE IF NOT EXISTS email_outbox (
+  outbox_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  to_email VARCHAR(255) NOT NULL,
+  subject VARCHAR(255) NOT NULL,
+  body TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sending', 'sent', 'failed')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  next_attempt_at TIMESTAMP NOT NULL DEFAULT (datetime('now', 'localtime')),
+  locked_at TIMESTAMP NULL DEFAULT NULL,
+  last_error TEXT,
+  created_at TIMESTAMP NULL DEFAULT (datetime('now', 'localtime')),
+  sent_at TIMESTAMP NULL DEFAULT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox (status, next_attempt_at);
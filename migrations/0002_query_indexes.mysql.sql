@@ -0,0 +1,23 @@
+-- よく実行するクエリのための索引（scripts/index_advisor.py の指摘による）
+
+-- user_id だけの索引は idx_posts_user_created (user_id, created_at) の左端と重複するので削除する
+-- （外部キー posts_ibfk_1 は idx_posts_user_created を使う）
+ALTER TABLE posts DROP INDEX user_id;
+
+-- コメント一覧（WHERE post_id = ? ORDER BY created_at）を filesort なしで読む
+-- post_id だけの索引は新しい索引の左端と重複するので削除する（外部キーは新しい索引を使う）
+ALTER TABLE comments
+  ADD INDEX idx_comments_post_created (post_id, created_at),
+  DROP INDEX post_id;
+
+-- フォロワー一覧・件数（WHERE followed_id = ?）で follower_id まで索引だけで読む covering index
+-- follow_id の UNIQUE は主キーと同じ列なので削除する
+ALTER TABLE follows
+  ADD INDEX idx_follows_followed_follower (followed_id, follower_id),
+  DROP INDEX followed_id,
+  DROP INDEX follow_id;
+
+-- username の UNIQUE 索引が username と idx_username の2つあるので1つにする
+-- username は VARCHAR(50) で、残した UNIQUE 索引が = と LIKE 'abc%' の両方に使える
+-- （search_users の LIKE '%abc%' は前方一致の索引でも使えないため、前方一致の索引は追加しない）
+ALTER TABLE users DROP INDEX idx_username;
@@ -0,0 +1,8 @@
+-- 0002_query_indexes.mysql.sql の SQLite 版
+-- sns_app_sqlite.sql には username の重複した索引、follow_id の UNIQUE、posts の user_id だけの索引はないので、索引の追加だけ行う
+
+CREATE INDEX IF NOT EXISTS idx_comments_post_created ON comments (post_id, created_at);
+DROP INDEX IF EXISTS comments_post_id;
+
+CREATE INDEX IF NOT EXISTS idx_follows_followed_follower ON follows (followed_id, follower_id);
+DROP INDEX IF EXISTS follows_followed_id;
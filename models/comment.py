@@ -11,9 +11,21 @@ class Comment(BaseModel):
         INSERT INTO comments (user_id, post_id, content, created_at)
         VALUES (%s, %s, %s, %s)
         """
+        # updated_at を明示的に据え置き、カウンタ更新で投稿の更新日時が変わらないようにする
+        query_increment = """
+        UPDATE posts SET comment_count = comment_count + 1, updated_at = updated_at
+        WHERE post_id = %s
+        """
         created_at = datetime.now()
+
+        def work(cursor):
+            cursor.execute(query, (user_id, post_id, content, created_at))
+            comment_id = cursor.lastrowid
+            cursor.execute(query_increment, (post_id,))
+            return comment_id
+
         try:
-            comment_id = self.db.execute_update(query, (user_id, post_id, content, created_at))
+            comment_id = self.db.execute_in_transaction(work)
             return self.get_comment(comment_id)
         except Exception as e:
             raise ValueError(f"コメントの作成に失敗しました: {e}")
@@ -44,7 +56,22 @@ class Comment(BaseModel):
     def get_comment_count(self, post_id):
         """特定の投稿のコメント数を取得"""
         query = """
-        SELECT COUNT(*) as comment_count FROM comments WHERE post_id = %s
+        SELECT comment_count FROM posts WHERE post_id = %s
         """
         result = self.db.execute_query(query, (post_id,))
-        return result[0]['comment_count'] if result else 0
\ No newline at end of file
+        return result[0]['comment_count'] if result else 0
+
+    def get_comment_counts(self, post_ids):
+        """複数の投稿のコメント数を1回のクエリで取得（{post_id: コメント数}）"""
+        post_ids = list(dict.fromkeys(post_ids))
+        if not post_ids:
+            return {}
+        placeholders = ", ".join(["%s"] * len(post_ids))
+        query = f"""
+        SELECT post_id, comment_count FROM posts
+        WHERE post_id IN ({placeholders})
+        """
+        counts = {post_id: 0 for post_id in post_ids}
+        for row in self.db.execute_query(query, tuple(post_ids)):
+            counts[row['post_id']] = row['comment_count']
+        return counts
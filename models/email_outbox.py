@@ -0,0 +1,125 @@
+from config.database import BaseModel
+from datetime import datetime, timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+
+class EmailOutbox(BaseModel):
+    """送信待ちメール（email_outbox）を管理する
+
+    呼び出し側は enqueue で登録するだけにし、実際のSMTP送信は
+    utils.email_worker.EmailOutboxWorker がバックグラウンドで行う。
+    失敗したメールは指数バックオフで再送し、上限を超えたら failed にする。
+    """
+
+    OUTBOX_CONFIG = {
+        "max_attempts": 8,            # これを超えたら failed
+        "base_backoff_seconds": 30,   # 1回目の再送までの待ち時間（以降2倍ずつ）
+        "max_backoff_seconds": 3600,  # 再送間隔の上限
+        "lock_timeout_seconds": 600,  # sending のまま残った行を pending に戻すまでの時間
+    }
+
+    def __init__(self):
+        super().__init__()
+
+    def enqueue(self, to_email, subject, body):
+        """メールを送信待ちに登録し、outbox_id を返す"""
+        query = """
+        INSERT INTO email_outbox (to_email, subject, body, status, next_attempt_at, created_at)
+        VALUES (%s, %s, %s, 'pending', %s, %s)
+        """
+        now = datetime.now()
+        outbox_id = self.db.execute_update(query, (to_email, subject, body, now, now))
+
+        # 同じプロセスで送信ワーカーが動いていればすぐに起こす
+        from utils.email_worker import EmailOutboxWorker
+        EmailOutboxWorker.wake()
+        return outbox_id
+
+    def claim_due(self, limit=10):
+        """送信時刻になったメールを取得し、sending にする（他のワーカーとは重複しない）"""
+        query_select = """
+        SELECT outbox_id, to_email, subject, body, attempts
+        FROM email_outbox
+        WHERE status = 'pending' AND next_attempt_at <= %s
+        ORDER BY next_attempt_at
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+        """
+        now = datetime.now()
+
+        def work(cursor):
+            cursor.execute(query_select, (now, limit))
+            rows = cursor.fetchall()
+            if rows:
+                placeholders = ", ".join(["%s"] * len(rows))
+                cursor.execute(
+                    f"""
+                    UPDATE email_outbox
+                    SET status = 'sending', attempts = attempts + 1, locked_at = %s
+                    WHERE outbox_id IN ({placeholders})
+                    """,
+                    (now, *[row['outbox_id'] for row in rows])
+                )
+            for row in rows:
+                row['attempts'] += 1
+            return rows
+
+        return self.db.execute_in_transaction(work)
+
+    def mark_sent(self, outbox_id):
+        query = """
+        UPDATE email_outbox
+        SET status = 'sent', sent_at = %s, locked_at = NULL, last_error = NULL
+        WHERE outbox_id = %s
+        """
+        self.db.execute_update(query, (datetime.now(), outbox_id))
+
+    def backoff_seconds(self, attempts):
+        """attempts 回失敗した後の再送までの待ち時間"""
+        config = self.OUTBOX_CONFIG
+        return min(config["base_backoff_seconds"] * 2 ** (attempts - 1), config["max_backoff_seconds"])
+
+    def mark_failed(self, outbox_id, attempts, error, permanent=False):
+        """送信失敗を記録し、再送を予約する（上限を超えたか permanent なら failed）
+
+        戻り値は再送する場合 True
+        """
+        error = str(error)[:2000]
+        if permanent or attempts >= self.OUTBOX_CONFIG["max_attempts"]:
+            query = """
+            UPDATE email_outbox
+            SET status = 'failed', locked_at = NULL, last_error = %s
+            WHERE outbox_id = %s
+            """
+            self.db.execute_update(query, (error, outbox_id))
+            logger.error(f"Email {outbox_id} failed permanently after {attempts} attempts: {error}")
+            return False
+
+        next_attempt_at = datetime.now() + timedelta(seconds=self.backoff_seconds(attempts))
+        query = """
+        UPDATE email_outbox
+        SET status = 'pending', next_attempt_at = %s, locked_at = NULL, last_error = %s
+        WHERE outbox_id = %s
+        """
+        self.db.execute_update(query, (next_attempt_at, error, outbox_id))
+        logger.warning(f"Email {outbox_id} failed (attempt {attempts}), retrying at {next_attempt_at}: {error}")
+        return True
+
+    def release_stale(self):
+        """送信中のまま止まった行（ワーカーの異常終了など）を pending に戻す"""
+        query = """
+        UPDATE email_outbox
+        SET status = 'pending', locked_at = NULL
+        WHERE status = 'sending' AND locked_at < %s
+        """
+        cutoff = datetime.now() - timedelta(seconds=self.OUTBOX_CONFIG["lock_timeout_seconds"])
+        return self.db.execute_update(query, (cutoff,))
+
+    def next_due_at(self):
+        """次に送信時刻になるメールの時刻（なければ None）"""
+        query = """
+        SELECT MIN(next_attempt_at) as next_at FROM email_outbox WHERE status = 'pending'
+        """
+        result = self.db.execute_query(query)
+        return result[0]['next_at'] if result else None
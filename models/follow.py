@@ -1,4 +1,7 @@
 from config.database import BaseModel
+from models.timeline import Timeline
+from models.user import User
+from utils.notification import FollowNotificationDigest
 import logging
 
 logger = logging.getLogger(__name__)
@@ -6,6 +9,24 @@ logger = logging.getLogger(__name__)
 class Follow(BaseModel):
     def __init__(self):
         super().__init__()
+        self.timeline_model = Timeline()
+
+    # フォローする側・される側の2行を1文で更新する（行ロックを主キー順に取りデッドロックを避ける）
+    # updated_at を明示的に据え置き、カウンタ更新でユーザーの更新日時が変わらないようにする
+    INCREMENT_COUNTS_QUERY = """
+    UPDATE users
+    SET follower_count = follower_count + (user_id = %s),
+        following_count = following_count + (user_id = %s),
+        updated_at = updated_at
+    WHERE user_id IN (%s, %s)
+    """
+    DECREMENT_COUNTS_QUERY = """
+    UPDATE users
+    SET follower_count = GREATEST(follower_count - (user_id = %s), 0),
+        following_count = GREATEST(following_count - (user_id = %s), 0),
+        updated_at = updated_at
+    WHERE user_id IN (%s, %s)
+    """
 
     def follow_user(self, follower_id, followed_id):
         """ユーザーをフォローする"""
@@ -13,20 +34,42 @@ class Follow(BaseModel):
         INSERT INTO follows (follower_id, followed_id)
         VALUES (%s, %s)
         """
+        counts_params = (followed_id, follower_id, followed_id, follower_id)
+
+        def work(cursor):
+            cursor.execute(query, (follower_id, followed_id))
+            cursor.execute(self.INCREMENT_COUNTS_QUERY, counts_params)
+            if Timeline.is_enabled():
+                self.timeline_model.backfill_follow(cursor, follower_id, followed_id)
+
         try:
-            self.db.execute_update(query, (follower_id, followed_id))
+            self.db.execute_in_transaction(work)
         except Exception as e:
             raise ValueError(f"フォローに失敗しました: {e}")
+        # キャッシュしているフォロワー数・フォロー数を無効化
+        User.cache.invalidate(follower_id, followed_id)
 
     def unfollow_user(self, follower_id, followed_id):
         """ユーザーのフォローを解除する"""
         query = """
         DELETE FROM follows WHERE follower_id = %s AND followed_id = %s
         """
+        counts_params = (followed_id, follower_id, followed_id, follower_id)
+
+        def work(cursor):
+            # 実際に削除できた場合のみカウンタを減らす
+            if cursor.execute(query, (follower_id, followed_id)):
+                cursor.execute(self.DECREMENT_COUNTS_QUERY, counts_params)
+                if Timeline.is_enabled():
+                    self.timeline_model.prune_follow(cursor, follower_id, followed_id)
+
         try:
-            self.db.execute_update(query, (follower_id, followed_id))
+            self.db.execute_in_transaction(work)
         except Exception as e:
             raise ValueError(f"フォロー解除に失敗しました: {e}")
+        User.cache.invalidate(follower_id, followed_id)
+        # まだ送っていないフォロー通知から取り除く
+        FollowNotificationDigest.notify_unfollow(follower_id, followed_id)
 
     def get_followers(self, user_id):
         """フォロワーの一覧を取得する"""
@@ -72,8 +115,8 @@ class Follow(BaseModel):
     def get_follower_count(self, user_id):
         """フォロワー数を取得する"""
         query = """
-        SELECT COUNT(*) as count FROM follows
-        WHERE followed_id = %s
+        SELECT follower_count as count FROM users
+        WHERE user_id = %s
         """
         try:
             result = self.db.execute_query(query, (user_id,))
@@ -85,12 +128,54 @@ class Follow(BaseModel):
     def get_following_count(self, user_id):
         """フォロー中のユーザー数を取得する"""
         query = """
-        SELECT COUNT(*) as count FROM follows
-        WHERE follower_id = %s
+        SELECT following_count as count FROM users
+        WHERE user_id = %s
         """
         try:
             result = self.db.execute_query(query, (user_id,))
             return result[0]['count'] if result else 0
         except Exception as e:
             print(f"Error getting following count: {e}")
-            return 0
\ No newline at end of file
+            return 0
+
+    def reconcile_counters(self, batch_size=1000):
+        """users のフォロワー数・フォロー数を follows から再計算し、ずれを修正する
+
+        user_id の範囲ごとにバッチで処理し、修正した行数を返す
+        """
+        query_range = "SELECT MIN(user_id) as min_id, MAX(user_id) as max_id FROM users"
+        query_fix = """
+        UPDATE users u
+        LEFT JOIN (
+            SELECT followed_id, COUNT(*) as n FROM follows
+            WHERE followed_id BETWEEN %s AND %s
+            GROUP BY followed_id
+        ) fr ON fr.followed_id = u.user_id
+        LEFT JOIN (
+            SELECT follower_id, COUNT(*) as n FROM follows
+            WHERE follower_id BETWEEN %s AND %s
+            GROUP BY follower_id
+        ) fg ON fg.follower_id = u.user_id
+        SET u.follower_count = COALESCE(fr.n, 0),
+            u.following_count = COALESCE(fg.n, 0),
+            u.updated_at = u.updated_at
+        WHERE u.user_id BETWEEN %s AND %s
+          AND (u.follower_count <> COALESCE(fr.n, 0) OR u.following_count <> COALESCE(fg.n, 0))
+        """
+        bounds = self.db.execute_query(query_range)
+        if not bounds or bounds[0]['min_id'] is None:
+            return 0
+
+        fixed = 0
+        start = bounds[0]['min_id']
+        max_id = bounds[0]['max_id']
+        while start <= max_id:
+            end = start + batch_size - 1
+            fixed += self.db.execute_in_transaction(
+                lambda cursor: cursor.execute(query_fix, (start, end) * 3)
+            )
+            start = end + 1
+        if fixed:
+            logger.warning(f"Reconciled follow counters for {fixed} users")
+            User.cache.clear()
+        return fixed
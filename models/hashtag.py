@@ -0,0 +1,91 @@
+from config.database import BaseModel
+from utils.hashtag import extract_hashtags
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Hashtag(BaseModel):
+    def __init__(self):
+        super().__init__()
+
+    def index_post(self, cursor, post_id, content, created_at, replace=False):
+        """投稿のハッシュタグを hashtags / post_hashtags に登録する
+
+        呼び出し側のトランザクション内で使うため cursor を受け取り、登録したタグの一覧を返す。
+        replace=True の場合は既存の紐付けを削除してから登録し直し（投稿の更新用）、
+        (外れたタグ, 新しく付いたタグ) を返す
+        """
+        tags = extract_hashtags(content)
+        if replace:
+            cursor.execute("""
+                SELECT h.tag_name FROM post_hashtags ph
+                JOIN hashtags h ON h.hashtag_id = ph.hashtag_id
+                WHERE ph.post_id = %s
+            """, (post_id,))
+            old_tags = [row['tag_name'] for row in cursor.fetchall()]
+            cursor.execute("DELETE FROM post_hashtags WHERE post_id = %s", (post_id,))
+            self._insert_tags(cursor, post_id, tags, created_at)
+            return (
+                [tag for tag in old_tags if tag not in tags],
+                [tag for tag in tags if tag not in old_tags],
+            )
+
+        self._insert_tags(cursor, post_id, tags, created_at)
+        return tags
+
+    def _insert_tags(self, cursor, post_id, tags, created_at):
+        if not tags:
+            return
+
+        placeholders = ", ".join(["%s"] * len(tags))
+        values = ", ".join(["(%s)"] * len(tags))
+        cursor.execute(
+            f"INSERT INTO hashtags (tag_name) VALUES {values} "
+            f"ON DUPLICATE KEY UPDATE tag_name = tag_name",
+            tuple(tags)
+        )
+        cursor.execute(
+            f"SELECT hashtag_id FROM hashtags WHERE tag_name IN ({placeholders})",
+            tuple(tags)
+        )
+        hashtag_ids = [row['hashtag_id'] for row in cursor.fetchall()]
+
+        # post_hashtags.created_at は投稿日時に揃える（トレンド集計の時間軸になる）
+        values = ", ".join(["(%s, %s, %s)"] * len(hashtag_ids))
+        params = []
+        for hashtag_id in hashtag_ids:
+            params.extend((post_id, hashtag_id, created_at))
+        cursor.execute(
+            f"INSERT IGNORE INTO post_hashtags (post_id, hashtag_id, created_at) VALUES {values}",
+            tuple(params)
+        )
+
+    def backfill(self, batch_size=500):
+        """既存の投稿をすべて走査し、ハッシュタグの紐付けを作り直す
+
+        post_id 順にバッチで処理し、処理した投稿数を返す
+        """
+        query = """
+        SELECT post_id, content, created_at FROM posts
+        WHERE post_id > %s
+        ORDER BY post_id
+        LIMIT %s
+        """
+        last_post_id = 0
+        processed = 0
+        while True:
+            posts = self.db.execute_query(query, (last_post_id, batch_size))
+            if not posts:
+                break
+
+            def work(cursor):
+                for post in posts:
+                    self.index_post(
+                        cursor, post['post_id'], post['content'], post['created_at'], replace=True
+                    )
+
+            self.db.execute_in_transaction(work)
+            processed += len(posts)
+            last_post_id = posts[-1]['post_id']
+            logger.info(f"Indexed hashtags for {processed} posts (last post_id: {last_post_id})")
+        return processed
@@ -6,31 +6,75 @@ class Like(BaseModel):
 
     def toggle_like(self, user_id, post_id):
         """いいねの切り替え"""
-        query_check = """
-        SELECT * FROM likes WHERE user_id = %s AND post_id = %s
-        """
         query_add = """
         INSERT INTO likes (user_id, post_id) VALUES (%s, %s)
         """
         query_remove = """
         DELETE FROM likes WHERE user_id = %s AND post_id = %s
         """
-        
-        try:
-            result = self.db.execute_query(query_check, (user_id, post_id))
-            if result:
-                self.db.execute_update(query_remove, (user_id, post_id))
+        # updated_at を明示的に据え置き、カウンタ更新で投稿の更新日時が変わらないようにする
+        query_increment = """
+        UPDATE posts SET like_count = like_count + 1, updated_at = updated_at
+        WHERE post_id = %s
+        """
+        query_decrement = """
+        UPDATE posts SET like_count = GREATEST(like_count - 1, 0), updated_at = updated_at
+        WHERE post_id = %s
+        """
+
+        def work(cursor):
+            # 削除できた場合は取り消し、できなかった場合は追加（カウンタも同じトランザクションで更新）
+            if cursor.execute(query_remove, (user_id, post_id)):
+                cursor.execute(query_decrement, (post_id,))
                 return False  # いいねを取り消した
-            else:
-                self.db.execute_update(query_add, (user_id, post_id))
-                return True  # いいねを追加した
+            cursor.execute(query_add, (user_id, post_id))
+            cursor.execute(query_increment, (post_id,))
+            return True  # いいねを追加した
+
+        try:
+            return self.db.execute_in_transaction(work)
         except Exception as e:
             raise ValueError(f"いいねの切り替えに失敗しました: {e}")
 
     def get_like_count(self, post_id):
         """特定の投稿のいいね数を取得"""
         query = """
-        SELECT COUNT(*) as like_count FROM likes WHERE post_id = %s
+        SELECT like_count FROM posts WHERE post_id = %s
         """
         result = self.db.execute_query(query, (post_id,))
-        return result[0]['like_count'] if result else 0
\ No newline at end of file
+        return result[0]['like_count'] if result else 0
+
+    def get_like_counts(self, post_ids):
+        """複数の投稿のいいね数を1回のクエリで取得（{post_id: いいね数}）"""
+        post_ids = list(dict.fromkeys(post_ids))
+        if not post_ids:
+            return {}
+        placeholders = ", ".join(["%s"] * len(post_ids))
+        query = f"""
+        SELECT post_id, like_count FROM posts
+        WHERE post_id IN ({placeholders})
+        """
+        counts = {post_id: 0 for post_id in post_ids}
+        for row in self.db.execute_query(query, tuple(post_ids)):
+            counts[row['post_id']] = row['like_count']
+        return counts
+
+    def get_liked_post_ids(self, user_id, post_ids):
+        """指定した投稿のうち、ユーザーがいいね済みの投稿IDを1回のクエリで取得"""
+        post_ids = list(dict.fromkeys(post_ids))
+        if not post_ids:
+            return set()
+        placeholders = ", ".join(["%s"] * len(post_ids))
+        query = f"""
+        SELECT post_id FROM likes
+        WHERE user_id = %s AND post_id IN ({placeholders})
+        """
+        rows = self.db.execute_query(query, (user_id, *post_ids))
+        return {row['post_id'] for row in rows}
+
+    def mark_liked(self, user_id, posts):
+        """投稿の辞書に、ユーザーがいいね済みかどうか（liked）を設定して返す"""
+        liked_ids = self.get_liked_post_ids(user_id, [post['post_id'] for post in posts])
+        for post in posts:
+            post['liked'] = post['post_id'] in liked_ids
+        return posts
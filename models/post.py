@@ -1,14 +1,39 @@
 from datetime import datetime
 from config.database import BaseModel
+from models.hashtag import Hashtag
+from models.timeline import Timeline
+from utils.hashtag import normalize_hashtag
+from utils.trending import TrendingHashtags
+import base64
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CURSOR_TIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+
+def encode_timeline_cursor(created_at, post_id):
+    """(created_at, post_id) を不透明なカーソル文字列に変換"""
+    raw = f"{created_at.strftime(CURSOR_TIME_FORMAT)}|{post_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_timeline_cursor(cursor):
+    """カーソル文字列を (created_at, post_id) に戻す"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, post_id = raw.split('|')
+        return datetime.strptime(created_at, CURSOR_TIME_FORMAT), int(post_id)
+    except Exception:
+        raise ValueError(f"不正なカーソルです: {cursor}")
+
 
 class Post(BaseModel):
     def __init__(self):
         super().__init__()
+        self.hashtag_model = Hashtag()
+        self.timeline_model = Timeline()
 
     def create_post(self, user_id, content):
         """新規投稿の作成"""
@@ -17,8 +42,20 @@ class Post(BaseModel):
         VALUES (%s, %s, %s)
         """
         created_at = datetime.now()
+
+        def work(cursor):
+            cursor.execute(query, (user_id, content, created_at))
+            post_id = cursor.lastrowid
+            # ハッシュタグの登録・タイムラインへの書き込みも同じトランザクションで行う
+            tags = self.hashtag_model.index_post(cursor, post_id, content, created_at)
+            if Timeline.is_enabled():
+                self.timeline_model.fan_out(cursor, user_id, post_id, created_at)
+            return post_id, tags
+
         try:
-            post_id = self.db.execute_update(query, (user_id, content, created_at))
+            post_id, tags = self.db.execute_in_transaction(work)
+            # コミット後にトレンドへ反映
+            TrendingHashtags.notify_post(tags, created_at)
             return self.get_post(post_id)
         except Exception as e:
             raise ValueError(f"投稿の作成に失敗しました: {e}")
@@ -36,17 +73,21 @@ class Post(BaseModel):
 
     def get_timeline_posts(self, user_id):
         """タイムラインの投稿を取得（フォロー中のユーザーと自分の投稿）"""
+        if Timeline.is_enabled():
+            try:
+                return self._get_materialized_timeline(user_id)
+            except Exception as e:
+                logging.error(f"Error getting timeline posts: {e}")
+                return []
+
+        # いいね数・コメント数は posts のカウンタ列（p.like_count, p.comment_count）に含まれる
         query = """
         SELECT 
             p.*,
             u.username,
-            COUNT(DISTINCT l.user_id) as like_count,
-            COUNT(DISTINCT c.comment_id) as comment_count,
             u.user_id as author_id
         FROM posts p
         JOIN users u ON p.user_id = u.user_id
-        LEFT JOIN likes l ON p.post_id = l.post_id
-        LEFT JOIN comments c ON p.post_id = c.post_id
         WHERE p.user_id IN (
             -- フォロー中のユーザーのID
             SELECT followed_id 
@@ -56,7 +97,6 @@ class Post(BaseModel):
             -- 自分のID
             SELECT %s
         )
-        GROUP BY p.post_id, p.user_id, p.content, p.created_at, u.username, u.user_id
         ORDER BY p.created_at DESC
         """
         
@@ -68,16 +108,139 @@ class Post(BaseModel):
             logging.error(f"Error getting timeline posts: {e}")
             return []
 
+    def get_timeline_page(self, user_id, cursor=None, limit=20):
+        """タイムラインを1ページ分取得（(created_at, post_id) のキーセットページング）
+
+        戻り値は {'posts': [...], 'next_cursor': 次ページのカーソル or None}
+        """
+        cursor_key = decode_timeline_cursor(cursor) if cursor else None
+
+        # 次ページの有無を判定するため1件多く取得
+        try:
+            if Timeline.is_enabled():
+                rows = self._get_materialized_timeline(user_id, cursor_key, limit + 1)
+            else:
+                cursor_clause, cursor_params = self._cursor_clause('p', cursor_key)
+                # (user_id, created_at) インデックスでページ分だけを範囲走査する
+                # いいね数・コメント数は posts のカウンタ列に含まれる
+                query = f"""
+                SELECT 
+                    p.*,
+                    u.username,
+                    u.user_id as author_id
+                FROM posts p
+                JOIN users u ON p.user_id = u.user_id
+                WHERE p.user_id IN (
+                    SELECT followed_id 
+                    FROM follows 
+                    WHERE follower_id = %s
+                    UNION
+                    SELECT %s
+                )
+                {cursor_clause}
+                ORDER BY p.created_at DESC, p.post_id DESC
+                LIMIT %s
+                """
+                params = (user_id, user_id) + cursor_params + (limit + 1,)
+                rows = self.db.execute_query(query, params)
+        except Exception as e:
+            logging.error(f"Error getting timeline page: {e}")
+            return {'posts': [], 'next_cursor': None}
+
+        posts = list(rows[:limit])
+        next_cursor = None
+        if len(rows) > limit:
+            last = posts[-1]
+            next_cursor = encode_timeline_cursor(last['created_at'], last['post_id'])
+        logging.debug(f"Retrieved {len(posts)} posts for timeline page")
+        return {'posts': posts, 'next_cursor': next_cursor}
+
+    @staticmethod
+    def _cursor_clause(alias, cursor_key):
+        """キーセットページングの条件句とパラメータを作成"""
+        if not cursor_key:
+            return "", ()
+        cursor_time, cursor_post_id = cursor_key
+        clause = f"""
+            AND ({alias}.created_at < %s OR ({alias}.created_at = %s AND {alias}.post_id < %s))
+        """
+        return clause, (cursor_time, cursor_time, cursor_post_id)
+
+    def _get_materialized_timeline(self, user_id, cursor_key=None, limit=None):
+        """timeline_entries の範囲走査に、フォロワーの多い投稿者の投稿を読み込み時に合流させる"""
+        entry_clause, entry_params = self._cursor_clause('te', cursor_key)
+        post_clause, post_params = self._cursor_clause('p', cursor_key)
+        limit_clause = "LIMIT %s" if limit else ""
+        limit_params = (limit,) if limit else ()
+
+        query = f"""
+        SELECT 
+            p.*,
+            u.username,
+            u.user_id as author_id
+        FROM (
+            (
+                SELECT p.*
+                FROM timeline_entries te
+                JOIN posts p ON p.post_id = te.post_id
+                WHERE te.user_id = %s
+                {entry_clause}
+                ORDER BY te.created_at DESC, te.post_id DESC
+                {limit_clause}
+            )
+            UNION
+            (
+                -- fan-out-on-write の対象外（フォロワー上限超え）の投稿者
+                SELECT p.*
+                FROM posts p
+                WHERE p.user_id IN (
+                    SELECT f.followed_id
+                    FROM follows f
+                    JOIN users a ON a.user_id = f.followed_id
+                    WHERE f.follower_id = %s AND a.follower_count > %s
+                )
+                {post_clause}
+                ORDER BY p.created_at DESC, p.post_id DESC
+                {limit_clause}
+            )
+        ) p
+        JOIN users u ON p.user_id = u.user_id
+        ORDER BY p.created_at DESC, p.post_id DESC
+        {limit_clause}
+        """
+        params = (
+            (user_id,) + entry_params + limit_params
+            + (user_id, Timeline.fanout_follower_limit()) + post_params + limit_params
+            + limit_params
+        )
+        return self.db.execute_query(query, params)
+
     def update_post(self, post_id, content):
         """投稿の更新"""
         query = """
         UPDATE posts SET content = %s, updated_at = %s WHERE post_id = %s
         """
         updated_at = datetime.now()
+
+        def work(cursor):
+            cursor.execute(query, (content, updated_at, post_id))
+            cursor.execute("SELECT created_at FROM posts WHERE post_id = %s", (post_id,))
+            post = cursor.fetchone()
+            if not post:
+                return None
+            removed, added = self.hashtag_model.index_post(
+                cursor, post_id, content, post['created_at'], replace=True
+            )
+            return removed, added, post['created_at']
+
         try:
-            self.db.execute_update(query, (content, updated_at, post_id))
+            changed = self.db.execute_in_transaction(work)
         except Exception as e:
             raise ValueError(f"投稿の更新に失敗しました: {e}")
+        # コミット後にトレンドへ反映（外れたタグを減らし、付いたタグを増やす）
+        if changed:
+            removed, added, created_at = changed
+            TrendingHashtags.notify_post_update(added, removed, created_at)
 
     def get_user_posts(self, user_id):
         """特定のユーザーの投稿を取得"""
@@ -93,22 +256,23 @@ class Post(BaseModel):
     def search_posts_by_hashtag(self, hashtag):
         """ハッシュタグで投稿を検索"""
         try:
-            # クエリの修正：タイムスタンプでソート
+            # post_hashtags を使った索引検索（#tag で #tagging が一致しない）
             query = """
                 SELECT 
                     p.*,
                     u.username,
                     u.user_id,
                     p.created_at
-                FROM posts p
+                FROM hashtags h
+                JOIN post_hashtags ph ON ph.hashtag_id = h.hashtag_id
+                JOIN posts p ON p.post_id = ph.post_id
                 JOIN users u ON p.user_id = u.user_id
-                WHERE p.content LIKE %s
+                WHERE h.tag_name = %s
                 ORDER BY p.created_at DESC
             """
             
-            # ハッシュタグの検索条件を調整
-            search_term = f"%{hashtag}%"
-            results = self.db.execute_query(query, (search_term,))
+            tag_name = normalize_hashtag(hashtag)
+            results = self.db.execute_query(query, (tag_name,))
             
             logging.info(f"Hashtag search for {hashtag}: Found {len(results)} posts")
             return results
@@ -117,6 +281,55 @@ class Post(BaseModel):
             logging.error(f"ハッシュタグ検索中にエラーが発生しました: {e}")
             raise Exception(f"ハッシュタグ検索中にエラーが発生しました: {e}")
     
+    def get_trending_hashtags(self, limit=10):
+        """トレンドのハッシュタグを取得（メモリ上の集計から返す）"""
+        try:
+            return TrendingHashtags.get_instance().top(limit)
+        except Exception as e:
+            logging.error(f"Error getting trending hashtags: {e}")
+            return []
+
     def get_following_posts(self, user_id):
         """フォロー中のユーザーと自分の投稿を取得"""
-        return self.get_timeline_posts(user_id)
\ No newline at end of file
+        return self.get_timeline_posts(user_id)
+
+    def reconcile_counters(self, batch_size=1000):
+        """posts のいいね数・コメント数を likes / comments から再計算し、ずれを修正する
+
+        post_id の範囲ごとにバッチで処理し、修正した行数を返す
+        """
+        query_range = "SELECT MIN(post_id) as min_id, MAX(post_id) as max_id FROM posts"
+        query_fix = """
+        UPDATE posts p
+        LEFT JOIN (
+            SELECT post_id, COUNT(*) as n FROM likes
+            WHERE post_id BETWEEN %s AND %s
+            GROUP BY post_id
+        ) l ON l.post_id = p.post_id
+        LEFT JOIN (
+            SELECT post_id, COUNT(*) as n FROM comments
+            WHERE post_id BETWEEN %s AND %s
+            GROUP BY post_id
+        ) c ON c.post_id = p.post_id
+        SET p.like_count = COALESCE(l.n, 0),
+            p.comment_count = COALESCE(c.n, 0),
+            p.updated_at = p.updated_at
+        WHERE p.post_id BETWEEN %s AND %s
+          AND (p.like_count <> COALESCE(l.n, 0) OR p.comment_count <> COALESCE(c.n, 0))
+        """
+        bounds = self.db.execute_query(query_range)
+        if not bounds or bounds[0]['min_id'] is None:
+            return 0
+
+        fixed = 0
+        start = bounds[0]['min_id']
+        max_id = bounds[0]['max_id']
+        while start <= max_id:
+            end = start + batch_size - 1
+            fixed += self.db.execute_in_transaction(
+                lambda cursor: cursor.execute(query_fix, (start, end) * 3)
+            )
+            start = end + 1
+        if fixed:
+            logging.warning(f"Reconciled like/comment counters for {fixed} posts")
+        return fixed
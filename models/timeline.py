@@ -0,0 +1,136 @@
+from config.database import BaseModel
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Timeline(BaseModel):
+    """ホームタイムラインの実体化（timeline_entries）を管理する
+
+    投稿時にフォロワーのタイムラインへ書き込み（fan-out-on-write）、
+    フォロー/フォロー解除時に過去の投稿を補充・削除する。
+    フォロワーが多すぎる投稿者は書き込みを行わず、読み込み時に合流させる（fan-out-on-read）。
+    """
+
+    TIMELINE_CONFIG = {
+        "materialized": False,          # Trueで timeline_entries を使う
+        "fanout_follower_limit": 1000,  # これを超えるフォロワーを持つ投稿者は読み込み時に合流
+        "backfill_limit": 200,          # フォロー時に補充する投稿数
+    }
+
+    def __init__(self):
+        super().__init__()
+
+    @classmethod
+    def is_enabled(cls):
+        return cls.TIMELINE_CONFIG["materialized"]
+
+    @classmethod
+    def fanout_follower_limit(cls):
+        return cls.TIMELINE_CONFIG["fanout_follower_limit"]
+
+    def fan_out(self, cursor, author_id, post_id, created_at):
+        """新規投稿を投稿者本人とフォロワーのタイムラインに書き込む（呼び出し側のトランザクション内）"""
+        cursor.execute(
+            "SELECT follower_count FROM users WHERE user_id = %s",
+            (author_id,)
+        )
+        author = cursor.fetchone()
+        follower_count = author['follower_count'] if author else 0
+
+        if follower_count > self.fanout_follower_limit():
+            # フォロワーの多い投稿者は本人のタイムラインのみ（フォロワー側は読み込み時に合流）
+            cursor.execute(
+                "INSERT IGNORE INTO timeline_entries (user_id, post_id, created_at) VALUES (%s, %s, %s)",
+                (author_id, post_id, created_at)
+            )
+            return 1
+
+        return cursor.execute(
+            """
+            INSERT IGNORE INTO timeline_entries (user_id, post_id, created_at)
+            SELECT follower_id, %s, %s FROM follows WHERE followed_id = %s
+            UNION ALL
+            SELECT %s, %s, %s
+            """,
+            (post_id, created_at, author_id, author_id, post_id, created_at)
+        )
+
+    def backfill_follow(self, cursor, follower_id, followed_id):
+        """フォローしたユーザーの最近の投稿をタイムラインに補充する"""
+        cursor.execute(
+            "SELECT follower_count FROM users WHERE user_id = %s",
+            (followed_id,)
+        )
+        followed = cursor.fetchone()
+        if followed and followed['follower_count'] > self.fanout_follower_limit():
+            return 0
+        return cursor.execute(
+            """
+            INSERT IGNORE INTO timeline_entries (user_id, post_id, created_at)
+            SELECT %s, post_id, created_at FROM posts
+            WHERE user_id = %s
+            ORDER BY created_at DESC
+            LIMIT %s
+            """,
+            (follower_id, followed_id, self.TIMELINE_CONFIG["backfill_limit"])
+        )
+
+    def prune_follow(self, cursor, follower_id, followed_id):
+        """フォロー解除したユーザーの投稿をタイムラインから取り除く"""
+        return cursor.execute(
+            """
+            DELETE te FROM timeline_entries te
+            JOIN posts p ON p.post_id = te.post_id
+            WHERE te.user_id = %s AND p.user_id = %s
+            """,
+            (follower_id, followed_id)
+        )
+
+    def rebuild(self, batch_size=100):
+        """全ユーザーのタイムラインを follows / posts から作り直す（実体化を有効にする際に使う）
+
+        ユーザーごとに自分とフォロー中（フォロワー上限以下）の最近の投稿を補充し、処理したユーザー数を返す
+        """
+        query_users = """
+        SELECT user_id FROM users
+        WHERE user_id > %s
+        ORDER BY user_id
+        LIMIT %s
+        """
+        query_fill = """
+        INSERT IGNORE INTO timeline_entries (user_id, post_id, created_at)
+        SELECT %s, p.post_id, p.created_at
+        FROM posts p
+        WHERE p.user_id IN (
+            SELECT f.followed_id
+            FROM follows f
+            JOIN users a ON a.user_id = f.followed_id
+            WHERE f.follower_id = %s AND a.follower_count <= %s
+            UNION
+            SELECT %s
+        )
+        ORDER BY p.created_at DESC
+        LIMIT %s
+        """
+        limit = self.fanout_follower_limit()
+        backfill_limit = self.TIMELINE_CONFIG["backfill_limit"]
+        last_user_id = 0
+        processed = 0
+        while True:
+            users = self.db.execute_query(query_users, (last_user_id, batch_size))
+            if not users:
+                break
+
+            def work(cursor):
+                for user in users:
+                    user_id = user['user_id']
+                    cursor.execute(
+                        query_fill,
+                        (user_id, user_id, limit, user_id, backfill_limit)
+                    )
+
+            self.db.execute_in_transaction(work)
+            processed += len(users)
+            last_user_id = users[-1]['user_id']
+            logger.info(f"Rebuilt timelines for {processed} users")
+        return processed
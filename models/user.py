@@ -1,30 +1,108 @@
-import bcrypt
 from config.database import BaseModel
+from utils.password_hasher import PasswordHasher
 import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-import mysql.connector
-from mysql.connector import Error
 
 logging.basicConfig(level=logging.DEBUG)  # デバッグレベルに変更
 logger = logging.getLogger(__name__)
 
+# キャッシュ・画面表示用に取得する列（password_hash, salt, 認証コードなどは含めない）
+PUBLIC_USER_COLUMNS = """
+    user_id, username, email, profile_image_path, created_at, updated_at,
+    is_active, is_email_verified, follower_count, following_count
+"""
+
+class UserCache:
+    """サニタイズ済みのユーザー情報を user_id ごとに保持する LRU + TTL キャッシュ
+
+    ワーカースレッドからも使われるためロックで保護する。
+    DBから読み込んでいる間に無効化された場合、読み込んだ古い値は登録しない（世代番号で判定）。
+    """
+
+    def __init__(self, max_size=1000, ttl_seconds=60, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries = OrderedDict()  # user_id -> (有効期限, ユーザー)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def get(self, user_id):
+        """キャッシュ済みのユーザーを取得（なければ None）"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] <= self.clock():
+                del self._entries[user_id]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return dict(entry[1])
+
+    def put(self, user, generation=None):
+        """ユーザーを登録（generation が読み込み開始時から変わっていれば登録しない）"""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[user['user_id']] = (self.clock() + self.ttl_seconds, dict(user))
+            self._entries.move_to_end(user['user_id'])
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *user_ids):
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
 class User(BaseModel):
+    USER_CACHE_CONFIG = {
+        "max_size": 1000,     # 保持するユーザー数
+        "ttl_seconds": 60,    # 保持する秒数
+    }
+
+    # 全インスタンスで共有するキャッシュ
+    cache = UserCache(**USER_CACHE_CONFIG)
+
     def __init__(self):
         super().__init__()
 
+    @classmethod
+    def cache_stats(cls):
+        """ユーザーキャッシュのヒット数・ミス数などを取得"""
+        return cls.cache.stats()
+
     def hash_password(self, password):
-        """パスワードをbcryptでハッシュ化し、ハッシュとソルトを生成"""
-        # パスワードをバイト列に変換
-        password_bytes = password.encode('utf-8')
-        # ソルトを生成
-        salt = bcrypt.gensalt()
-        # ハッシュ化
-        password_hash = bcrypt.hashpw(password_bytes, salt)
-        
-        return {
-            'password_hash': password_hash.decode('utf-8'),
-            'salt': salt.decode('utf-8')
-        }
+        """パスワードをbcryptでハッシュ化し、ハッシュとソルトを生成（プロセスプールで実行）"""
+        return PasswordHasher.get_instance().hash(password)
         
     def create_user(self, username, email, password, activation_code=None):
         """ユーザーを作成"""
@@ -61,24 +139,15 @@ class User(BaseModel):
     def verify_password(self, user_id, provided_password):
         """パスワードを検証"""
         try:
-            # ユーザーのパスワードハッシュとソルトを取得
-            query = "SELECT password_hash, salt FROM users WHERE user_id = %s"
+            # ユーザーのパスワードハッシュを取得（ソルトはハッシュに含まれる）
+            query = "SELECT password_hash FROM users WHERE user_id = %s"
             result = self.db.execute_query(query, (user_id,))
             
             if not result:
                 return False
                 
             stored_hash = result[0]['password_hash']
-            stored_salt = result[0]['salt']
-            
-            # 提供されたパスワードをバイト列に変換
-            password_bytes = provided_password.encode('utf-8')
-            stored_hash_bytes = stored_hash.encode('utf-8')
-            stored_salt_bytes = stored_salt.encode('utf-8')
-            
-            # 提供されたパスワードをハッシュ化して比較
-            hashed = bcrypt.hashpw(password_bytes, stored_salt_bytes)
-            return hashed == stored_hash_bytes
+            return self._verify_password(provided_password, stored_hash)
         except Exception as e:
             logger.error(f"Error verifying password: {str(e)}")
             return False
@@ -112,26 +181,43 @@ class User(BaseModel):
         return bool(result)
 
     def _verify_password(self, password, stored_hash):
-        """パスワードの検証"""
-        try:
-            return bcrypt.checkpw(
-                password.encode('utf-8'),
-                stored_hash.encode('utf-8')
-            )
-        except Exception:
-            return False
+        """パスワードの検証（プロセスプールで実行）"""
+        return PasswordHasher.get_instance().verify(password, stored_hash)
 
     def get_user(self, user_id):
-        """特定のユーザーを取得"""
-        query = "SELECT * FROM users WHERE user_id = %s"
-        users = self.db.execute_query(query, (user_id,))
-        return users[0] if users else None
+        """特定のユーザーを取得（パスワード等を除いた情報、キャッシュを利用）"""
+        return self.get_users([user_id]).get(user_id)
+
+    def get_users(self, user_ids):
+        """複数のユーザーを取得（{user_id: ユーザー}、キャッシュにないものだけを1回のクエリで取得）"""
+        users = {}
+        misses = []
+        for user_id in dict.fromkeys(user_ids):
+            user = self.cache.get(user_id)
+            if user is None:
+                misses.append(user_id)
+            else:
+                users[user_id] = user
+        if not misses:
+            return users
+
+        generation = self.cache.generation
+        placeholders = ", ".join(["%s"] * len(misses))
+        query = f"SELECT {PUBLIC_USER_COLUMNS} FROM users WHERE user_id IN ({placeholders})"
+        for user in self.db.execute_query(query, tuple(misses)):
+            self.cache.put(user, generation)
+            users[user['user_id']] = user
+        return users
 
     def get_user_by_username(self, username):
-        """特定のユーザー名でユーザーを取得"""
-        query = "SELECT * FROM users WHERE username = %s"
+        """特定のユーザー名でユーザーを取得（パスワード等を除いた情報）"""
+        generation = self.cache.generation
+        query = f"SELECT {PUBLIC_USER_COLUMNS} FROM users WHERE username = %s"
         users = self.db.execute_query(query, (username,))
-        return users[0] if users else None
+        if not users:
+            return None
+        self.cache.put(users[0], generation)
+        return users[0]
 
     def search_users(self, query):
         """ユーザーの検索"""
@@ -145,20 +231,7 @@ class User(BaseModel):
         
     def get_user_by_id(self, user_id):
         """IDでユーザーを取得"""
-        connection = None
-        try:
-            connection = self.db.create_connection()
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT * FROM users WHERE user_id = %s", (user_id,))
-                user = cursor.fetchone()
-                if user:
-                    # セキュリティのため、センシティブな情報を削除
-                    del user['password_hash']
-                    del user['salt']
-                return user
-        finally:
-            if connection:
-                connection.close()
+        return self.get_user(user_id)
 
     def get_user_by_email(self, email):
         """メールアドレスでユーザーを取得"""
@@ -219,6 +292,7 @@ class User(BaseModel):
 
             query = f"UPDATE users SET {set_clause} WHERE user_id = %s"
             self.db.execute_update(query, values)
+            self.cache.invalidate(user_id)
 
             return True
 
@@ -227,45 +301,77 @@ class User(BaseModel):
             raise
 
     def delete_user(self, user_id):
-        """ユーザーとその関連データを削除"""
-        try:
-            # 関連データの削除（カスケード削除が設定されていない場合）
-            # いいねの削除
-            self.db.execute_update(
-                "DELETE FROM likes WHERE user_id = %s",
+        """ユーザーとその関連データを削除（カウンタの調整と削除を1つのトランザクションで行う）"""
+        def work(cursor):
+            # ユーザーの行をロックし、削除中にこのユーザーのいいね・コメント・フォローが増えないようにする
+            # （それらの INSERT は外部キーの確認で users の行を共有ロックするため待たされる）
+            cursor.execute("SELECT user_id FROM users WHERE user_id = %s FOR UPDATE", (user_id,))
+
+            # 削除するいいね・コメント・フォローの分だけ相手側のカウンタを減らす
+            cursor.execute(
+                """
+                UPDATE posts p
+                JOIN (SELECT post_id, COUNT(*) as n FROM likes WHERE user_id = %s GROUP BY post_id) x
+                  ON x.post_id = p.post_id
+                SET p.like_count = GREATEST(p.like_count - x.n, 0), p.updated_at = p.updated_at
+                """,
                 (user_id,)
             )
-            
-            # コメントの削除
-            self.db.execute_update(
-                "DELETE FROM comments WHERE user_id = %s",
+            cursor.execute(
+                """
+                UPDATE posts p
+                JOIN (SELECT post_id, COUNT(*) as n FROM comments WHERE user_id = %s GROUP BY post_id) x
+                  ON x.post_id = p.post_id
+                SET p.comment_count = GREATEST(p.comment_count - x.n, 0), p.updated_at = p.updated_at
+                """,
                 (user_id,)
             )
-            
+            cursor.execute(
+                """
+                UPDATE users u
+                JOIN follows f ON f.followed_id = u.user_id AND f.follower_id = %s
+                SET u.follower_count = GREATEST(u.follower_count - 1, 0), u.updated_at = u.updated_at
+                """,
+                (user_id,)
+            )
+            cursor.execute(
+                """
+                UPDATE users u
+                JOIN follows f ON f.follower_id = u.user_id AND f.followed_id = %s
+                SET u.following_count = GREATEST(u.following_count - 1, 0), u.updated_at = u.updated_at
+                """,
+                (user_id,)
+            )
+
+            # 関連データの削除（カスケード削除が設定されていない場合）
+            # いいねの削除
+            cursor.execute("DELETE FROM likes WHERE user_id = %s", (user_id,))
+
+            # コメントの削除
+            cursor.execute("DELETE FROM comments WHERE user_id = %s", (user_id,))
+
             # フォロー関係の削除
-            self.db.execute_update(
+            cursor.execute(
                 "DELETE FROM follows WHERE follower_id = %s OR followed_id = %s",
                 (user_id, user_id)
             )
-            
+
             # 投稿の削除（post_hashtagsはCASCADE設定済み）
-            self.db.execute_update(
-                "DELETE FROM posts WHERE user_id = %s",
-                (user_id,)
-            )
-            
+            cursor.execute("DELETE FROM posts WHERE user_id = %s", (user_id,))
+
             # ユーザーの削除
-            self.db.execute_update(
-                "DELETE FROM users WHERE user_id = %s",
-                (user_id,)
-            )
-            
+            cursor.execute("DELETE FROM users WHERE user_id = %s", (user_id,))
+
+        try:
+            self.db.execute_in_transaction(work)
+            # フォロー相手のカウンタも変わるためキャッシュ全体を無効化
+            self.cache.clear()
             return True
-                
+
         except Exception as e:
             logger.error(f"Error deleting user: {e}")
             raise
-        
+
     def is_username_taken(self, username):
         """指定されたユーザー名が既に使用されているかチェック"""
         try:
@@ -312,6 +418,7 @@ class User(BaseModel):
                 
             # 変更を確定
             connection.commit()
+            self.cache.invalidate(user_id)
             
             # 更新の確認
             verify_query = "SELECT user_id FROM users WHERE user_id = %s AND email_verification_code = %s"
@@ -406,6 +513,7 @@ class User(BaseModel):
                 raise Exception(f"ユーザーが見つかりません (ID: {user_id})")
                 
             connection.commit()
+            self.cache.invalidate(user_id)
             logger.info(f"Email verification status updated for user {user_id}")
             return True
             
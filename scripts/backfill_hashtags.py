@@ -0,0 +1,27 @@
+# scripts/backfill_hashtags.py
+# 使い方: python -m scripts.backfill_hashtags [--batch-size 500]
+import argparse
+import logging
+import sys
+
+from models.hashtag import Hashtag
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="既存の投稿からハッシュタグの索引（post_hashtags）を作成する")
+    parser.add_argument("--batch-size", type=int, default=500, help="1トランザクションで処理する投稿数")
+    args = parser.parse_args()
+
+    try:
+        processed = Hashtag().backfill(batch_size=args.batch_size)
+        print(f"{processed} 件の投稿のハッシュタグを登録しました")
+    except Exception as e:
+        logger.error(f"Hashtag backfill failed: {e}", exc_info=True)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
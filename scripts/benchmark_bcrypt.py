@@ -0,0 +1,76 @@
+# scripts/benchmark_bcrypt.py
+# 使い方: python -m scripts.benchmark_bcrypt [--target-ms 250] [--samples 5] [--concurrency 8]
+import argparse
+import statistics
+import sys
+import time
+
+import bcrypt
+
+from utils.password_hasher import PasswordHasher
+
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+PASSWORD = "benchmark-password"
+
+
+def measure_rounds(rounds, samples):
+    """指定したコストでのハッシュ化1回あたりの時間（ミリ秒、中央値）"""
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds=rounds))
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def choose_rounds(target_ms, samples):
+    """目標時間以内に収まる最大のコストを選ぶ（最低でも MIN_ROUNDS）"""
+    chosen = MIN_ROUNDS
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed = measure_rounds(rounds, samples)
+        print(f"rounds={rounds:2d}: {elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        chosen = rounds
+    return chosen
+
+
+def measure_pool_throughput(rounds, concurrency):
+    """プロセスプールで同時にハッシュ化したときの1秒あたりの処理数"""
+    hasher = PasswordHasher(rounds=rounds)
+    try:
+        # ワーカープロセスの起動時間を含めないよう先に1回実行する
+        hasher.hash(PASSWORD)
+        start = time.perf_counter()
+        futures = [hasher.hash_async(PASSWORD) for _ in range(concurrency)]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start
+    finally:
+        hasher.shutdown()
+    return concurrency / elapsed, hasher.max_workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="目標時間に合う bcrypt のコストを選ぶ")
+    parser.add_argument("--target-ms", type=float, default=250, help="ハッシュ化1回あたりの目標時間（ミリ秒）")
+    parser.add_argument("--samples", type=int, default=5, help="コストごとの測定回数")
+    parser.add_argument("--concurrency", type=int, default=8, help="スループット測定で同時に投入する数（0で省略）")
+    args = parser.parse_args()
+
+    try:
+        rounds = choose_rounds(args.target_ms, args.samples)
+        print(f"\n目標 {args.target_ms:.0f} ms 以内の最大コスト: {rounds}")
+
+        if args.concurrency > 0:
+            throughput, workers = measure_pool_throughput(rounds, args.concurrency)
+            print(f"プロセスプール（{workers} ワーカー）: {throughput:.1f} 回/秒")
+
+        print(f"\n.env に設定: BCRYPT_ROUNDS={rounds}")
+    except KeyboardInterrupt:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
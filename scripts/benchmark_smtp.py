@@ -0,0 +1,91 @@
+# scripts/benchmark_smtp.py
+# 使い方: python -m scripts.benchmark_smtp [--messages 200] [--batch-size 10]
+# ローカルで起動した aiosmtpd（pip install aiosmtpd）に送信し、
+# 1通ごとに接続する場合と、1つのセッションでまとめて送る場合の送信速度を比べる
+import argparse
+import sys
+import time
+
+from aiosmtpd.controller import Controller
+
+from utils.email_sender import EmailSender
+
+HOST = "127.0.0.1"
+
+
+class CountingHandler:
+    """受け取ったメールを数えるだけのSMTPサーバー"""
+
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def make_messages(count):
+    return [
+        (f"user{i}@example.com", "ベンチマーク", f"テストメール {i}\n")
+        for i in range(count)
+    ]
+
+
+def create_sender(port):
+    # ローカルのサーバーは STARTTLS・認証なし（ユーザー名とパスワードは設定チェック用）
+    return EmailSender(HOST, port, "bench@example.com", "unused", use_tls=False, use_auth=False)
+
+
+def bench_connect_per_message(port, messages):
+    """従来の送り方: 1通ごとに接続・送信・切断"""
+    sender = create_sender(port)
+    start = time.perf_counter()
+    for to_email, subject, body in messages:
+        sender.send_email(to_email, subject, body)
+        sender.close()
+    return time.perf_counter() - start
+
+
+def bench_send_many(port, messages, batch_size):
+    """send_many: batch_size 通ずつ1つのセッションで送信（セッションはバッチ間でも使い回す）"""
+    sender = create_sender(port)
+    start = time.perf_counter()
+    try:
+        for i in range(0, len(messages), batch_size):
+            results = sender.send_many(messages[i:i + batch_size])
+            failed = [error for error in results if error is not None]
+            if failed:
+                raise failed[0]
+    finally:
+        sender.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SMTPセッションの使い回しによる送信速度を測る")
+    parser.add_argument("--messages", type=int, default=200, help="送信するメール数")
+    parser.add_argument("--batch-size", type=int, default=10, help="send_many に渡す1回あたりの件数")
+    parser.add_argument("--port", type=int, default=8025, help="ローカルSMTPサーバーのポート")
+    args = parser.parse_args()
+
+    handler = CountingHandler()
+    controller = Controller(handler, hostname=HOST, port=args.port)
+    controller.start()
+    try:
+        messages = make_messages(args.messages)
+
+        elapsed = bench_connect_per_message(args.port, messages)
+        print(f"1通ごとに接続:        {args.messages / elapsed:8.1f} 通/秒 ({elapsed:.2f} 秒)")
+
+        elapsed = bench_send_many(args.port, messages, args.batch_size)
+        print(f"send_many（{args.batch_size}通ずつ）: {args.messages / elapsed:8.1f} 通/秒 ({elapsed:.2f} 秒)")
+
+        print(f"\nサーバーが受信したメール: {handler.received} 通")
+    except KeyboardInterrupt:
+        sys.exit(1)
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
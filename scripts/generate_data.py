@@ -0,0 +1,42 @@
+# scripts/generate_data.py
+# 使い方: python -m scripts.generate_data --users 10000 --posts 100000 [--seed 1] [--batch-size 5000]
+import argparse
+import logging
+import sys
+
+from utils.data_generator import SocialGraphGenerator
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="負荷試験用の合成データ（ユーザー・フォロー・投稿など）を作成する")
+    parser.add_argument("--users", type=int, default=1000, help="作成するユーザー数")
+    parser.add_argument("--posts", type=int, default=10000, help="作成する投稿数")
+    parser.add_argument("--seed", type=int, default=0, help="乱数のシード（同じ値なら同じデータになる）")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="1トランザクションで書き込む行数（省略時は MySQL 5000、SQLite 50000）")
+    parser.add_argument("--avg-following", type=int, default=SocialGraphGenerator.GENERATOR_CONFIG["avg_following"],
+                        help="1人あたりの平均フォロー数")
+    args = parser.parse_args()
+
+    generator = SocialGraphGenerator(
+        args.users,
+        args.posts,
+        seed=args.seed,
+        config={"batch_size": args.batch_size, "avg_following": args.avg_following}
+    )
+    try:
+        counts = generator.run()
+    except Exception as e:
+        logger.error(f"Data generation failed: {e}", exc_info=True)
+        sys.exit(1)
+
+    for table, count in counts.items():
+        print(f"{table}: {count}")
+    print("タイムラインの実体化を使う場合は python -m scripts.rebuild_timelines を実行してください")
+
+
+if __name__ == "__main__":
+    main()
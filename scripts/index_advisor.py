@@ -0,0 +1,405 @@
+# scripts/index_advisor.py
+# 使い方: python -m scripts.index_advisor [--seed 0] [--min-rows 100] [--plans] [--width 100]
+# モデルの主な処理を実行して発行されたSQLを集め、実際のパラメータで EXPLAIN し直して
+# フルスキャン・filesort・一時テーブルを指摘し、追加する索引と重複した索引を提案する
+# （入力は合成データから選ぶので、先に python -m scripts.generate_data でデータを作成しておく）
+import argparse
+import logging
+import re
+import sys
+import threading
+
+from benchmarks.model_bench import Workload
+from config.database import DatabasePool
+from config.query_stats import QueryStats
+from models.comment import Comment
+from models.email_outbox import EmailOutbox
+from models.follow import Follow
+from models.like import Like
+from models.post import Post
+from models.user import User
+from utils.trending import TrendingHashtags
+
+logger = logging.getLogger(__name__)
+
+_EXPLAINABLE = re.compile(r"^\s*(?:SELECT|UPDATE|DELETE|INSERT\b.*?\bSELECT)\b", re.IGNORECASE | re.DOTALL)
+_KEYWORDS = {
+    "where", "on", "join", "left", "right", "inner", "cross", "straight_join", "set",
+    "group", "order", "limit", "union", "using", "for", "having", "as",
+}
+_TABLE_REF = re.compile(
+    rf"\b(?:FROM|JOIN|UPDATE)\s+`?(\w+)`?(?:\s+(?:AS\s+)?(?!(?:{'|'.join(_KEYWORDS)})\b)(\w+))?",
+    re.IGNORECASE
+)
+_OPERAND = r"(?:%s|%\(\w+\)s|SELECT\b|(\w+)\.(\w+))"
+_PREDICATE = re.compile(
+    rf"(?<![\w.])(?:(\w+)\.)?(\w+)\s*(=|<=|>=|<|>|\bIN\s*\(|\bBETWEEN\b)\s*\(?\s*{_OPERAND}",
+    re.IGNORECASE
+)
+_ORDER_BY = re.compile(r"\bORDER\s+BY\s+([\w.\s,]+?)(?:\s+LIMIT\b|\)|;|$)", re.IGNORECASE)
+_ORDER_COLUMN = re.compile(r"^(?:(\w+)\.)?(\w+)(?:\s+(?:ASC|DESC))?$", re.IGNORECASE)
+_LIKE = re.compile(r"\bLIKE\s+%s", re.IGNORECASE)
+_COMMENT = re.compile(r"/\*.*?\*/|--[^\n]*", re.DOTALL)
+_DERIVED = re.compile(r"\)\s+(?:AS\s+)?(\w+)\s+(?:JOIN|LEFT|INNER|CROSS|WHERE|ON|ORDER|GROUP|LIMIT)\b", re.IGNORECASE)
+
+
+class StatementSampler:
+    """実行した文をフィンガープリントごとに1つずつ（SQLとパラメータ、呼び出した処理の名前）記録する"""
+
+    def __init__(self):
+        self.samples = {}
+        self.current = None
+        self._lock = threading.Lock()
+
+    def _on_statement(self, key, query, params):
+        with self._lock:
+            sample = self.samples.get(key)
+            if sample is None:
+                sample = self.samples[key] = {'fingerprint': key, 'query': query, 'params': params, 'calls': []}
+            if self.current and self.current not in sample['calls']:
+                sample['calls'].append(self.current)
+
+    def __enter__(self):
+        QueryStats.get_instance().add_sampler(self._on_statement)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        QueryStats.get_instance().remove_sampler(self._on_statement)
+        return False
+
+
+def model_calls(workload):
+    """(名前, 呼び出す関数) のリスト
+
+    読み込みの処理を中心にし、書き込むのは同じ組み合わせで2回ずつ切り替えて
+    元に戻るいいねだけにする（フォローは通知が送られるため含めない）。
+    """
+    post = Post()
+    user = User()
+    follow = Follow()
+    like = Like()
+    comment = Comment()
+    outbox = EmailOutbox()
+    user_id, other_id = workload.user_ids(2)
+    post_ids = workload.post_ids(5)
+    hashtags = workload.hashtags(1)
+    username = workload.usernames(1)[0]
+
+    def timeline_pages():
+        page = post.get_timeline_page(user_id)
+        if page['next_cursor']:
+            post.get_timeline_page(user_id, cursor=page['next_cursor'])
+
+    def toggle_like_twice():
+        like.toggle_like(user_id, post_ids[0])
+        like.toggle_like(user_id, post_ids[0])
+
+    calls = [
+        ("post.get_timeline_posts", lambda: post.get_timeline_posts(user_id)),
+        ("post.get_timeline_page", timeline_pages),
+        ("post.get_user_posts", lambda: post.get_user_posts(user_id)),
+        ("user.get_users", lambda: user.get_users([user_id, other_id])),
+        ("user.get_user_by_username", lambda: user.get_user_by_username(username)),
+        ("user.username_exists", lambda: user.username_exists(username)),
+        ("user.search_users", lambda: user.search_users(workload.search_terms(1)[0])),
+        ("follow.get_followers", lambda: follow.get_followers(user_id)),
+        ("follow.get_following", lambda: follow.get_following(user_id)),
+        ("follow.is_following", lambda: follow.is_following(user_id, other_id)),
+        ("follow.get_follower_count", lambda: follow.get_follower_count(user_id)),
+        ("trending.rebuild", lambda: TrendingHashtags().rebuild(workload.db)),
+        ("email_outbox.next_due_at", outbox.next_due_at),
+    ]
+    if hashtags:
+        calls.append(("post.search_posts_by_hashtag", lambda: post.search_posts_by_hashtag(hashtags[0])))
+    if post_ids:
+        calls += [
+            ("post.get_post", lambda: post.get_post(post_ids[0])),
+            ("comment.get_comments_for_post", lambda: comment.get_comments_for_post(post_ids[0])),
+            ("comment.get_comment_counts", lambda: comment.get_comment_counts(post_ids)),
+            ("like.get_like_counts", lambda: like.get_like_counts(post_ids)),
+            ("like.get_liked_post_ids", lambda: like.get_liked_post_ids(user_id, post_ids)),
+            ("like.toggle_like", toggle_like_twice),
+        ]
+    return calls
+
+
+def collect_statements(calls):
+    """calls を順に実行し、発行された文のサンプルを返す"""
+    with StatementSampler() as sampler:
+        for name, func in calls:
+            sampler.current = name
+            try:
+                func()
+            except Exception as e:
+                logger.warning(f"{name} failed: {e}")
+    return list(sampler.samples.values())
+
+
+def table_aliases(query):
+    """{別名: 表名}（別名がない場合は表名そのもの）
+
+    副問い合わせ（FROM (...) p）と同じ名前の別名は、どちらを指すか分からないので含めない
+    """
+    derived = set(_DERIVED.findall(query))
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(query):
+        if table.lower() in _KEYWORDS or table.lower() == "select":
+            continue
+        alias = alias or table
+        if alias not in derived:
+            aliases.setdefault(alias, table)
+    return aliases
+
+
+def predicate_columns(query, alias, single_table):
+    """alias の表の列にかかる条件を種類ごとに分ける
+
+    戻り値は {'equality': 値との =, 'in': IN, 'range': 範囲条件, 'join': 他の表の列との =}
+    """
+    def owns(qualifier):
+        return qualifier == alias or (qualifier is None and single_table)
+
+    columns = {'equality': [], 'in': [], 'range': [], 'join': []}
+    for qualifier, column, operator, other_alias, other_column in _PREDICATE.findall(query):
+        operator = operator.strip().upper()
+        if not owns(qualifier or None):
+            # JOIN の条件（x.col = alias.col）は右辺の列が対象になる
+            if operator == "=" and other_alias == alias:
+                columns['join'].append(other_column)
+            continue
+        if operator == "=":
+            columns['join' if other_alias else 'equality'].append(column)
+        elif operator.startswith("IN"):
+            columns['in'].append(column)
+        else:
+            columns['range'].append(column)
+    return {kind: list(dict.fromkeys(names)) for kind, names in columns.items()}
+
+
+def order_columns(query, alias, single_table):
+    """最後の ORDER BY の列がすべて alias の表の列ならその列のリスト、そうでなければ空"""
+    matches = _ORDER_BY.findall(query)
+    if not matches:
+        return []
+    columns = []
+    for part in matches[-1].split(","):
+        match = _ORDER_COLUMN.match(part.strip())
+        if match is None or not (match.group(1) == alias or (match.group(1) is None and single_table)):
+            return []
+        columns.append(match.group(2))
+    return columns
+
+
+def _append(columns, extra):
+    return columns + [column for column in extra if column not in columns]
+
+
+def scan_index_columns(query, alias, single_table):
+    """走査している表に作る索引の列（絞り込みの列、続けて ORDER BY か範囲条件の列）"""
+    predicates = predicate_columns(query, alias, single_table)
+    columns = predicates['equality'] + predicates['in'] or predicates['join']
+    return _append(columns, order_columns(query, alias, single_table) or predicates['range'][:1])
+
+
+def sort_index_columns(query, alias, single_table):
+    """filesort をなくす索引の列（値との = の列、続けて ORDER BY の列）と、作れない場合の理由"""
+    predicates = predicate_columns(query, alias, single_table)
+    order = order_columns(query, alias, single_table)
+    if not order:
+        return [], "ORDER BY が複数の表の列にまたがるため、索引では並べ替えを省けない"
+    if predicates['in']:
+        return [], f"{', '.join(predicates['in'])} を IN で複数指定しているため、索引では並べ替えを省けない"
+    if not predicates['equality']:
+        return [], "ORDER BY の表を値で絞り込んでいない（結合した表の順に読むため並べ替えが必要）"
+    return _append(predicates['equality'], order), None
+
+
+def leading_wildcard(query, params):
+    """LIKE '%...' のように先頭がワイルドカードの LIKE（B-tree の索引は使えない）"""
+    if not _LIKE.search(query) or not isinstance(params, (list, tuple)):
+        return False
+    return any(isinstance(value, str) and value.startswith("%") for value in params)
+
+
+class IndexAdvisor:
+    """サンプルの文を EXPLAIN して問題のある実行計画を見つけ、索引を提案する"""
+
+    def __init__(self, db, min_rows=100):
+        self.db = db
+        self.dialect = db.dialect
+        self.min_rows = min_rows
+        self._indexes = {}
+        self._tables = None
+
+    def tables(self, cursor):
+        if self._tables is None:
+            self._tables = self.dialect.list_tables(cursor)
+        return self._tables
+
+    def indexes(self, cursor, table):
+        if table not in self._indexes:
+            self._indexes[table] = self.dialect.list_indexes(cursor, table)
+        return self._indexes[table]
+
+    def analyze(self, sample):
+        """1つの文について {'plan', 'findings', 'suggestions', 'notes'} を返す"""
+        query, params = sample['query'], sample['params']
+        result = {'plan': [], 'findings': [], 'suggestions': [], 'notes': []}
+        if not _EXPLAINABLE.match(query):
+            return result
+
+        with self.db.get_connection() as connection:
+            with connection.cursor() as cursor:
+                try:
+                    steps = self.dialect.explain(cursor, query, params)
+                except Exception as e:
+                    result['notes'].append(f"EXPLAIN に失敗しました: {e}")
+                    return result
+                known_tables = set(self.tables(cursor))
+                # 条件や ORDER BY はコメントを除いたSQLから読み取る
+                query = _COMMENT.sub(" ", query)
+                aliases = table_aliases(query)
+                single_table = len(set(aliases.values())) == 1
+                result['plan'] = [step['detail'] for step in steps]
+
+                for step in steps:
+                    alias = step['table']
+                    # 別名から表名に（MySQL の <derived2> など表でないものは None）
+                    table = aliases.get(alias, alias if alias in known_tables else None)
+                    if step['access'] in ("scan", "index_scan") and table in known_tables:
+                        if step['rows'] is not None and step['rows'] < self.min_rows:
+                            continue
+                        kind = "フルスキャン" if step['access'] == "scan" else f"索引 {step['index']} 全体の走査"
+                        rows = f"（推定 {step['rows']} 行）" if step['rows'] is not None else ""
+                        result['findings'].append(f"{kind}: {table}{'' if alias == table else ' ' + alias}{rows}")
+                        self._suggest(cursor, result, table, scan_index_columns(query, alias, single_table))
+                    if step['filesort']:
+                        result['findings'].append("filesort（ORDER BY を索引の順で読めていない）")
+                        order_alias = self._order_alias(query, aliases, single_table)
+                        if order_alias:
+                            columns, reason = sort_index_columns(query, order_alias, single_table)
+                            if reason and reason not in result['notes']:
+                                result['notes'].append(reason)
+                            self._suggest(cursor, result, aliases[order_alias], columns)
+                    if step['temporary']:
+                        result['findings'].append("一時テーブル（GROUP BY / DISTINCT / UNION の作業用）")
+
+        if leading_wildcard(query, params):
+            result['notes'].append("先頭が % の LIKE は索引を使えない（全件走査になる。全文検索などが必要）")
+        return result
+
+    @staticmethod
+    def _order_alias(query, aliases, single_table):
+        matches = _ORDER_BY.findall(query)
+        if not matches:
+            return None
+        match = _ORDER_COLUMN.match(matches[-1].split(",")[0].strip())
+        if match is None:
+            return None
+        if match.group(1):
+            return match.group(1) if match.group(1) in aliases else None
+        return next(iter(aliases)) if single_table and aliases else None
+
+    def _suggest(self, cursor, result, table, columns):
+        if not columns:
+            return
+        for index in self.indexes(cursor, table):
+            if index['columns'][:len(columns)] == columns:
+                result['notes'].append(
+                    f"{table}({', '.join(columns)}) は既存の索引 {index['name']} で使えるはず"
+                    "（型の不一致や統計情報を確認）"
+                )
+                return
+        suggestion = (table, tuple(columns))
+        if suggestion not in result['suggestions']:
+            result['suggestions'].append(suggestion)
+
+    def redundant_indexes(self):
+        """他の索引の左端と同じ列の索引 [(表, 索引, 代わりに使える索引)]"""
+        redundant = []
+        with self.db.get_connection() as connection:
+            with connection.cursor() as cursor:
+                for table in self.tables(cursor):
+                    indexes = self.indexes(cursor, table)
+                    for i, index in enumerate(indexes):
+                        if index['primary']:
+                            continue
+                        for j, other in enumerate(indexes):
+                            if i == j or other['columns'][:len(index['columns'])] != index['columns']:
+                                continue
+                            same = other['columns'] == index['columns']
+                            # 同じ列の組は後の方だけを重複とし、UNIQUE は同じ列の UNIQUE / 主キーがある場合だけ
+                            if same and j > i and not other['primary']:
+                                continue
+                            if index['unique'] and not (same and other['unique']):
+                                continue
+                            redundant.append((table, index['name'], other['name']))
+                            break
+        return redundant
+
+
+def index_statement(table, columns):
+    return f"CREATE INDEX idx_{table}_{'_'.join(columns)} ON {table} ({', '.join(columns)});"
+
+
+def print_report(samples, results, width, show_plans):
+    flagged = 0
+    for sample, result in zip(samples, results):
+        if not (result['findings'] or result['notes']) and not show_plans:
+            continue
+        flagged += bool(result['findings'])
+        statement = sample['fingerprint']
+        if len(statement) > width:
+            statement = statement[:width - 1] + "…"
+        print(f"== {', '.join(sample['calls']) or '-'}")
+        print(f"   {statement}")
+        if show_plans:
+            for detail in result['plan']:
+                print(f"   | {detail}")
+        for finding in result['findings']:
+            print(f"   ! {finding}")
+        for note in result['notes']:
+            print(f"   - {note}")
+        for table, columns in result['suggestions']:
+            print(f"   + {index_statement(table, columns)}")
+        print()
+    print(f"{len(samples)} 文中 {flagged} 文に問題のある実行計画があります")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="モデルが実行するSQLを EXPLAIN して索引を提案する")
+    parser.add_argument("--seed", type=int, default=0, help="入力に使うユーザー・投稿を選ぶ乱数のシード")
+    parser.add_argument("--min-rows", type=int, default=100, help="推定行数がこれ未満の表の走査は指摘しない（MySQL）")
+    parser.add_argument("--plans", action="store_true", help="すべての文の実行計画を表示する")
+    parser.add_argument("--width", type=int, default=100, help="SQLを表示する最大文字数")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    db = DatabasePool.get_instance()
+    try:
+        workload = Workload(db, seed=args.seed)
+        samples = collect_statements(model_calls(workload))
+        advisor = IndexAdvisor(db, min_rows=args.min_rows)
+        results = [advisor.analyze(sample) for sample in samples]
+        redundant = advisor.redundant_indexes()
+    except Exception as e:
+        logger.error(f"Index advisor failed: {e}", exc_info=True)
+        sys.exit(1)
+
+    print_report(samples, results, args.width, args.plans)
+
+    suggestions = list(dict.fromkeys(s for result in results for s in result['suggestions']))
+    if suggestions:
+        print("\n追加を検討する索引:")
+        for table, columns in suggestions:
+            print(f"  {index_statement(table, columns)}")
+    if redundant:
+        print("\n重複した索引（削除を検討）:")
+        for table, name, other in redundant:
+            print(f"  {table}.{name}（{other} で足りる）")
+    if suggestions or redundant:
+        print("\n採用する変更は migrations/ にマイグレーションとして追加し、python -m scripts.migrate で適用する")
+
+
+if __name__ == "__main__":
+    main()
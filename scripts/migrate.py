@@ -0,0 +1,60 @@
+# scripts/migrate.py
+# 使い方: python -m scripts.migrate [--status] [--target 3] [--dry-run]
+# migrations/ のマイグレーションのうち未適用のものを番号順に適用する（DB_BACKEND=sqlite なら SQLite 用のファイル）
+import argparse
+import logging
+import sys
+
+from config.migrations import MigrationRunner, follow_up_commands, split_statements
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def print_status(runner):
+    for migration in runner.status():
+        applied_at = migration['applied_at']
+        state = f"適用済み {applied_at}" if applied_at else "未適用"
+        print(f"{migration['version']:04d} {migration['name']:<40} {state}")
+
+
+def print_pending(pending):
+    """--dry-run: 適用するマイグレーションと実行する文を表示する"""
+    for migration in pending:
+        print(f"-- {migration['version']:04d}_{migration['name']} ({migration['path']})")
+        with open(migration['path'], encoding="utf-8") as f:
+            for statement in split_statements(f.read()):
+                print(f"{statement};")
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="データベースのマイグレーションを適用する")
+    parser.add_argument("--status", action="store_true", help="適用状態を表示するだけにする")
+    parser.add_argument("--target", type=int, help="この番号までを適用する")
+    parser.add_argument("--dry-run", action="store_true", help="実行せずに適用する文を表示する")
+    args = parser.parse_args()
+
+    runner = MigrationRunner()
+    try:
+        if args.status:
+            print_status(runner)
+            return
+        if args.dry_run:
+            print_pending(runner.pending(args.target))
+            return
+        applied = runner.migrate(args.target)
+    except Exception as e:
+        logger.error(f"Migration failed: {e}", exc_info=True)
+        sys.exit(1)
+
+    if not applied:
+        print("適用するマイグレーションはありません")
+    for migration in applied:
+        print(f"{migration['version']:04d}_{migration['name']} を適用しました")
+        for command in follow_up_commands(migration['path']):
+            print(f"  続けて実行してください: {command}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# scripts/query_stats.py
+# 使い方: python -m scripts.query_stats [--top 20] [--sort total_ms] [--file query_stats.json]
+# アプリ終了時に書き出された SQL の集計（config.query_stats.QueryStats）を表示する
+import argparse
+import json
+import sys
+from datetime import datetime
+
+from config.query_stats import QueryStats
+
+SORT_KEYS = ("total_ms", "count", "mean_ms", "p95_ms", "p99_ms", "max_ms", "rows", "fetch_ms", "acquire_ms")
+
+
+def load_statements(path):
+    with open(path, encoding="utf-8") as f:
+        snapshot = json.load(f)
+    statements = [dict(summary, fingerprint=key) for key, summary in snapshot["statements"].items()]
+    return snapshot, statements
+
+
+def print_table(statements, width):
+    print(f"{'total ms':>11} {'count':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'rows':>9} {'fetch':>8} {'acquire':>8}  statement")
+    for s in statements:
+        statement = s["fingerprint"]
+        if len(statement) > width:
+            statement = statement[:width - 1] + "…"
+        print(
+            f"{s['total_ms']:11.1f} {s['count']:7d} {s['p50_ms']:8.2f} {s['p95_ms']:8.2f} "
+            f"{s['p99_ms']:8.2f} {s['rows']:9d} {s['fetch_ms']:8.1f} {s['acquire_ms']:8.1f}  {statement}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLの処理時間の集計を上位から表示する")
+    parser.add_argument("--file", default=QueryStats.STATS_CONFIG["stats_file"], help="集計ファイル")
+    parser.add_argument("--top", type=int, default=20, help="表示する件数")
+    parser.add_argument("--sort", choices=SORT_KEYS, default="total_ms", help="並べ替える項目")
+    parser.add_argument("--width", type=int, default=100, help="SQLを表示する最大文字数")
+    args = parser.parse_args()
+
+    try:
+        snapshot, statements = load_statements(args.file)
+    except FileNotFoundError:
+        print(f"{args.file} がありません（アプリを終了すると書き出されます）", file=sys.stderr)
+        sys.exit(1)
+
+    statements.sort(key=lambda s: s[args.sort], reverse=True)
+    started = datetime.fromtimestamp(snapshot["started_at"]).strftime('%Y-%m-%d %H:%M:%S')
+    saved = datetime.fromtimestamp(snapshot["saved_at"]).strftime('%Y-%m-%d %H:%M:%S')
+    print(f"集計期間: {started} 〜 {saved}（{len(statements)} 種類の文）")
+
+    acquire = snapshot.get("acquire")
+    if acquire and acquire["count"]:
+        print(
+            f"接続の取得待ち: {acquire['count']} 回, 合計 {acquire['total_ms']:.1f} ms, "
+            f"p95 {acquire['p95_ms']:.2f} ms, 最大 {acquire['max_ms']:.2f} ms"
+        )
+    print()
+    print_table(statements[:args.top], args.width)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+# scripts/rebuild_timelines.py
+# 使い方: python -m scripts.rebuild_timelines [--batch-size 100]
+import argparse
+import logging
+import sys
+
+from models.timeline import Timeline
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="follows / posts から timeline_entries を作り直す")
+    parser.add_argument("--batch-size", type=int, default=100, help="1トランザクションで処理するユーザー数")
+    args = parser.parse_args()
+
+    try:
+        processed = Timeline().rebuild(batch_size=args.batch_size)
+        print(f"{processed} 人のタイムラインを作成しました")
+    except Exception as e:
+        logger.error(f"Timeline rebuild failed: {e}", exc_info=True)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# scripts/reconcile_counters.py
+# 使い方: python -m scripts.reconcile_counters [--batch-size 1000]
+import argparse
+import logging
+import sys
+
+from models.post import Post
+from models.follow import Follow
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def reconcile_counters(batch_size):
+    """カウンタ列を実テーブルから再計算し、ずれを修正する"""
+    fixed_posts = Post().reconcile_counters(batch_size=batch_size)
+    print(f"posts: {fixed_posts} 件のいいね数/コメント数を修正しました")
+
+    fixed_users = Follow().reconcile_counters(batch_size=batch_size)
+    print(f"users: {fixed_users} 件のフォロワー数/フォロー数を修正しました")
+    return fixed_posts + fixed_users
+
+
+def main():
+    parser = argparse.ArgumentParser(description="いいね数・コメント数・フォロー数のカウンタを再計算する")
+    parser.add_argument("--batch-size", type=int, default=1000, help="1回のUPDATEで処理するIDの範囲")
+    args = parser.parse_args()
+
+    try:
+        reconcile_counters(args.batch_size)
+    except Exception as e:
+        logger.error(f"Counter reconciliation failed: {e}", exc_info=True)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,22 @@ CREATE TABLE `comments` (
   CONSTRAINT `comments_ibfk_2` FOREIGN KEY (`post_id`) REFERENCES `posts` (`post_id`)
 ) ENGINE=InnoDB AUTO_INCREMENT=13 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
+CREATE TABLE `email_outbox` (
+  `outbox_id` int NOT NULL AUTO_INCREMENT,
+  `to_email` varchar(255) NOT NULL,
+  `subject` varchar(255) NOT NULL,
+  `body` text NOT NULL,
+  `status` enum('pending','sending','sent','failed') NOT NULL DEFAULT 'pending',
+  `attempts` int NOT NULL DEFAULT '0',
+  `next_attempt_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  `locked_at` timestamp NULL DEFAULT NULL,
+  `last_error` text,
+  `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+  `sent_at` timestamp NULL DEFAULT NULL,
+  PRIMARY KEY (`outbox_id`),
+  KEY `idx_email_outbox_due` (`status`,`next_attempt_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
 CREATE TABLE `follows` (
   `follow_id` bigint unsigned NOT NULL AUTO_INCREMENT,
   `follower_id` int NOT NULL,
@@ -26,7 +42,7 @@ CREATE TABLE `follows` (
 
 CREATE TABLE `hashtags` (
   `hashtag_id` int NOT NULL AUTO_INCREMENT,
-  `tag_name` varchar(100) NOT NULL,
+  `tag_name` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL,
   `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
   PRIMARY KEY (`hashtag_id`),
   UNIQUE KEY `tag_name` (`tag_name`)
@@ -50,6 +66,7 @@ CREATE TABLE `post_hashtags` (
   `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
   PRIMARY KEY (`post_id`,`hashtag_id`),
   KEY `hashtag_id` (`hashtag_id`),
+  KEY `idx_post_hashtags_created` (`created_at`),
   CONSTRAINT `post_hashtags_ibfk_1` FOREIGN KEY (`post_id`) REFERENCES `posts` (`post_id`) ON DELETE CASCADE,
   CONSTRAINT `post_hashtags_ibfk_2` FOREIGN KEY (`hashtag_id`) REFERENCES `hashtags` (`hashtag_id`) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -60,17 +77,40 @@ CREATE TABLE `posts` (
   `content` text NOT NULL,
   `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
   `updated_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  `like_count` int NOT NULL DEFAULT '0',
+  `comment_count` int NOT NULL DEFAULT '0',
   PRIMARY KEY (`post_id`),
   KEY `user_id` (`user_id`),
+  KEY `idx_posts_user_created` (`user_id`,`created_at`),
   CONSTRAINT `posts_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `users` (`user_id`) ON DELETE CASCADE
 ) ENGINE=InnoDB AUTO_INCREMENT=41 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
+CREATE TABLE `schema_migrations` (
+  `version` int NOT NULL,
+  `name` varchar(255) NOT NULL,
+  `applied_at` timestamp NULL DEFAULT NULL,
+  PRIMARY KEY (`version`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- このダンプは migrations/0001 の変更を含んでいる（0002 以降は python -m scripts.migrate で適用する）
+INSERT INTO `schema_migrations` VALUES (1,'upgrade_from_baseline',CURRENT_TIMESTAMP);
+
 CREATE TABLE `test` (
   `id` int NOT NULL AUTO_INCREMENT,
   `name` varchar(50) DEFAULT NULL,
   PRIMARY KEY (`id`)
 ) ENGINE=InnoDB AUTO_INCREMENT=2 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
+CREATE TABLE `timeline_entries` (
+  `user_id` int NOT NULL,
+  `post_id` int NOT NULL,
+  `created_at` timestamp NOT NULL,
+  PRIMARY KEY (`user_id`,`created_at`,`post_id`),
+  KEY `post_id` (`post_id`),
+  CONSTRAINT `timeline_entries_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `users` (`user_id`) ON DELETE CASCADE,
+  CONSTRAINT `timeline_entries_ibfk_2` FOREIGN KEY (`post_id`) REFERENCES `posts` (`post_id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
 CREATE TABLE `users` (
   `user_id` int NOT NULL AUTO_INCREMENT,
   `username` varchar(50) NOT NULL,
@@ -85,6 +125,8 @@ CREATE TABLE `users` (
   `is_email_verified` tinyint(1) DEFAULT '0',
   `email_verification_code` varchar(64) DEFAULT NULL,
   `email_verification_expires_at` timestamp NULL DEFAULT NULL,
+  `follower_count` int NOT NULL DEFAULT '0',
+  `following_count` int NOT NULL DEFAULT '0',
   PRIMARY KEY (`user_id`),
   UNIQUE KEY `username` (`username`),
   UNIQUE KEY `email` (`email`),
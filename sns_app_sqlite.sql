@@ -0,0 +1,114 @@
+-- sns_app.sql の SQLite 版（DB_BACKEND=sqlite のとき、データベースが空なら自動で実行される）
+-- 日時は 'YYYY-MM-DD HH:MM:SS' のローカル時刻、ON UPDATE CURRENT_TIMESTAMP はトリガーで代用する
+
+CREATE TABLE IF NOT EXISTS users (
+  user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  username VARCHAR(50) NOT NULL COLLATE NOCASE UNIQUE,
+  email VARCHAR(255) NOT NULL COLLATE NOCASE UNIQUE,
+  password_hash VARCHAR(255) NOT NULL,
+  salt VARCHAR(255) NOT NULL,
+  profile_image_path VARCHAR(255) DEFAULT NULL,
+  created_at TIMESTAMP NULL DEFAULT (datetime('now', 'localtime')),
+  updated_at TIMESTAMP NULL DEFAULT (datetime('now', 'localtime')),
+  activation_code VARCHAR(64) DEFAULT NULL,
+  is_active TINYINT(1) DEFAULT 0,
+  is_email_verified TINYINT(1) DEFAULT 0,
+  email_verification_code VARCHAR(64) DEFAULT NULL,
+  email_verification_expires_at TIMESTAMP NULL DEFAULT NULL,
+  follower_count INTEGER NOT NULL DEFAULT 0,
+  following_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_email_verification ON users (user_id, email_verification_code);
+
+CREATE TRIGGER IF NOT EXISTS users_updated_at
+AFTER UPDATE OF username, email, password_hash, salt, profile_image_path, activation_code,
+  is_active, is_email_verified, email_verification_code, email_verification_expires_at ON users
+FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+  UPDATE users SET updated_at = datetime('now', 'localtime') WHERE user_id = NEW.user_id;
+END;
+
+CREATE TABLE IF NOT EXISTS posts (
+  post_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  user_id INTEGER NOT NULL REFERENCES users (user_id) ON DELETE CASCADE,
+  content TEXT NOT NULL,
+  created_at TIMESTAMP NULL DEFAULT (datetime('now', 'localtime')),
+  updated_at TIMESTAMP NULL DEFAULT (datetime('now', 'localtime')),
+  like_count INTEGER NOT NULL DEFAULT 0,
+  comment_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_posts_user_created ON posts (user_id, created_at);
+
+-- like_count / comment_count の更新では updated_at を変えない（MySQL では updated_at = updated_at で抑止している）
+CREATE TRIGGER IF NOT EXISTS posts_updated_at
+AFTER UPDATE OF content ON posts
+FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+  UPDATE posts SET updated_at = datetime('now', 'localtime') WHERE post_id = NEW.post_id;
+END;
+
+CREATE TABLE IF NOT EXISTS comments (
+  comment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  user_id INTEGER NOT NULL REFERENCES users (user_id),
+  post_id INTEGER NOT NULL REFERENCES posts (post_id),
+  content TEXT NOT NULL,
+  created_at TIMESTAMP NULL DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS comments_user_id ON comments (user_id);
+CREATE INDEX IF NOT EXISTS comments_post_id ON comments (post_id);
+
+CREATE TABLE IF NOT EXISTS email_outbox (
+  outbox_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  to_email VARCHAR(255) NOT NULL,
+  subject VARCHAR(255) NOT NULL,
+  body TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sending', 'sent', 'failed')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  next_attempt_at TIMESTAMP NOT NULL DEFAULT (datetime('now', 'localtime')),
+  locked_at TIMESTAMP NULL DEFAULT NULL,
+  last_error TEXT,
+  created_at TIMESTAMP NULL DEFAULT (datetime('now', 'localtime')),
+  sent_at TIMESTAMP NULL DEFAULT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox (status, next_attempt_at);
+
+CREATE TABLE IF NOT EXISTS follows (
+  follow_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  follower_id INTEGER NOT NULL REFERENCES users (user_id),
+  followed_id INTEGER NOT NULL REFERENCES users (user_id),
+  created_at TIMESTAMP NULL DEFAULT (datetime('now', 'localtime')),
+  UNIQUE (follower_id, followed_id)
+);
+CREATE INDEX IF NOT EXISTS follows_followed_id ON follows (followed_id);
+
+CREATE TABLE IF NOT EXISTS hashtags (
+  hashtag_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  tag_name VARCHAR(100) NOT NULL UNIQUE,
+  created_at TIMESTAMP NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS likes (
+  like_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  post_id INTEGER NOT NULL REFERENCES posts (post_id),
+  user_id INTEGER NOT NULL REFERENCES users (user_id),
+  created_at TIMESTAMP NULL DEFAULT (datetime('now', 'localtime')),
+  UNIQUE (post_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS likes_user_id ON likes (user_id);
+
+CREATE TABLE IF NOT EXISTS post_hashtags (
+  post_id INTEGER NOT NULL REFERENCES posts (post_id) ON DELETE CASCADE,
+  hashtag_id INTEGER NOT NULL REFERENCES hashtags (hashtag_id) ON DELETE CASCADE,
+  created_at TIMESTAMP NULL DEFAULT (datetime('now', 'localtime')),
+  PRIMARY KEY (post_id, hashtag_id)
+);
+CREATE INDEX IF NOT EXISTS post_hashtags_hashtag_id ON post_hashtags (hashtag_id);
+CREATE INDEX IF NOT EXISTS idx_post_hashtags_created ON post_hashtags (created_at);
+
+CREATE TABLE IF NOT EXISTS timeline_entries (
+  user_id INTEGER NOT NULL REFERENCES users (user_id) ON DELETE CASCADE,
+  post_id INTEGER NOT NULL REFERENCES posts (post_id) ON DELETE CASCADE,
+  created_at TIMESTAMP NOT NULL,
+  PRIMARY KEY (user_id, created_at, post_id)
+);
+CREATE INDEX IF NOT EXISTS timeline_entries_post_id ON timeline_entries (post_id);
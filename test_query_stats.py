@@ -0,0 +1,41 @@
+# test_query_stats.py
+# 使い方: python test_query_stats.py（SQLite の一時ファイルを使うため MySQL は不要）
+import os
+import sys
+import tempfile
+
+from config.database import DatabasePool
+from config.query_stats import MAX_FINGERPRINT_INPUT, _fingerprint_cached
+
+
+def test_execute_many_does_not_cache_large_statements():
+    """execute_many の巨大な一括 INSERT がフィンガープリントのキャッシュに残らないこと"""
+    with tempfile.TemporaryDirectory() as directory:
+        pool = DatabasePool(backend="sqlite")
+        pool.SQLITE_CONFIG = dict(DatabasePool.SQLITE_CONFIG, path=os.path.join(directory, "test.db"))
+        # MySQL と同じ複数行の INSERT を組み立てる経路を確かめる（SQLite は通常 executemany を使う）
+        pool.dialect.native_executemany = False
+        try:
+            pool.execute_update("CREATE TABLE bulk_rows (row_id INTEGER PRIMARY KEY, body TEXT)")
+            _fingerprint_cached.cache_clear()
+
+            rows = [(i, "x" * 200) for i in range(20000)]
+            result = pool.execute_many("INSERT INTO bulk_rows (row_id, body) VALUES (%s, %s)", rows)
+            cache = _fingerprint_cached.cache_info()
+            print(f"statements: {result['statements']}, cached fingerprints: {cache.currsize}")
+
+            assert result['statements'] > 1, "一括 INSERT が複数の文に分かれていません"
+            assert len(rows) * 200 > MAX_FINGERPRINT_INPUT
+            # 1MB 近い INSERT 文はキャッシュせず、キャッシュに入るのは短い文だけ
+            assert cache.currsize <= 1, f"一括 INSERT の文がキャッシュされています: {cache.currsize} 件"
+        finally:
+            pool.close_all()
+
+
+if __name__ == "__main__":
+    try:
+        test_execute_many_does_not_cache_large_statements()
+        print("OK")
+    except AssertionError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,131 @@
+# utils/background.py
+import contextvars
+import logging
+import queue
+import threading
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk
+
+from utils.query_counter import active_counters
+
+logger = logging.getLogger(__name__)
+
+# 全ビューで共有するワーカースレッドプール
+MAX_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """共有のワーカースレッドプールを取得"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="ui-loader")
+    return _executor
+
+
+class BackgroundLoader:
+    """DB処理をワーカースレッドで実行し、結果をTkのメインスレッドで受け取る
+
+    ワーカーの結果はキューに入れ、widget.after で定期的に取り出してコールバックを呼ぶ
+    （Tkのウィジェットはメインスレッド以外から触らない）。
+    同じキーで新しい処理を投入した場合や、ウィジェットが破棄された（画面遷移した）場合、
+    古い結果は捨てる。
+    """
+    POLL_INTERVAL_MS = 30
+
+    def __init__(self, widget):
+        self.widget = widget
+        self._queue = queue.Queue()
+        self._generations = {}
+        self._pending = 0
+        self._polling = False
+        self._destroyed = False
+        widget.bind("<Destroy>", self._on_destroy, add="+")
+
+    def _on_destroy(self, event):
+        if event.widget is self.widget:
+            self._destroyed = True
+
+    def is_alive(self):
+        """結果を反映する先のウィジェットが残っているか"""
+        if self._destroyed:
+            return False
+        try:
+            return bool(self.widget.winfo_exists())
+        except tk.TclError:
+            return False
+
+    def run(self, key, func, on_success, on_error=None, loading_parent=None, loading_text="読み込み中..."):
+        """func() をワーカースレッドで実行し、結果を on_success(result) に渡す
+
+        loading_parent を指定すると、結果が届くまで読み込み中の表示を置く
+        """
+        generation = self._generations.get(key, 0) + 1
+        self._generations[key] = generation
+
+        loading_label = None
+        if loading_parent is not None:
+            loading_label = ttk.Label(loading_parent, text=loading_text, foreground='gray')
+            loading_label.pack(pady=10)
+
+        self._pending += 1
+        counters = active_counters()
+        if counters:
+            # QueryCounter で計測中の処理から投入された場合は、ワーカーのクエリも同じカウンタで数える
+            future = get_executor().submit(contextvars.copy_context().run, func)
+            for counter in counters:
+                counter.track(future)
+        else:
+            future = get_executor().submit(func)
+        future.add_done_callback(
+            lambda f: self._queue.put((key, generation, f, on_success, on_error, loading_label))
+        )
+        self._schedule_poll()
+        return generation
+
+    def cancel(self, key):
+        """実行中の処理の結果を捨てる"""
+        self._generations[key] = self._generations.get(key, 0) + 1
+
+    def _schedule_poll(self):
+        if not self._polling and self.is_alive():
+            self._polling = True
+            self.widget.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        self._polling = False
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            self._deliver(*item)
+        if self._pending > 0:
+            self._schedule_poll()
+
+    def _deliver(self, key, generation, future, on_success, on_error, loading_label):
+        if not self.is_alive():
+            return
+        if loading_label is not None:
+            try:
+                loading_label.destroy()
+            except tk.TclError:
+                pass
+        if self._generations.get(key) != generation:
+            logger.debug(f"Dropped stale result for '{key}'")
+            return
+
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(f"Background task '{key}' failed: {e}", exc_info=True)
+            if on_error:
+                on_error(e)
+            return
+        on_success(result)
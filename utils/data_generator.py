@@ -0,0 +1,308 @@
+# utils/data_generator.py
+import bisect
+import itertools
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+
+from config.database import DatabasePool
+from config.query_stats import QueryStats
+from utils.hashtag import extract_hashtags
+
+logger = logging.getLogger(__name__)
+
+# 本文の素材（日本語・英語）
+JA_SUBJECTS = ["今日", "昨日の夜", "週末", "朝", "さっき", "久しぶりに", "仕事終わりに", "休みの日に"]
+JA_PHRASES = [
+    "カフェで新しいケーキを食べた", "駅前の本屋に寄った", "ずっと気になっていた映画を観た",
+    "ラーメン屋に行列ができていた", "課題がやっと終わった", "友達とゲームをした",
+    "新しいプログラミング言語を試した", "公園を散歩した", "雨がすごかった", "桜がきれいだった",
+    "電車が遅れて大変だった", "料理に挑戦した", "ライブのチケットが取れた", "部屋の掃除をした",
+]
+JA_ENDINGS = ["！", "。", "😊", "…", "！！", "。最高", "。また行きたい", "。疲れた"]
+EN_OPENERS = ["Just", "Finally", "Today I", "Can't believe I", "Yesterday I", "Happy to say I"]
+EN_PHRASES = [
+    "finished my project", "tried a new coffee place", "watched a great movie",
+    "went for a long run", "shipped a new feature", "read an amazing book",
+    "cooked dinner for friends", "fixed a nasty bug", "visited the museum", "got caught in the rain",
+]
+EN_ENDINGS = ["!", ".", " :)", "!!", " lol", ". Worth it."]
+
+JA_TAGS = [
+    "日常", "ランチ", "カフェ", "映画", "読書", "旅行", "写真", "ラーメン", "プログラミング", "音楽",
+    "ゲーム", "アニメ", "散歩", "料理", "勉強", "仕事", "猫", "犬", "桜", "雨", "週末", "筋トレ",
+]
+EN_TAGS = [
+    "python", "coding", "coffee", "travel", "music", "photography", "food", "books", "gaming",
+    "fitness", "tech", "life", "weekend", "design", "startup", "running", "art", "movies",
+]
+
+COMMENTS = [
+    "いいですね！", "わかる〜", "最高！", "行ってみたい", "おつかれさまです", "すごい！",
+    "Nice!", "Love this", "So true", "Congrats!", "Looks great", "haha",
+]
+
+
+def zipf_cum_weights(n, exponent):
+    """順位 k の重みが 1 / k ** exponent になる累積重み"""
+    return list(itertools.accumulate(1.0 / (k ** exponent) for k in range(1, n + 1)))
+
+
+def pick(rng, cum_weights):
+    """累積重みに従ってインデックスを選ぶ（random.choices より速い）"""
+    return bisect.bisect(cum_weights, rng.random() * cum_weights[-1])
+
+
+class SocialGraphGenerator:
+    """負荷試験用の合成データ（ユーザー・フォロー・投稿・ハッシュタグ・いいね・コメント）を作る
+
+    フォローは優先的選択（フォロワーの多いユーザーほどフォローされやすい）、
+    ハッシュタグ・投稿数・いいね数は Zipf / パレート分布に従う。
+    同じ seed なら同じデータになる。書き込みは DatabasePool.execute_many でまとめて行い、
+    ID は既存の最大値の続きから明示的に振る（関連する行をDBに問い合わせずに作るため）。
+    """
+
+    GENERATOR_CONFIG = {
+        "batch_size": None,         # 1回の execute_many（1トランザクション）で書き込む行数（None なら DB ごとの既定値）
+        "avg_following": 20,        # 1人あたりの平均フォロー数
+        "max_following": 2000,
+        "hashtag_count": 2000,      # ハッシュタグの種類
+        "hashtag_exponent": 1.1,    # ハッシュタグの Zipf 指数
+        "tag_probability": 0.45,    # ハッシュタグを含む投稿の割合
+        "mention_probability": 0.08,
+        "english_ratio": 0.3,       # 英語の投稿の割合
+        "avg_likes": 3.0,
+        "avg_comments": 0.6,
+        "days": 90,                 # 投稿日時を散らす期間（日）
+        "password": "password",     # 生成したユーザーのパスワード（全員同じハッシュを使う）
+    }
+
+    def __init__(self, users, posts, seed=0, db=None, config=None):
+        self.user_count = users
+        self.post_count = posts
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.db = db or DatabasePool.get_instance()
+        self.config = dict(self.GENERATOR_CONFIG, **(config or {}))
+        self.now = datetime(2024, 1, 1) + timedelta(days=self.config["days"])
+        self.counts = {}
+
+    # ---- 全体 ----
+
+    def run(self):
+        """すべてのデータを生成して書き込み、表ごとの行数を返す"""
+        started = time.perf_counter()
+        if self.config["batch_size"] is None:
+            self.config["batch_size"] = self.db.dialect.bulk_batch_size
+        self.user_offset = self._max_id("users", "user_id")
+        self.post_offset = self._max_id("posts", "post_id")
+
+        followers, following = self.generate_follow_graph()
+        # 一括 INSERT は集計しても参考にならないので、書き込みの間はクエリ統計を止める
+        with QueryStats.get_instance().paused():
+            self.write_users(followers, following)
+            self.write_follows(following)
+            self.hashtag_ids = self.write_hashtags()
+            self.write_posts(followers)
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Generated {self.counts} in {elapsed:.1f}s")
+        return dict(self.counts, seconds=round(elapsed, 1))
+
+    def _max_id(self, table, column):
+        row = self.db.fetch_one(f"SELECT COALESCE(MAX({column}), 0) AS max_id FROM {table}")
+        return int(row['max_id'])
+
+    def _write(self, table, query, rows):
+        """行のイテレータを batch_size 行ずつ execute_many で書き込む"""
+        batch_size = self.config["batch_size"]
+        total = 0
+        iterator = iter(rows)
+        while True:
+            batch = list(itertools.islice(iterator, batch_size))
+            if not batch:
+                break
+            total += self.db.execute_many(query, batch)['rowcount']
+            logger.debug(f"{table}: {total} rows")
+        self.counts[table] = self.counts.get(table, 0) + total
+        logger.info(f"Wrote {total} rows to {table}")
+        return total
+
+    def user_id(self, index):
+        return self.user_offset + index + 1
+
+    def random_time(self):
+        return self.now - timedelta(seconds=self.rng.random() * self.config["days"] * 86400)
+
+    # ---- ユーザーとフォロー ----
+
+    def generate_follow_graph(self):
+        """優先的選択でフォロー関係を作る（戻り値は被フォロー数と、ユーザーごとのフォロー先）"""
+        rng = self.rng
+        n = self.user_count
+        followers = [0] * n
+        following = [[] for _ in range(n)]
+        # 各ユーザーを「1 + フォロワー数」回入れた候補（ここから選ぶと被フォロー数に比例した確率になる）
+        candidates = []
+        alpha = 1.0 + 1.0 / max(self.config["avg_following"] - 1, 1)
+        for i in range(n):
+            if candidates:
+                want = min(int(rng.paretovariate(alpha)), self.config["max_following"], i)
+                chosen = set()
+                for _ in range(want * 3):
+                    if len(chosen) >= want:
+                        break
+                    target = candidates[int(rng.random() * len(candidates))]
+                    if target != i:
+                        chosen.add(target)
+                for target in sorted(chosen):
+                    following[i].append(target)
+                    followers[target] += 1
+                    candidates.append(target)
+            candidates.append(i)
+        return followers, following
+
+    def write_users(self, followers, following):
+        from utils.password_hasher import PasswordHasher
+        password = PasswordHasher.get_instance().hash(self.config["password"])
+        prefix = f"gen{self.seed}_{self.user_offset}_"
+
+        def rows():
+            for i in range(self.user_count):
+                created_at = self.now - timedelta(days=self.config["days"] * (1 - i / self.user_count))
+                yield (
+                    self.user_id(i), f"{prefix}{i}", f"{prefix}{i}@example.com",
+                    password['password_hash'], password['salt'], created_at, created_at, True, True,
+                    followers[i], len(following[i])
+                )
+
+        return self._write("users", """
+            INSERT INTO users (user_id, username, email, password_hash, salt, created_at, updated_at,
+                               is_active, is_email_verified, follower_count, following_count)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, rows())
+
+    def write_follows(self, following):
+        def rows():
+            for i, targets in enumerate(following):
+                for target in targets:
+                    yield (self.user_id(i), self.user_id(target), self.random_time())
+
+        return self._write("follows", """
+            INSERT INTO follows (follower_id, followed_id, created_at) VALUES (%s, %s, %s)
+        """, rows())
+
+    # ---- ハッシュタグ ----
+
+    def tag_vocabulary(self):
+        """人気順のハッシュタグ（基本語と、その派生で hashtag_count 種類）"""
+        base = JA_TAGS + EN_TAGS
+        self.rng.shuffle(base)
+        tags = list(base)
+        suffixes = ["部", "好き", "2024", "life", "daily", "メモ", "log", "tips"]
+        i = 0
+        while len(tags) < self.config["hashtag_count"]:
+            word = base[i % len(base)]
+            suffix = suffixes[(i // len(base)) % len(suffixes)]
+            round_number = i // (len(base) * len(suffixes))
+            tags.append(f"{word}{suffix}{round_number or ''}")
+            i += 1
+        return tags[:self.config["hashtag_count"]]
+
+    def write_hashtags(self):
+        self.tags = self.tag_vocabulary()
+        self.tag_weights = zipf_cum_weights(len(self.tags), self.config["hashtag_exponent"])
+        self._write("hashtags", """
+            INSERT INTO hashtags (tag_name) VALUES (%s) ON DUPLICATE KEY UPDATE tag_name = tag_name
+        """, ((tag,) for tag in self.tags))
+
+        ids = {}
+        for start in range(0, len(self.tags), 1000):
+            chunk = self.tags[start:start + 1000]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            for row in self.db.execute_query(
+                f"SELECT hashtag_id, tag_name FROM hashtags WHERE tag_name IN ({placeholders})", tuple(chunk)
+            ):
+                ids[row['tag_name']] = row['hashtag_id']
+        return ids
+
+    # ---- 投稿・いいね・コメント ----
+
+    def content(self):
+        rng = self.rng
+        if rng.random() < self.config["english_ratio"]:
+            text = f"{rng.choice(EN_OPENERS)} {rng.choice(EN_PHRASES)}{rng.choice(EN_ENDINGS)}"
+        else:
+            text = f"{rng.choice(JA_SUBJECTS)}、{rng.choice(JA_PHRASES)}{rng.choice(JA_ENDINGS)}"
+        if rng.random() < self.config["tag_probability"]:
+            count = 1 + int(rng.random() * rng.random() * 4)
+            text += " " + " ".join(f"#{self.tags[pick(rng, self.tag_weights)]}" for _ in range(count))
+        if rng.random() < self.config["mention_probability"]:
+            text = f"@gen{self.seed}_{self.user_offset}_{int(rng.random() * self.user_count)} " + text
+        return text
+
+    def heavy_tail(self, mean):
+        """平均が mean 程度になる裾の重い整数（パレート分布）"""
+        if mean <= 0:
+            return 0
+        alpha = 2.0
+        return int((self.rng.paretovariate(alpha) - 1) * mean * (alpha - 1))
+
+    def write_posts(self, followers):
+        rng = self.rng
+        n_users = self.user_count
+        # 投稿の多いユーザーほどフォロワーも多い傾向にする
+        author_weights = list(itertools.accumulate((f + 1) ** 0.5 for f in followers))
+        span = self.config["days"] * 86400
+
+        posts, post_hashtags, likes, comments = [], [], [], []
+        query_posts = """
+            INSERT INTO posts (post_id, user_id, content, created_at, updated_at, like_count, comment_count)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """
+        query_post_hashtags = """
+            INSERT IGNORE INTO post_hashtags (post_id, hashtag_id, created_at) VALUES (%s, %s, %s)
+        """
+        query_likes = "INSERT INTO likes (post_id, user_id, created_at) VALUES (%s, %s, %s)"
+        query_comments = "INSERT INTO comments (user_id, post_id, content, created_at) VALUES (%s, %s, %s, %s)"
+
+        def flush():
+            # 外部キーの順（posts が先）に書き込む
+            for table, query, rows in (
+                ("posts", query_posts, posts),
+                ("post_hashtags", query_post_hashtags, post_hashtags),
+                ("likes", query_likes, likes),
+                ("comments", query_comments, comments),
+            ):
+                if rows:
+                    self._write(table, query, rows)
+                    rows.clear()
+
+        for i in range(self.post_count):
+            post_id = self.post_offset + i + 1
+            author = pick(rng, author_weights)
+            # 投稿IDの順に日時が進むようにする
+            created_at = self.now - timedelta(seconds=span * (1 - (i + rng.random()) / self.post_count))
+            content = self.content()
+
+            popularity = (followers[author] + 1) ** 0.3
+            like_users = {int(rng.random() * n_users)
+                          for _ in range(min(self.heavy_tail(self.config["avg_likes"] * popularity), n_users))}
+            comment_total = min(self.heavy_tail(self.config["avg_comments"] * popularity), 50)
+
+            posts.append((post_id, self.user_id(author), content, created_at, created_at,
+                          len(like_users), comment_total))
+            for tag in extract_hashtags(content):
+                hashtag_id = self.hashtag_ids.get(tag)
+                if hashtag_id:
+                    post_hashtags.append((post_id, hashtag_id, created_at))
+            for user in like_users:
+                likes.append((post_id, self.user_id(user), created_at))
+            for _ in range(comment_total):
+                comments.append((self.user_id(int(rng.random() * n_users)), post_id,
+                                 rng.choice(COMMENTS), created_at))
+
+            if len(posts) >= self.config["batch_size"]:
+                flush()
+        flush()
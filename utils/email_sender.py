@@ -4,6 +4,8 @@ from email.mime.multipart import MIMEMultipart
 import secrets
 import string
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import os
@@ -16,7 +18,13 @@ logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 class EmailSender:
-    def __init__(self, smtp_server=None, smtp_port=None, username=None, password=None):
+    SESSION_CONFIG = {
+        "idle_timeout": 60,  # これ以上使っていないSMTPセッションは次の送信前に張り直す（秒）
+        "timeout": 30,       # SMTPの接続・応答のタイムアウト（秒）
+    }
+
+    def __init__(self, smtp_server=None, smtp_port=None, username=None, password=None,
+                 use_tls=True, use_auth=True):
         """
         EmailSenderの初期化。引数が与えられない場合は環境変数から読み込む
         """
@@ -24,6 +32,8 @@ class EmailSender:
         self.smtp_port = int(smtp_port or os.getenv('SMTP_PORT', 587))
         self.username = username or os.getenv('SMTP_USERNAME')
         self.password = password or os.getenv('SMTP_PASSWORD')
+        self.use_tls = use_tls
+        self.use_auth = use_auth
 
         # 必要な設定が揃っているか確認
         if not all([self.smtp_server, self.smtp_port, self.username, self.password]):
@@ -31,6 +41,11 @@ class EmailSender:
             logger.error(error_msg)
             raise ValueError(error_msg)
 
+        # STARTTLS・ログイン済みのSMTPセッション（最初の送信時に接続し、以降は使い回す）
+        self._server = None
+        self._last_used = 0.0
+        self._session_lock = threading.Lock()
+
         logger.debug(f"EmailSender initialized with server: {self.smtp_server}:{self.smtp_port}")
 
     @staticmethod
@@ -39,23 +54,75 @@ class EmailSender:
         alphabet = string.ascii_letters + string.digits
         return ''.join(secrets.choice(alphabet) for _ in range(length))
 
+    def enqueue_email(self, to_email, subject, body):
+        """メールを送信待ち（email_outbox）に登録する
+
+        SMTPへの接続は行わず、utils.email_worker.EmailOutboxWorker が
+        バックグラウンドで送信・再送する。戻り値は outbox_id。
+        """
+        from models.email_outbox import EmailOutbox
+        outbox_id = EmailOutbox().enqueue(to_email, subject, body)
+        logger.debug(f"Email queued for: {to_email} (outbox_id={outbox_id})")
+        return outbox_id
+
+    def build_message(self, to_email, subject, body):
+        message = MIMEMultipart()
+        message["From"] = self.username
+        message["To"] = to_email
+        message["Subject"] = subject
+        message.attach(MIMEText(body, "plain", "utf-8"))
+        return message
+
+    def _connect(self):
+        """SMTPに接続し、STARTTLS・ログインまで行う"""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.SESSION_CONFIG["timeout"])
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.use_auth:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        logger.debug(f"SMTP session opened: {self.smtp_server}:{self.smtp_port}")
+        return server
+
+    def _get_session(self):
+        """使い回すSMTPセッションを取得（アイドル時間を超えていたら張り直す）"""
+        if self._server is not None and time.monotonic() - self._last_used > self.SESSION_CONFIG["idle_timeout"]:
+            # サーバー側で切断されている可能性が高いので、使う前に閉じる
+            self._close_session()
+        if self._server is None:
+            self._server = self._connect()
+        return self._server
+
+    def _close_session(self):
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _send_message(self, message):
+        """セッションで1通送信（切断されていたら1回だけ再接続して送り直す）"""
+        try:
+            self._get_session().send_message(message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            logger.debug("SMTP session was disconnected, reconnecting")
+            self._close_session()
+            self._get_session().send_message(message)
+        self._last_used = time.monotonic()
+
     def send_email(self, to_email, subject, body):
-        """汎用的なメール送信メソッド"""
+        """SMTPでメールを直接送信する（送信ワーカーから呼ばれる。画面からは enqueue_email を使う）"""
         logger.debug(f"Preparing to send email to: {to_email}")
         
         try:
-            message = MIMEMultipart()
-            message["From"] = self.username
-            message["To"] = to_email
-            message["Subject"] = subject
-            
-            message.attach(MIMEText(body, "plain", "utf-8"))
-            
-            with smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=30) as server:
-                server.set_debuglevel(1)
-                server.starttls()
-                server.login(self.username, self.password)
-                server.send_message(message)
+            message = self.build_message(to_email, subject, body)
+            with self._session_lock:
+                self._send_message(message)
                 
             logger.debug(f"Email sent successfully to: {to_email}")
             return True
@@ -64,9 +131,41 @@ class EmailSender:
             logger.error(f"Failed to send email: {str(e)}", exc_info=True)
             raise
 
+    def send_many(self, messages):
+        """複数のメールを1つのSMTPセッションでまとめて送信する
+
+        messages は (宛先, 件名, 本文) の並び。戻り値は messages と同じ順で、
+        送信できたものは None、失敗したものはその例外。
+        1通の失敗（宛先の拒否など）では残りの送信を止めない。
+        """
+        messages = list(messages)
+        results = []
+        with self._session_lock:
+            for to_email, subject, body in messages:
+                try:
+                    self._send_message(self.build_message(to_email, subject, body))
+                    results.append(None)
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                    # そのメールだけの失敗で、セッションは使える状態のまま
+                    logger.error(f"Failed to send email to {to_email}: {e}")
+                    results.append(e)
+                except Exception as e:
+                    # 接続・認証の失敗は残りのメールも送れないため、同じエラーで打ち切る
+                    logger.error(f"SMTP session failed while sending to {to_email}: {e}")
+                    self._close_session()
+                    results.extend([e] * (len(messages) - len(results)))
+                    break
+        logger.debug(f"Sent {results.count(None)}/{len(results)} emails in one session")
+        return results
+
+    def close(self):
+        """SMTPセッションを閉じる"""
+        with self._session_lock:
+            self._close_session()
+
     def send_activation_email(self, to_email, activation_code):
-        """アクティベーションメールを送信"""
-        logger.debug(f"Preparing to send activation email to: {to_email}")
+        """アクティベーションメールを送信待ちに登録"""
+        logger.debug(f"Preparing activation email for: {to_email}")
         
         # 有効期限を24時間後に設定
         expiration_time = datetime.utcnow() + timedelta(hours=24)
@@ -84,20 +183,20 @@ class EmailSender:
         このメールに心当たりがない場合は、無視していただいて構いません。
         """
         
-        return self.send_email(to_email, "アカウントの有効化", body)
+        return self.enqueue_email(to_email, "アカウントの有効化", body)
 
     def send_follow_notification(self, to_email, follower_username):
-        """フォロー通知メールを送信"""
+        """フォロー通知メールを送信待ちに登録"""
         body = f"""
         {follower_username}さんがあなたをフォローしました。
 
         プロフィールを確認するにはアプリにログインしてください。
         """
         
-        return self.send_email(to_email, "新しいフォロワー", body)
+        return self.enqueue_email(to_email, "新しいフォロワー", body)
 
     def send_password_reset_email(self, to_email, reset_code):
-        """パスワードリセットメールを送信"""
+        """パスワードリセットメールを送信待ちに登録"""
         # 有効期限を1時間後に設定
         expiration_time = datetime.utcnow() + timedelta(hours=1)
         expiration_str = expiration_time.strftime('%Y-%m-%d %H:%M:%S UTC')
@@ -113,10 +212,10 @@ class EmailSender:
         このリクエストに心当たりがない場合は、このメールを無視してください。
         """
         
-        return self.send_email(to_email, "パスワードリセット", body)
+        return self.enqueue_email(to_email, "パスワードリセット", body)
 
     def send_welcome_email(self, to_email, username):
-        """アカウント有効化後のウェルカムメールを送信"""
+        """アカウント有効化後のウェルカムメールを送信待ちに登録"""
         body = f"""
         {username}さん、
 
@@ -131,7 +230,7 @@ class EmailSender:
         ご不明な点がございましたら、お気軽にお問い合わせください。
         """
         
-        return self.send_email(to_email, "ようこそ！", body)
+        return self.enqueue_email(to_email, "ようこそ！", body)
 
     def __str__(self):
         """EmailSenderオブジェクトの文字列表現"""
@@ -142,7 +241,7 @@ class EmailSender:
         return self.__str__()
     
     def send_verification_email(self, email, code):
-        """認証メールの送信"""
+        """認証メールを送信待ちに登録"""
         subject = "メールアドレス認証"
         body = f"""
         メールアドレス認証を完了してください。
@@ -153,4 +252,4 @@ class EmailSender:
         セキュリティのため、このメールは他人に共有しないでください。
         """
         
-        self.send_email(email, subject, body)
\ No newline at end of file
+        return self.enqueue_email(email, subject, body)
\ No newline at end of file
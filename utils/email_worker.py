@@ -0,0 +1,130 @@
+# utils/email_worker.py
+import logging
+import smtplib
+import threading
+
+from models.email_outbox import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+class EmailOutboxWorker:
+    """email_outbox の送信待ちメールをバックグラウンドスレッドで送信する
+
+    メールの登録（EmailOutbox.enqueue）は wake() でこのスレッドを起こすだけで、
+    SMTPの接続・送信は呼び出し元（Tkのメインスレッドなど）では行わない。
+    アプリを終了しても未送信のメールはテーブルに残り、次回起動時に送信される。
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    WORKER_CONFIG = {
+        "batch_size": 10,            # 1回に取得するメール数
+        "poll_interval": 5,          # 起こされなくても送信待ちを確認する間隔（秒）
+        "error_backoff": 30,         # DBエラーや設定不足のときに待つ時間（秒）
+        "release_stale_interval": 60,
+    }
+
+    def __init__(self, outbox=None, sender_factory=None):
+        self.outbox = outbox or EmailOutbox()
+        self.sender_factory = sender_factory or self._default_sender
+        self._sender = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _default_sender():
+        from utils.email_sender import EmailSender
+        return EmailSender()
+
+    @classmethod
+    def get_instance(cls):
+        """共有インスタンスを取得"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def wake(cls):
+        """メールが登録されたことを通知（ワーカーが動いていなければ何もしない）"""
+        if cls._instance is not None:
+            cls._instance._wakeup.set()
+
+    def start(self):
+        """送信スレッドを起動（起動済みなら何もしない）"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._sender is not None:
+            self._sender.close()
+
+    def _get_sender(self):
+        if self._sender is None:
+            self._sender = self.sender_factory()
+        return self._sender
+
+    def _run(self):
+        config = self.WORKER_CONFIG
+        since_release = config["release_stale_interval"]
+        while not self._stopping.is_set():
+            wait = config["poll_interval"]
+            try:
+                if since_release >= config["release_stale_interval"]:
+                    self.outbox.release_stale()
+                    since_release = 0
+                # 1バッチ分すべて取得できた場合は残りがあるかもしれないので待たずに続ける
+                if self.process_batch() >= config["batch_size"]:
+                    wait = 0
+            except ValueError as e:
+                # SMTPの設定不足。メールは pending のまま残す
+                logger.error(f"Email outbox worker is not configured: {e}")
+                wait = config["error_backoff"]
+            except Exception as e:
+                logger.error(f"Email outbox worker error: {e}", exc_info=True)
+                wait = config["error_backoff"]
+
+            since_release += wait
+            if wait:
+                self._wakeup.wait(wait)
+            self._wakeup.clear()
+
+    def process_batch(self):
+        """送信時刻になったメールを1バッチ送信し、取得した件数を返す"""
+        sender = self._get_sender()
+        messages = self.outbox.claim_due(self.WORKER_CONFIG["batch_size"])
+        if not messages:
+            return 0
+
+        # バッチはまとめて1つのSMTPセッションで送る
+        results = sender.send_many(
+            (message['to_email'], message['subject'], message['body']) for message in messages
+        )
+        for message, error in zip(messages, results):
+            if error is None:
+                self.outbox.mark_sent(message['outbox_id'])
+            else:
+                self.outbox.mark_failed(
+                    message['outbox_id'], message['attempts'], error,
+                    permanent=self.is_permanent_error(error)
+                )
+        return len(messages)
+
+    @staticmethod
+    def is_permanent_error(error):
+        """再送しても成功しないエラー（宛先の拒否や5xx応答）か"""
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return True
+        if isinstance(error, (smtplib.SMTPSenderRefused, smtplib.SMTPDataError)):
+            return 500 <= error.smtp_code < 600
+        return False
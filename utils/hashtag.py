@@ -0,0 +1,29 @@
+# utils/hashtag.py
+import re
+import unicodedata
+
+# 「#」または全角「＃」で始まり、文字・数字・アンダースコアが続くもの
+# \w はUnicode対応のため、ひらがな・カタカナ・漢字・長音記号（ー）も含まれる
+# 直前が文字の場合（abc#def など）はハッシュタグとみなさない
+HASHTAG_PATTERN = re.compile(r'(?<!\w)[#＃](\w+)')
+
+# hashtags.tag_name の列サイズ
+MAX_TAG_LENGTH = 100
+
+
+def normalize_hashtag(tag):
+    """ハッシュタグを正規化（先頭の#を除去、NFKC正規化、小文字化）"""
+    tag = unicodedata.normalize('NFKC', tag.strip())
+    tag = tag.lstrip('#')
+    return tag.lower()[:MAX_TAG_LENGTH]
+
+
+def extract_hashtags(content):
+    """投稿本文からハッシュタグを抽出（正規化済み・重複なし・出現順）"""
+    tags = []
+    for match in HASHTAG_PATTERN.finditer(content or ''):
+        tag = normalize_hashtag(match.group(1))
+        # 数字だけのもの（#1 など）はハッシュタグとして扱わない
+        if tag and not tag.isdigit() and tag not in tags:
+            tags.append(tag)
+    return tags
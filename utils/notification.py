@@ -1,32 +1,195 @@
+import atexit
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
-class NotificationManager:
-    def __init__(self, email_sender):
-        self.email_sender = email_sender
-        logger.debug(f"NotificationManager initialized with EmailSender: {email_sender}")
-        
-    def notify_new_follower(self, user_email, follower_username):
-        try:
-            logger.debug(f"Sending follow notification:")
-            logger.debug(f"To: {user_email}")
-            logger.debug(f"From: {self.email_sender.username}")
-            logger.debug(f"Follower: {follower_username}")
-            
+class FollowNotificationDigest:
+    """フォロー通知を受信者ごとにまとめ、1通のダイジェストメールにする
+
+    フォローのたびにメールを送らず、受信者ごとにフォロワーを溜めておき、
+    最初のフォローから flush_interval 秒経つか max_pending 人溜まったら
+    「X、Yさんほか48人があなたをフォローしました」として送信待ちに登録する。
+    送信前にフォロー解除された分は取り除き、dedup_window 秒以内に通知済みの
+    フォロワーは（フォロー解除→再フォローを繰り返しても）再度通知しない。
+    溜めている通知はメモリ上にあり、アプリの終了時に送信待ちへ登録する。
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    DIGEST_CONFIG = {
+        "flush_interval": 600,    # 最初のフォローからダイジェストを送るまでの時間（秒）
+        "max_pending": 50,        # この人数溜まったら待たずに送る
+        "dedup_window": 86400,    # 同じフォロワーを再度通知しない期間（秒）
+        "names_in_message": 2,    # 本文に名前を出す人数
+    }
+
+    def __init__(self, enqueue=None, clock=time.monotonic, config=None):
+        self.config = dict(self.DIGEST_CONFIG, **(config or {}))
+        self.enqueue = enqueue or self._default_enqueue
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._pending = {}    # 受信者ID -> {'email', 'since', 'followers': {フォロワーID: ユーザー名}}
+        self._notified = {}   # (受信者ID, フォロワーID) -> 通知した時刻
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _default_enqueue(to_email, subject, body):
+        from models.email_outbox import EmailOutbox
+        return EmailOutbox().enqueue(to_email, subject, body)
+
+    @classmethod
+    def get_instance(cls):
+        """共有インスタンスを取得（初回は定期送信のスレッドを起動）"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = cls()
+                    instance.start()
+                    cls._instance = instance
+        return cls._instance
+
+    @classmethod
+    def notify_unfollow(cls, follower_id, followed_id):
+        """フォロー解除を反映（まだ送っていない通知から取り除く）"""
+        if cls._instance is not None:
+            cls._instance.record_unfollow(follower_id, followed_id)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="follow-digest", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush_all)
+
+    def record_follow(self, recipient_id, recipient_email, follower_id, follower_username):
+        """フォローを記録（max_pending に達したらその場で送信待ちに登録）"""
+        now = self.clock()
+        with self._lock:
+            notified_at = self._notified.get((recipient_id, follower_id))
+            if notified_at is not None and now - notified_at < self.config["dedup_window"]:
+                return
+            entry = self._pending.get(recipient_id)
+            if entry is None:
+                entry = {'email': recipient_email, 'since': now, 'followers': {}}
+                self._pending[recipient_id] = entry
+                self._wakeup.set()
+            entry['email'] = recipient_email
+            entry['followers'][follower_id] = follower_username
+            if len(entry['followers']) < self.config["max_pending"]:
+                return
+            digest = self._take_locked(recipient_id, now)
+        self._send(digest)
+
+    def record_unfollow(self, follower_id, followed_id):
+        with self._lock:
+            entry = self._pending.get(followed_id)
+            if entry is None:
+                return
+            entry['followers'].pop(follower_id, None)
+            if not entry['followers']:
+                del self._pending[followed_id]
+
+    def _take_locked(self, recipient_id, now):
+        """受信者の溜まっている通知を取り出し、通知済みとして記録する（ロック保持中に呼ぶ）"""
+        entry = self._pending.pop(recipient_id)
+        for follower_id in entry['followers']:
+            self._notified[(recipient_id, follower_id)] = now
+        return entry
+
+    def flush_due(self):
+        """送信時刻になった受信者のダイジェストを送信待ちに登録し、次に確認するまでの秒数を返す"""
+        now = self.clock()
+        interval = self.config["flush_interval"]
+        with self._lock:
+            due = [recipient_id for recipient_id, entry in self._pending.items()
+                   if now - entry['since'] >= interval]
+            digests = [self._take_locked(recipient_id, now) for recipient_id in due]
+            self._prune_notified_locked(now)
+            next_wait = min(
+                (entry['since'] + interval - now for entry in self._pending.values()),
+                default=None
+            )
+        for digest in digests:
+            self._send(digest)
+        return next_wait
+
+    def flush_all(self):
+        """溜まっている通知をすべて送信待ちに登録"""
+        now = self.clock()
+        with self._lock:
+            digests = [self._take_locked(recipient_id, now) for recipient_id in list(self._pending)]
+        for digest in digests:
+            self._send(digest)
+
+    def _prune_notified_locked(self, now):
+        window = self.config["dedup_window"]
+        expired = [key for key, notified_at in self._notified.items() if now - notified_at >= window]
+        for key in expired:
+            del self._notified[key]
+
+    def compose(self, follower_names):
+        """ダイジェストの件名と本文"""
+        shown = follower_names[:self.config["names_in_message"]]
+        others = len(follower_names) - len(shown)
+        names = "、".join(shown)
+        if others:
+            summary = f"{names}さんほか{others}人があなたをフォローしました。"
+            subject = f"新しいフォロワー（{len(follower_names)}人）"
+        else:
+            summary = f"{names}さんがあなたをフォローしました。"
             subject = "新しいフォロワー"
-            body = f"""
-            {follower_username}さんがあなたをフォローしました。
+        body = f"""
+            {summary}
             プロフィールを確認するにはアプリにログインしてください。
             """
-            
-            success = self.email_sender.send_email(user_email, subject, body)
-            
-            if success:
-                logger.debug("Follow notification email sent successfully")
-            else:
-                logger.warning("Follow notification email sending returned False")
-                
+        return subject, body
+
+    def _send(self, digest):
+        subject, body = self.compose(list(digest['followers'].values()))
+        try:
+            # 送信はバックグラウンドの送信ワーカーが行う
+            outbox_id = self.enqueue(digest['email'], subject, body)
+            logger.debug(f"Follow digest queued for {digest['email']} "
+                         f"({len(digest['followers'])} followers, outbox_id={outbox_id})")
+        except Exception as e:
+            logger.error(f"Failed to queue follow digest: {e}", exc_info=True)
+
+    def _run(self):
+        while True:
+            # 確認中に記録されたフォローで起こされるよう、先にクリアする
+            self._wakeup.clear()
+            try:
+                wait = self.flush_due()
+            except Exception as e:
+                logger.error(f"Follow digest error: {e}", exc_info=True)
+                wait = self.config["flush_interval"]
+            # 溜まっている通知がなければ、次のフォローが記録されるまで待つ
+            self._wakeup.wait(wait)
+
+
+class NotificationManager:
+    def __init__(self, digest=None):
+        """digest を省略すると共有の FollowNotificationDigest を使う（SMTPの設定は不要）"""
+        self.digest = digest
+
+    def notify_new_follower(self, followed_user, follower):
+        """フォロー通知を記録（メールはダイジェストとしてまとめて送る）"""
+        try:
+            logger.debug(f"Recording follow notification:")
+            logger.debug(f"To: {followed_user['email']}")
+            logger.debug(f"Follower: {follower['username']}")
+
+            digest = self.digest or FollowNotificationDigest.get_instance()
+            digest.record_follow(
+                followed_user['user_id'],
+                followed_user['email'],
+                follower['user_id'],
+                follower['username']
+            )
+
         except Exception as e:
-            logger.error(f"Failed to send follow notification: {e}", exc_info=True)
-            raise
\ No newline at end of file
+            logger.error(f"Failed to record follow notification: {e}", exc_info=True)
+            raise
@@ -0,0 +1,100 @@
+# utils/password_hasher.py
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# bcrypt のコスト（2 ** rounds 回の反復）。scripts/benchmark_bcrypt.py で環境に合った値を選ぶ
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+
+
+def _hash_password(password, rounds):
+    """パスワードをハッシュ化（ワーカープロセスで実行）"""
+    salt = bcrypt.gensalt(rounds=rounds)
+    password_hash = bcrypt.hashpw(password.encode('utf-8'), salt)
+    return {
+        'password_hash': password_hash.decode('utf-8'),
+        'salt': salt.decode('utf-8')
+    }
+
+
+def _check_password(password, stored_hash):
+    """パスワードを検証（ワーカープロセスで実行）"""
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+    except Exception:
+        return False
+
+
+class PasswordHasher:
+    """bcrypt のハッシュ化・検証をプロセスプールで実行する
+
+    bcrypt は意図的に重い処理のため、呼び出し元のスレッド（Tkのメインスレッドなど）で
+    実行せず、CPUコア数のワーカープロセスに振り分ける。
+    *_async は Future を返し、hash / verify は結果を待って返す。
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, rounds=None, max_workers=None):
+        self.rounds = rounds or BCRYPT_ROUNDS
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """共有インスタンスを取得"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Tkやワーカースレッドを持つプロセスを fork しないよう spawn で起動する
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _submit(self, func, *args):
+        try:
+            return self._get_executor().submit(func, *args)
+        except BrokenProcessPool:
+            # ワーカープロセスが異常終了していた場合はプールを作り直す
+            logger.warning("Password hashing pool was broken; restarting it")
+            self.shutdown(wait=False)
+            return self._get_executor().submit(func, *args)
+
+    def hash_async(self, password):
+        """パスワードをハッシュ化（Future の結果は {'password_hash', 'salt'}）"""
+        return self._submit(_hash_password, password, self.rounds)
+
+    def verify_async(self, password, stored_hash):
+        """パスワードを検証（Future の結果は bool）"""
+        return self._submit(_check_password, password, stored_hash)
+
+    def hash(self, password):
+        return self.hash_async(password).result()
+
+    def verify(self, password, stored_hash):
+        return self.verify_async(password, stored_hash).result()
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,63 @@
+# utils/post_text.py
+import re
+import threading
+from collections import OrderedDict
+
+# ハッシュタグ（utils.hashtag.HASHTAG_PATTERN と同じ規則）またはメンション（@ユーザー名）
+LINK_PATTERN = re.compile(r'(?<!\w)(?:[#＃](\w+)|@(\w+))')
+
+# 分割結果を保持する投稿数
+TOKEN_CACHE_SIZE = 2048
+
+_token_cache = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+
+def tokenize_content(content):
+    """投稿本文を (文字列, 種類) の並びに分割する
+
+    種類は None（通常の文字列）、'hashtag'、'mention' のいずれか。
+    数字だけのハッシュタグ（#1 など）は extract_hashtags と同様に通常の文字列として扱う。
+    """
+    tokens = []
+    position = 0
+    for match in LINK_PATTERN.finditer(content or ''):
+        tag, username = match.groups()
+        if tag is not None and tag.isdigit():
+            continue
+        if match.start() > position:
+            tokens.append((content[position:match.start()], None))
+        tokens.append((match.group(0), 'hashtag' if tag is not None else 'mention'))
+        position = match.end()
+    if position < len(content or ''):
+        tokens.append((content[position:], None))
+    return tuple(tokens)
+
+
+def get_post_tokens(post):
+    """投稿本文の分割結果を (post_id, updated_at) をキーにキャッシュして返す
+
+    投稿を編集すると updated_at が変わるため、古い分割結果は使われない。
+    """
+    post_id = post.get('post_id')
+    if post_id is None:
+        return tokenize_content(post['content'])
+
+    key = (post_id, post.get('updated_at'))
+    with _token_cache_lock:
+        tokens = _token_cache.get(key)
+        if tokens is not None:
+            _token_cache.move_to_end(key)
+            return tokens
+
+    tokens = tokenize_content(post['content'])
+    with _token_cache_lock:
+        _token_cache[key] = tokens
+        if len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    return tokens
+
+
+def clear_token_cache():
+    with _token_cache_lock:
+        _token_cache.clear()
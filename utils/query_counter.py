@@ -0,0 +1,193 @@
+# utils/query_counter.py
+import contextvars
+import functools
+import logging
+import os
+import threading
+import traceback
+from collections import Counter
+
+from config.query_stats import QueryStats
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNTER_CONFIG = {
+    # QUERY_DEBUG=1 で有効（無効のときはクエリを数えず、コストもかからない）
+    "enabled": os.getenv('QUERY_DEBUG', '0') == '1',
+    # 1つの処理の中で同じ形の文（フィンガープリント）を何回まで許すか
+    "repeat_budget": int(os.getenv('QUERY_REPEAT_BUDGET', 3)),
+    # 予算を超えたら例外にする（テスト用）。False なら警告ログのみ
+    "strict": os.getenv('QUERY_BUDGET_STRICT', '0') == '1',
+    # 警告に出す呼び出し元のフレーム数
+    "stack_depth": 8,
+}
+
+# スタックから除くモジュール（DB層やスレッドの内部）
+_INTERNAL_FRAMES = (
+    os.path.join("config", "database.py"),
+    os.path.join("config", "query_stats.py"),
+    os.path.join("config", "sqlite_backend.py"),
+    os.path.join("utils", "query_counter.py"),
+    os.path.join("utils", "background.py"),
+    "pymysql",
+    "concurrent",
+    "threading.py",
+    "contextlib.py",
+)
+
+# 現在のスレッド（コンテキスト）で有効な QueryCounter のタプル（入れ子の外側から順）
+_active = contextvars.ContextVar("query_counters", default=())
+_listener_lock = threading.Lock()
+_listener_installed = False
+
+
+class QueryBudgetExceeded(AssertionError):
+    """1つの処理で同じ形の文が予算を超えて実行された（N+1 の疑い）"""
+
+
+def _on_query(key, elapsed_ms):
+    for counter in _active.get():
+        counter._record(key)
+
+
+def _install_listener():
+    global _listener_installed
+    with _listener_lock:
+        if not _listener_installed:
+            QueryStats.get_instance().add_listener(_on_query)
+            _listener_installed = True
+
+
+def _call_site():
+    """アプリ側の呼び出し元のフレーム（DB層の内部は除く）"""
+    frames = [
+        frame for frame in traceback.extract_stack()[:-1]
+        if not any(part in frame.filename for part in _INTERNAL_FRAMES)
+    ]
+    return frames[-QUERY_COUNTER_CONFIG["stack_depth"]:]
+
+
+class QueryCounter:
+    """ひとまとまりの処理（画面の読み込みなど）で実行したSQLを数え、N+1 を検出する
+
+        with QueryCounter("TimelineView.load_posts"):
+            ...
+
+    処理中に BackgroundLoader へ投入したワーカーの処理も同じカウンタで数え、
+    それらが終わった時点で集計する。同じフィンガープリントの文が repeat_budget 回を
+    超えて実行されると、超えた時点の呼び出し元を付けて警告する（strict なら例外）。
+    ワーカーの処理が残っている場合の例外は wait() で受け取る。
+    """
+
+    def __init__(self, name, repeat_budget=None, strict=None, enabled=None):
+        self.name = name
+        self.repeat_budget = QUERY_COUNTER_CONFIG["repeat_budget"] if repeat_budget is None else repeat_budget
+        self.strict = QUERY_COUNTER_CONFIG["strict"] if strict is None else strict
+        self.enabled = QUERY_COUNTER_CONFIG["enabled"] if enabled is None else enabled
+        self.statements = 0
+        self.fingerprints = Counter()
+        self.call_sites = {}   # 予算を超えたフィンガープリント -> 超えた時点の呼び出し元
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._exited = False
+        self._finished = threading.Event()
+        self._token = None
+
+    def __enter__(self):
+        if self.enabled:
+            _install_listener()
+            self._token = _active.set(_active.get() + (self,))
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if not self.enabled:
+            return False
+        _active.reset(self._token)
+        with self._lock:
+            self._exited = True
+            done = self._pending == 0
+        if done:
+            self._finish(raise_error=exc_type is None)
+        return False
+
+    def _record(self, key):
+        with self._lock:
+            if self._finished.is_set():
+                return
+            self.statements += 1
+            self.fingerprints[key] += 1
+            over_budget = self.fingerprints[key] == self.repeat_budget + 1
+        if over_budget:
+            self.call_sites[key] = _call_site()
+
+    def track(self, future):
+        """この処理の一部として実行中のワーカーの Future を登録"""
+        with self._lock:
+            self._pending += 1
+        future.add_done_callback(self._task_done)
+
+    def _task_done(self, future):
+        with self._lock:
+            self._pending -= 1
+            done = self._exited and self._pending == 0
+        if done:
+            self._finish(raise_error=False)
+
+    @property
+    def repeated(self):
+        """2回以上実行したフィンガープリントと回数"""
+        return {key: n for key, n in self.fingerprints.items() if n > 1}
+
+    @property
+    def violations(self):
+        """予算を超えたフィンガープリントと回数"""
+        return {key: n for key, n in self.fingerprints.items() if n > self.repeat_budget}
+
+    def report(self):
+        lines = [
+            f"{self.name}: {self.statements} statements, "
+            f"{len(self.fingerprints)} distinct, {len(self.repeated)} repeated"
+        ]
+        for key, n in sorted(self.violations.items(), key=lambda item: -item[1]):
+            lines.append(f"  {n}x (budget {self.repeat_budget}) {key}")
+            for frame in self.call_sites.get(key, []):
+                lines.append(f"      {frame.filename}:{frame.lineno} in {frame.name}")
+        return "\n".join(lines)
+
+    def _finish(self, raise_error):
+        self._finished.set()
+        if not self.violations:
+            logger.debug(self.report())
+            return
+        message = f"Possible N+1 queries in {self.report()}"
+        if self.strict and raise_error:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+    def wait(self, timeout=None):
+        """ワーカーの処理も含めて集計が終わるまで待つ（strict なら予算超過で例外）"""
+        if self.enabled and not self._finished.wait(timeout):
+            raise TimeoutError(f"{self.name}: background queries did not finish in time")
+        if self.strict and self.violations:
+            raise QueryBudgetExceeded(f"Possible N+1 queries in {self.report()}")
+        return self
+
+
+def active_counters():
+    """現在のコンテキストで有効な QueryCounter"""
+    return _active.get()
+
+
+def count_queries(name=None, repeat_budget=None):
+    """メソッドの呼び出しを QueryCounter で囲むデコレータ"""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not QUERY_COUNTER_CONFIG["enabled"]:
+                return func(*args, **kwargs)
+            with QueryCounter(label, repeat_budget=repeat_budget):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,214 @@
+# utils/trending.py
+import bisect
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+class TrendingHashtags:
+    """時間バケットでハッシュタグの出現数を保持し、減衰スコアでトレンドを返す
+
+    スコアは「前方減衰」で保持する: 各出現に 2 ** ((バケット時刻 - 基準時刻) / 半減期) の
+    重みを掛けて加算する。全タグが同じ割合で減衰するため順位は時間経過では変わらず、
+    変わるのは出現の追加とウィンドウ外バケットの削除のときだけになる。
+    そのため (スコア, タグ) のソート済みリストを更新時に保守し、上位K件を O(K) で返せる。
+    """
+    _instance = None
+    _building = None       # 初回の再構築中のインスタンス（その間の通知はこちらで保留する）
+    _instance_lock = threading.Lock()
+
+    # 重みの指数がこれを超えたら基準時刻を進めて桁あふれを防ぐ
+    MAX_WEIGHT_EXPONENT = 60
+
+    def __init__(self, bucket_seconds=300, window_seconds=86400, half_life_seconds=7200, clock=time.time):
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = max(1, window_seconds // bucket_seconds)
+        self.half_life_seconds = half_life_seconds
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._reset()
+
+    @classmethod
+    def get_instance(cls):
+        """共有インスタンスを取得（初回は post_hashtags から再構築）"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = cls()
+                    cls._building = instance
+                    try:
+                        instance.rebuild()
+                    except Exception as e:
+                        logger.error(f"Failed to rebuild trending hashtags: {e}")
+                    finally:
+                        cls._building = None
+                    cls._instance = instance
+        return cls._instance
+
+    @classmethod
+    def notify_post(cls, tags, created_at):
+        """新規投稿のハッシュタグを反映（未構築の場合は次回の再構築で読み込まれる）"""
+        cls.notify_post_update(tags, (), created_at)
+
+    @classmethod
+    def notify_post_update(cls, added, removed, created_at):
+        """投稿の編集で付いた・外れたハッシュタグを反映"""
+        instance = cls._instance or cls._building
+        if instance is not None:
+            instance.apply(added, removed, created_at)
+
+    def _reset(self):
+        self._pending = None   # 再構築中に届いた (追加, 削除, 投稿日時)
+        self._buckets = {}     # バケット番号 -> {タグ: 出現数}
+        self._counts = {}      # タグ -> ウィンドウ内の出現数
+        self._scores = {}      # タグ -> 前方減衰スコア
+        self._ranking = []     # (スコア, タグ) の昇順リスト
+        self._reference = self._bucket_of(self.clock())
+
+    def _bucket_of(self, timestamp):
+        return int(timestamp // self.bucket_seconds)
+
+    def _exponent(self, bucket):
+        return (bucket - self._reference) * self.bucket_seconds / self.half_life_seconds
+
+    def _weight(self, bucket):
+        return 2.0 ** self._exponent(bucket)
+
+    def _set_score(self, tag, score):
+        """スコアを更新し、ソート済みリスト上の位置も差し替える"""
+        old = self._scores.get(tag)
+        if old is not None:
+            index = bisect.bisect_left(self._ranking, (old, tag))
+            del self._ranking[index]
+        if self._counts.get(tag, 0) > 0:
+            self._scores[tag] = score
+            bisect.insort(self._ranking, (score, tag))
+        else:
+            self._scores.pop(tag, None)
+            self._counts.pop(tag, None)
+
+    def _rebase(self, bucket):
+        """基準時刻を進め、保持しているスコアを同じ比率で縮める"""
+        factor = 2.0 ** -self._exponent(bucket)
+        self._reference = bucket
+        self._scores = {tag: score * factor for tag, score in self._scores.items()}
+        self._ranking = sorted((score, tag) for tag, score in self._scores.items())
+
+    def _expire(self, now_bucket):
+        """ウィンドウから外れたバケットの出現を取り除く"""
+        if self._exponent(now_bucket) > self.MAX_WEIGHT_EXPONENT:
+            self._rebase(now_bucket)
+        cutoff = now_bucket - self.num_buckets + 1
+        for bucket in [b for b in self._buckets if b < cutoff]:
+            weight = self._weight(bucket)
+            for tag, count in self._buckets.pop(bucket).items():
+                self._counts[tag] = self._counts.get(tag, 0) - count
+                self._set_score(tag, self._scores.get(tag, 0.0) - count * weight)
+
+    def add(self, tag, timestamp, count=1):
+        """タグの出現を追加"""
+        with self._lock:
+            now_bucket = self._bucket_of(self.clock())
+            self._expire(now_bucket)
+            bucket = self._bucket_of(timestamp)
+            if bucket < now_bucket - self.num_buckets + 1:
+                return
+            if self._exponent(bucket) > self.MAX_WEIGHT_EXPONENT:
+                self._rebase(bucket)
+
+            bucket_counts = self._buckets.setdefault(bucket, {})
+            bucket_counts[tag] = bucket_counts.get(tag, 0) + count
+            self._counts[tag] = self._counts.get(tag, 0) + count
+            self._set_score(tag, self._scores.get(tag, 0.0) + count * self._weight(bucket))
+
+    def discard(self, tag, timestamp, count=1):
+        """タグの出現を取り除く（記録していない分は無視する）"""
+        with self._lock:
+            self._expire(self._bucket_of(self.clock()))
+            bucket = self._bucket_of(timestamp)
+            bucket_counts = self._buckets.get(bucket)
+            count = min(count, bucket_counts.get(tag, 0)) if bucket_counts else 0
+            if count <= 0:
+                return
+
+            bucket_counts[tag] -= count
+            if not bucket_counts[tag]:
+                del bucket_counts[tag]
+            if not bucket_counts:
+                del self._buckets[bucket]
+            self._counts[tag] -= count
+            self._set_score(tag, self._scores.get(tag, 0.0) - count * self._weight(bucket))
+
+    def record(self, tags, created_at):
+        """1件の投稿に含まれるハッシュタグを追加"""
+        self.apply(tags, (), created_at)
+
+    def apply(self, added, removed, created_at):
+        """1件の投稿のハッシュタグの追加・削除を反映（再構築中は読み込みが終わるまで保留する）"""
+        timestamp = created_at.timestamp()
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((added, removed, created_at))
+                return
+            for tag in removed:
+                self.discard(tag, timestamp)
+            for tag in added:
+                self.add(tag, timestamp)
+
+    def top(self, k=10):
+        """トレンド上位K件を取得（スコアは現在時刻に換算した減衰済み出現数）"""
+        with self._lock:
+            now_bucket = self._bucket_of(self.clock())
+            self._expire(now_bucket)
+            now_weight = self._weight(now_bucket)
+            return [
+                {
+                    'tag_name': tag,
+                    'count': self._counts[tag],
+                    'score': score / now_weight,
+                }
+                for score, tag in reversed(self._ranking[-k:])
+            ] if k > 0 else []
+
+    def rebuild(self, db=None):
+        """post_hashtags のウィンドウ内の行からバケットを作り直す
+
+        集計の実行中に届いた通知は保留し、読み込んだ後に反映する
+        （集計の直前にコミットされ、通知が集計の後に届いた投稿は二重に数えることがある）。
+        """
+        if db is None:
+            from config.database import DatabasePool
+            db = DatabasePool.get_instance()
+
+        since = datetime.fromtimestamp(self.clock()) - timedelta(
+            seconds=self.num_buckets * self.bucket_seconds
+        )
+        # バケット単位で集計してから読み込む（行数はタグ数 × バケット数に収まる）
+        query = """
+        SELECT h.tag_name,
+               FLOOR(UNIX_TIMESTAMP(ph.created_at) / %s) as bucket,
+               COUNT(*) as n
+        FROM post_hashtags ph
+        JOIN hashtags h ON h.hashtag_id = ph.hashtag_id
+        WHERE ph.created_at >= %s
+        GROUP BY h.tag_name, bucket
+        """
+        with self._lock:
+            self._pending = []
+        rows = None
+        try:
+            rows = db.execute_query(query, (self.bucket_seconds, since))
+        finally:
+            with self._lock:
+                pending = self._pending
+                if rows is not None:
+                    self._reset()
+                    for row in rows:
+                        bucket = int(row['bucket'])
+                        self.add(row['tag_name'], bucket * self.bucket_seconds, row['n'])
+                self._pending = None
+                for added, removed, created_at in pending:
+                    self.apply(added, removed, created_at)
+        logger.info(f"Trending hashtags rebuilt from {len(rows)} buckets")
@@ -1,15 +1,21 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from models.comment import Comment
+from utils.background import BackgroundLoader
 
 class CommentDialog(tk.Toplevel):
-    def __init__(self, parent, post_id, session_manager, refresh_callback=None):  # refresh_callbackを追加
+    def __init__(self, parent, post_id, session_manager, view_model=None, loader=None):
         super().__init__(parent)
         self.parent = parent
         self.post_id = post_id
         self.session_manager = session_manager
         self.comment_model = Comment()
-        self.refresh_callback = refresh_callback  # コールバック関数を保存
+        self.view_model = view_model  # 投稿一覧のコメント数（PostViewModel）
+        self.loader = BackgroundLoader(self)
+        # ダイアログを閉じた後でもコメント数の確定・取り消しを反映できるよう、
+        # 送信結果は呼び出し元の画面の loader で受け取る
+        self.send_loader = loader or self.loader
+        self.sent_count = 0
 
         self.title("コメント")
         self.geometry("400x400")
@@ -33,31 +39,52 @@ class CommentDialog(tk.Toplevel):
         send_button.pack(anchor=tk.E, pady=(5, 0))
 
     def load_comments(self):
-        """コメントの読み込み"""
-        try:
-            comments = self.comment_model.get_comments_for_post(self.post_id)
-            self.comment_listbox.delete(0, tk.END)
-            for comment in comments:
-                self.comment_listbox.insert(tk.END, f"{comment['username']}: {comment['content']}")
-        except Exception as e:
-            messagebox.showerror("エラー", f"コメントの読み込み中にエラーが発生しました: {e}")
+        """コメントの読み込み（DB処理はワーカースレッドで実行）"""
+        self.comment_listbox.delete(0, tk.END)
+        self.comment_listbox.insert(tk.END, "読み込み中...")
+        self.loader.run(
+            "comments",
+            lambda: self.comment_model.get_comments_for_post(self.post_id),
+            self.show_comments,
+            on_error=lambda e: messagebox.showerror("エラー", f"コメントの読み込み中にエラーが発生しました: {e}")
+        )
+
+    def show_comments(self, comments):
+        """取得したコメントを表示"""
+        self.comment_listbox.delete(0, tk.END)
+        for comment in comments:
+            self.comment_listbox.insert(tk.END, f"{comment['username']}: {comment['content']}")
 
     def on_send(self):
-        """コメントの送信処理"""
+        """コメントの送信処理（コメント数は先に増やし、失敗したら元に戻す）"""
         content = self.comment_entry.get().strip()
         if not content:
             messagebox.showwarning("警告", "コメント内容を入力してください。")
             return
 
-        try:
-            user = self.session_manager.get_current_user()
-            self.comment_model.create_comment(user['user_id'], self.post_id, content)
-            self.comment_entry.delete(0, tk.END)
-            self.load_comments()
-            
-            # タイムラインの更新
-            if self.refresh_callback:
-                self.refresh_callback()
-            
-        except Exception as e:
-            messagebox.showerror("エラー", f"コメントの送信中にエラーが発生しました: {e}")
\ No newline at end of file
+        user = self.session_manager.get_current_user()
+        self.comment_entry.delete(0, tk.END)
+        if self.view_model is not None:
+            self.view_model.begin_comment()
+
+        def on_sent(comment):
+            if self.view_model is not None:
+                self.view_model.finish_comment()
+            if self.winfo_exists():
+                self.load_comments()
+
+        def on_error(error):
+            if self.view_model is not None:
+                self.view_model.rollback_comment()
+            if self.winfo_exists():
+                self.comment_entry.insert(0, content)
+            messagebox.showerror("エラー", f"コメントの送信中にエラーが発生しました: {error}")
+
+        # 続けて送信しても前の結果が捨てられないよう、送信ごとに別のキーを使う
+        self.sent_count += 1
+        self.send_loader.run(
+            f"comment:{self.post_id}:{id(self)}:{self.sent_count}",
+            lambda: self.comment_model.create_comment(user['user_id'], self.post_id, content),
+            on_sent,
+            on_error=on_error
+        )
@@ -1,5 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from utils.background import BackgroundLoader
+from utils.query_counter import count_queries
 
 class FollowListView:
     def __init__(self, parent, session_manager, app, user_id):
@@ -16,21 +18,52 @@ class FollowListView:
         self.follow_model = Follow()
         self.user_model = User()
 
-        # フォロー情報の取得
-        self.following_list = self.follow_model.get_following(self.user_id)
-        self.followers_list = self.follow_model.get_followers(self.user_id)
+        # フォロー情報（読み込み完了まではNone）
+        self.following_list = None
+        self.followers_list = None
+
+        # メインフレームの作成
+        self.create_widgets()
+
+        # フォロー情報はワーカースレッドで取得
+        self.load_follow_data()
+
+    @count_queries()
+    def load_follow_data(self):
+        """フォロー情報の読み込み（DB処理はワーカースレッドで実行）"""
+        self.loader.run(
+            "follow_data",
+            self.fetch_follow_data,
+            self.on_follow_data_loaded,
+            on_error=lambda e: messagebox.showerror("エラー", f"フォロー情報の読み込み中にエラーが発生しました: {e}")
+        )
+
+    def fetch_follow_data(self):
+        """ユーザー情報とフォロー/フォロワー一覧を取得（ワーカースレッドで実行）"""
+        return {
+            'user': self.user_model.get_user(self.user_id),
+            'following': self.follow_model.get_following(self.user_id),
+            'followers': self.follow_model.get_followers(self.user_id),
+        }
+
+    def on_follow_data_loaded(self, data):
+        """取得したフォロー情報を画面に反映"""
+        self.following_list = data['following']
+        self.followers_list = data['followers']
 
         print(f"Following count: {len(self.following_list) if self.following_list else 0}")  # デバッグ出力
         print(f"Followers count: {len(self.followers_list) if self.followers_list else 0}")  # デバッグ出力
 
-        # メインフレームの作成
-        self.create_widgets()
+        if data['user']:
+            self.username_label.configure(text=f"{data['user']['username']}のフォロー/フォロワー")
+        self.refresh_tabs()
 
     def create_widgets(self):
         """ウィジェットの作成"""
         # メインフレーム
         self.frame = ttk.Frame(self.parent, padding="20")
         self.frame.pack(fill=tk.BOTH, expand=True)
+        self.loader = BackgroundLoader(self.frame)
 
         # ヘッダー（戻るボタン）
         self.create_header()
@@ -60,7 +93,13 @@ class FollowListView:
         canvas.configure(yscrollcommand=scrollbar.set)
 
         # ユーザーリストの表示
-        if not users:
+        if users is None:
+            ttk.Label(
+                scrollable_frame,
+                text="読み込み中...",
+                foreground='gray'
+            ).pack(pady=20, padx=10)
+        elif not users:
             message = "フォロー中のユーザーはいません" if is_following_list else "フォロワーはいません"
             ttk.Label(
                 scrollable_frame,
@@ -113,16 +152,21 @@ class FollowListView:
         
         # フォロー中タブ
         following_tab = ttk.Frame(self.tab_control)
-        self.tab_control.add(following_tab, text=f'フォロー中 ({len(self.following_list) if self.following_list else 0})')
+        self.tab_control.add(following_tab, text=f'フォロー中 ({self.format_count(self.following_list)})')
         self.create_list_frame(following_tab, self.following_list, True)
 
         # フォロワータブ
         followers_tab = ttk.Frame(self.tab_control)
-        self.tab_control.add(followers_tab, text=f'フォロワー ({len(self.followers_list) if self.followers_list else 0})')
+        self.tab_control.add(followers_tab, text=f'フォロワー ({self.format_count(self.followers_list)})')
         self.create_list_frame(followers_tab, self.followers_list, False)
 
         self.tab_control.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
 
+    @staticmethod
+    def format_count(users):
+        """タブに表示する件数（読み込み中は「-」）"""
+        return "-" if users is None else len(users)
+
     def create_header(self):
         """ヘッダーの作成"""
         header_frame = ttk.Frame(self.frame)
@@ -136,15 +180,13 @@ class FollowListView:
         )
         back_button.pack(side=tk.LEFT)
 
-        # ユーザー名の表示
-        user = self.user_model.get_user(self.user_id)
-        if user:
-            username_label = ttk.Label(
-                header_frame,
-                text=f"{user['username']}のフォロー/フォロワー",
-                font=('Helvetica', 12, 'bold')
-            )
-            username_label.pack(side=tk.LEFT, padx=20)
+        # ユーザー名の表示（ユーザー情報の読み込み後に設定）
+        self.username_label = ttk.Label(
+            header_frame,
+            text="",
+            font=('Helvetica', 12, 'bold')
+        )
+        self.username_label.pack(side=tk.LEFT, padx=20)
 
     def unfollow_user(self, target_user_id):
         """ユーザーのフォロー解除"""
@@ -154,11 +196,8 @@ class FollowListView:
                 target_user_id
             )
             messagebox.showinfo("成功", "フォローを解除しました")
-            # フォロー情報を再取得
-            self.following_list = self.follow_model.get_following(self.user_id)
-            self.followers_list = self.follow_model.get_followers(self.user_id)
-            # タブを再作成
-            self.refresh_tabs()
+            # フォロー情報を再取得してタブを再作成
+            self.load_follow_data()
         except Exception as e:
             messagebox.showerror("エラー", f"フォロー解除中にエラーが発生しました: {e}")
 
@@ -167,9 +206,8 @@ class FollowListView:
         # 現在選択されているタブのインデックスを保存
         current_tab = self.tab_control.index(self.tab_control.select())
         
-        # 既存のタブを削除
-        for tab in self.tab_control.winfo_children():
-            tab.destroy()
+        # 既存のタブをノートブックごと削除
+        self.tab_control.destroy()
         
         # タブを再作成
         self.create_tabs()
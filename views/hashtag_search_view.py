@@ -1,23 +1,41 @@
 # views/hashtag_search_view.py
 import tkinter as tk
 from tkinter import ttk, messagebox
-from models.post import PostModel
+from models.post import Post
+from utils.background import BackgroundLoader
+from views.virtual_list import VirtualList
+from views.post_row import PostRow
 
 class HashtagSearchView:
-    def __init__(self, parent, session_manager):
+    # トレンドのボタンを並べる列数
+    TRENDING_COLUMNS = 5
+
+    def __init__(self, parent, session_manager, app):
         self.frame = ttk.Frame(parent)
         self.frame.pack(fill=tk.BOTH, expand=True)
         self.session_manager = session_manager
-        self.post_model = PostModel()
+        self.app = app
+        self.post_model = Post()
+        # 検索・トレンドの取得はワーカースレッドで行い、結果をこのフレームに反映する
+        self.loader = BackgroundLoader(self.frame)
         
         # 検索エリアの作成
         self.create_search_area()
         
+        # 人気のハッシュタグ表示（投稿一覧が残りの高さを使うため、先に配置する）
+        self.create_trending_area()
+        
+        # 戻るボタン（投稿一覧に押し出されないよう、一覧より先に下端へ配置する）
+        ttk.Button(
+            self.frame,
+            text="戻る",
+            command=self.back_to_timeline
+        ).pack(side=tk.BOTTOM, pady=10)
+        
         # 結果表示エリアの作成
         self.create_results_area()
         
-        # 人気のハッシュタグ表示
-        self.show_trending_hashtags()
+        self.load_trending_hashtags()
     
     def create_search_area(self):
         """検索エリアの作成"""
@@ -58,41 +76,9 @@ class HashtagSearchView:
         ).pack(pady=(0, 10))
     
     def create_results_area(self):
-        """結果表示エリアの作成"""
-        # メインフレーム
-        self.results_frame = ttk.Frame(self.frame)
-        self.results_frame.pack(fill=tk.BOTH, expand=True, padx=10)
-        
-        # スクロールバー
-        scrollbar = ttk.Scrollbar(self.results_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # 結果表示用キャンバス
-        self.results_canvas = tk.Canvas(
-            self.results_frame,
-            yscrollcommand=scrollbar.set
-        )
-        self.results_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        # スクロールバーの設定
-        scrollbar.config(command=self.results_canvas.yview)
-        
-        # 投稿表示用フレーム
-        self.posts_frame = ttk.Frame(self.results_canvas)
-        self.results_canvas.create_window(
-            (0, 0),
-            window=self.posts_frame,
-            anchor=tk.NW,
-            width=self.results_canvas.winfo_width()
-        )
-        
-        # キャンバスのリサイズ設定
-        self.posts_frame.bind(
-            '<Configure>',
-            lambda e: self.results_canvas.configure(
-                scrollregion=self.results_canvas.bbox("all")
-            )
-        )
+        """結果表示エリアの作成（表示範囲付近の投稿だけを描画する）"""
+        self.post_list = VirtualList(self.frame, create_row=self.create_post_row)
+        self.post_list.pack(fill=tk.BOTH, expand=True, padx=10)
     
     def search_hashtags(self):
         """ハッシュタグ検索の実行"""
@@ -105,89 +91,78 @@ class HashtagSearchView:
         if not search_term.startswith('#'):
             search_term = f"#{search_term}"
         
-        try:
-            # 検索結果の取得
-            results = self.post_model.search_posts_by_hashtag(search_term)
-            
-            # 結果の表示
-            self.display_results(results)
-        except Exception as e:
-            messagebox.showerror("エラー", f"検索中にエラーが発生しました: {str(e)}")
+        # 既存の結果をクリアし、検索結果はワーカースレッドで取得する
+        self.post_list.clear()
+        self.loader.run(
+            "search",
+            lambda: self.post_model.search_posts_by_hashtag(search_term),
+            self.display_results,
+            on_error=lambda e: messagebox.showerror("エラー", f"検索中にエラーが発生しました: {e}"),
+            loading_parent=self.post_list.footer,
+            loading_text="検索中..."
+        )
     
     def display_results(self, posts):
         """検索結果の表示"""
-        # 既存の結果をクリア
-        for widget in self.posts_frame.winfo_children():
-            widget.destroy()
-        
         if not posts:
             ttk.Label(
-                self.posts_frame,
+                self.post_list.footer,
                 text="該当する投稿が見つかりませんでした",
                 font=('Helvetica', 10)
             ).pack(pady=20)
             return
         
         # 投稿の表示
-        for post in posts:
-            self.create_post_widget(post)
+        self.post_list.set_items(posts)
     
-    def create_post_widget(self, post):
-        """投稿ウィジェットの作成"""
-        post_frame = ttk.Frame(self.posts_frame)
-        post_frame.pack(fill=tk.X, pady=5, padx=5)
-        
-        # ユーザー名
-        ttk.Label(
-            post_frame,
-            text=f"@{post['username']}",
-            font=('Helvetica', 10, 'bold')
-        ).pack(anchor=tk.W)
-        
-        # 投稿内容
-        ttk.Label(
-            post_frame,
-            text=post['content'],
-            wraplength=400
-        ).pack(anchor=tk.W, pady=(2, 5))
-        
-        # 投稿日時
-        ttk.Label(
-            post_frame,
-            text=post['created_at'].strftime('%Y-%m-%d %H:%M'),
-            font=('Helvetica', 8)
-        ).pack(anchor=tk.E)
-        
-        # 区切り線
-        ttk.Separator(post_frame, orient='horizontal').pack(
-            fill=tk.X, pady=5
+    def create_post_row(self, parent):
+        """投稿の行ウィジェットを作成（表示内容は VirtualList が差し替える）"""
+        return PostRow(parent, on_hashtag_click=self.search_tag)
+    
+    def create_trending_area(self):
+        """トレンド表示エリアの作成（中身は取得後に追加する）"""
+        self.trending_frame = ttk.Frame(self.frame)
+        self.trending_frame.pack(fill=tk.X, padx=10, pady=5)
+    
+    def load_trending_hashtags(self):
+        """人気のハッシュタグを取得（初回はトレンドの再構築を待つためワーカースレッドで）"""
+        self.loader.run(
+            "trending",
+            self.post_model.get_trending_hashtags,
+            self.show_trending_hashtags,
+            on_error=lambda e: print(f"トレンド取得エラー: {str(e)}")
         )
     
-    def show_trending_hashtags(self):
+    def show_trending_hashtags(self, trending_tags):
         """人気のハッシュタグを表示"""
-        try:
-            trending_tags = self.post_model.get_trending_hashtags()
-            if trending_tags:
-                trending_frame = ttk.Frame(self.frame)
-                trending_frame.pack(fill=tk.X, padx=10, pady=5)
-                
-                ttk.Label(
-                    trending_frame,
-                    text="トレンド",
-                    font=('Helvetica', 12, 'bold')
-                ).pack(anchor=tk.W)
-                
-                for tag in trending_tags:
-                    tag_button = ttk.Button(
-                        trending_frame,
-                        text=tag['tag_name'],
-                        command=lambda t=tag['tag_name']: self.search_tag(t)
-                    )
-                    tag_button.pack(anchor=tk.W, pady=2)
-        except Exception as e:
-            print(f"トレンド取得エラー: {str(e)}")
+        if not trending_tags:
+            return
+        
+        ttk.Label(
+            self.trending_frame,
+            text="トレンド",
+            font=('Helvetica', 12, 'bold')
+        ).grid(row=0, column=0, columnspan=self.TRENDING_COLUMNS, sticky=tk.W)
+        
+        # 投稿一覧の高さを残すため、数列に並べる
+        for index, tag in enumerate(trending_tags):
+            tag_button = ttk.Button(
+                self.trending_frame,
+                text=f"#{tag['tag_name']} ({tag['count']})",
+                command=lambda t=tag['tag_name']: self.search_tag(t)
+            )
+            tag_button.grid(
+                row=1 + index // self.TRENDING_COLUMNS,
+                column=index % self.TRENDING_COLUMNS,
+                sticky=tk.W, padx=2, pady=2
+            )
     
     def search_tag(self, tag):
         """トレンドタグをクリックして検索"""
         self.search_var.set(tag)
-        self.search_hashtags()
\ No newline at end of file
+        self.search_hashtags()
+    
+    def back_to_timeline(self):
+        """タイムラインに戻る"""
+        self.frame.destroy()
+        self.app.show_timeline()
@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from models.user import User
+from utils.background import BackgroundLoader
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,6 +18,7 @@ class LoginView:
         # メインフレームの作成
         self.frame = ttk.Frame(self.parent, padding="20")
         self.frame.pack(fill=tk.BOTH, expand=True)
+        self.loader = BackgroundLoader(self.frame)
         
         self.create_widgets()
 
@@ -93,14 +95,22 @@ class LoginView:
             messagebox.showerror("エラー", "ユーザー名とパスワードを入力してください。")
             return
         
-        try:
-            user_data = self.user_model.authenticate(username, password)
-            if user_data:
-                self.on_login_success(user_data)
-            else:
-                messagebox.showerror("エラー", "ユーザー名またはパスワードが正しくありません。")
-        except Exception as e:
-            messagebox.showerror("エラー", str(e))
+        # パスワードの検証（bcrypt）はワーカーで実行し、画面を止めない
+        self.loader.run(
+            "login",
+            lambda: self.user_model.authenticate(username, password),
+            self.on_authenticated,
+            on_error=lambda e: messagebox.showerror("エラー", str(e)),
+            loading_parent=self.frame,
+            loading_text="ログイン中..."
+        )
+
+    def on_authenticated(self, user_data):
+        """認証結果の処理"""
+        if user_data:
+            self.on_login_success(user_data)
+        else:
+            messagebox.showerror("エラー", "ユーザー名またはパスワードが正しくありません。")
 
     def show(self):
         """画面を表示"""
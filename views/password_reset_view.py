@@ -131,10 +131,10 @@ class PasswordResetView:
                 'expiration': expiration_time
             }
 
-            # メール送信
+            # メール送信（送信待ちに登録し、送信ワーカーが送る）
             self.email_sender.send_password_reset_email(email, verification_code)
             
-            logger.debug(f"Verification code sent to {email}")
+            logger.debug(f"Verification code queued for {email}")
             
             # 確認コード入力画面に切り替え
             self.show_verification_input()
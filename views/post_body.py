@@ -0,0 +1,71 @@
+import tkinter as tk
+from tkinter import ttk
+from utils.post_text import get_post_tokens
+
+
+class PostBody:
+    """投稿本文を読み取り専用の tk.Text 1つで表示する
+
+    ハッシュタグとメンションはタグで色付けし、クリックでコールバックを呼ぶ。
+    折り返しは Text に任せるため、スペースのない日本語も幅に合わせて折り返される。
+    高さは幅が決まった後に表示行数に合わせる。
+    """
+
+    def __init__(self, parent, on_hashtag_click=None, on_mention_click=None, font=('Helvetica', 10)):
+        background = ttk.Style().lookup("TFrame", "background") or None
+        self.text = tk.Text(
+            parent,
+            wrap=tk.WORD,
+            width=1,
+            height=1,
+            font=font,
+            borderwidth=0,
+            highlightthickness=0,
+            relief=tk.FLAT,
+            padx=0,
+            pady=0,
+            cursor="arrow",
+            takefocus=0
+        )
+        if background:
+            self.text.configure(background=background)
+
+        self._bind_link("hashtag", on_hashtag_click)
+        self._bind_link("mention", on_mention_click)
+
+        self.text.configure(state=tk.DISABLED)
+        self.text.bind("<Configure>", self._fit_height)
+
+    def _bind_link(self, tag, callback):
+        """リンク用のタグを設定（コールバックがなければ色付けのみ）"""
+        self.text.tag_configure(tag, foreground="blue")
+        if callback is None:
+            return
+        self.text.tag_bind(tag, "<Enter>", lambda e: self.text.configure(cursor="hand2"))
+        self.text.tag_bind(tag, "<Leave>", lambda e: self.text.configure(cursor="arrow"))
+        self.text.tag_bind(tag, "<Button-1>", lambda e: callback(self._clicked_text(tag)))
+
+    def _clicked_text(self, tag):
+        """クリックされた位置のタグの文字列を取得"""
+        start, end = self.text.tag_prevrange(tag, "current + 1c")
+        return self.text.get(start, end)
+
+    def set_post(self, post):
+        """表示する投稿を差し替える"""
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        for text, kind in get_post_tokens(post):
+            self.text.insert(tk.END, text, kind or ())
+        self.text.configure(state=tk.DISABLED)
+        self._fit_height()
+
+    def _fit_height(self, event=None):
+        """表示行数に合わせて高さを変える"""
+        if self.text.winfo_width() <= 1:
+            return  # 幅が決まる前は行数を数えられない
+        lines = self.text.count("1.0", "end-1c", "update", "displaylines")
+        if isinstance(lines, tuple):
+            lines = lines[0]
+        height = (lines or 0) + 1
+        if int(self.text.cget("height")) != height:
+            self.text.configure(height=height)
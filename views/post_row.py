@@ -0,0 +1,118 @@
+import tkinter as tk
+from tkinter import ttk
+from views.post_body import PostBody
+
+
+class PostRow:
+    """投稿1件分の行（VirtualList で使い回すため、update で表示内容を差し替える）
+
+    コールバックはクリック時に表示中の投稿を参照するので、行を別の投稿に使い回しても正しく動く。
+    registry を渡すと、いいね数・コメント数は PostViewModel から表示し、値の変更時にボタンだけを更新する。
+    """
+    def __init__(self, parent, on_user_click=None, on_hashtag_click=None, on_mention_click=None,
+                 on_like=None, on_comment=None, show_username=True, registry=None):
+        self.post = None
+        self.registry = registry
+        self.model = None
+
+        self.frame = ttk.Frame(parent)
+
+        # 投稿コンテナ（左右のパディングで中央寄せ）
+        post_container = ttk.Frame(self.frame)
+        post_container.pack(fill=tk.X, pady=5, padx=100)
+
+        # 上部の区切り線
+        ttk.Separator(post_container, orient="horizontal").pack(fill=tk.X)
+
+        # 投稿本体のフレーム
+        post_frame = ttk.Frame(post_container, style="Post.TFrame")
+        post_frame.pack(fill=tk.X, padx=20, pady=10)
+
+        # ヘッダー部分（ユーザー情報と時間）
+        header_frame = ttk.Frame(post_frame, style="PostHeader.TFrame")
+        header_frame.pack(fill=tk.X, pady=5)
+
+        self.username_label = None
+        if show_username:
+            self.username_label = ttk.Label(
+                header_frame,
+                font=('Helvetica', 11, 'bold'),
+                cursor="hand2" if on_user_click else ""
+            )
+            self.username_label.pack(side=tk.LEFT)
+            if on_user_click:
+                self.username_label.bind(
+                    "<Button-1>",
+                    lambda e: on_user_click(self.post['user_id'])
+                )
+
+        self.time_label = ttk.Label(
+            header_frame,
+            font=('Helvetica', 9),
+            foreground='gray'
+        )
+        self.time_label.pack(side=tk.RIGHT)
+
+        # 投稿内容（ハッシュタグとメンションはクリック可能）
+        self.body = PostBody(
+            post_frame,
+            on_hashtag_click=on_hashtag_click,
+            on_mention_click=on_mention_click
+        )
+        self.body.text.pack(fill=tk.X, pady=10)
+
+        # アクションボタン
+        self.like_button = None
+        self.comment_button = None
+        if on_like or on_comment:
+            actions_frame = ttk.Frame(post_frame)
+            actions_frame.pack(fill=tk.X, pady=5)
+            if on_like:
+                self.like_button = ttk.Button(
+                    actions_frame,
+                    command=lambda: on_like(self.post),
+                    width=10
+                )
+                self.like_button.pack(side=tk.LEFT, padx=5)
+            if on_comment:
+                self.comment_button = ttk.Button(
+                    actions_frame,
+                    command=lambda: on_comment(self.post['post_id']),
+                    width=12
+                )
+                self.comment_button.pack(side=tk.LEFT, padx=5)
+
+        # 下部の区切り線
+        ttk.Separator(post_container, orient="horizontal").pack(fill=tk.X)
+
+    def update(self, post):
+        """表示する投稿を差し替える"""
+        self.post = post
+        if self.username_label is not None:
+            self.username_label.configure(text=post['username'])
+        self.time_label.configure(text=post['created_at'].strftime("%Y-%m-%d %H:%M"))
+        self.body.set_post(post)
+
+        if self.registry is not None:
+            if self.model is not None:
+                self.model.unsubscribe(self.render_counts)
+            self.model = self.registry.get(post)
+            self.model.subscribe(self.render_counts)
+        self.render_counts(self.model)
+
+    def render_counts(self, model=None):
+        """いいね数・コメント数のボタンを更新（model がなければ投稿の値を使う）"""
+        if not self.frame.winfo_exists():
+            return
+        if model is not None:
+            like_count, comment_count, liked = model.like_count, model.comment_count, model.liked
+        else:
+            like_count = self.post.get('like_count', 0)
+            comment_count = self.post.get('comment_count', 0)
+            liked = self.post.get('liked')
+        if self.like_button is not None:
+            # いいね済みでない場合は白抜きのハート（不明な場合は従来どおり）
+            heart = "♡" if liked is False else "❤"
+            self.like_button.configure(text=f"{heart} {like_count}")
+        if self.comment_button is not None:
+            self.comment_button.configure(text=f"💬 {comment_count}")
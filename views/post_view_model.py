@@ -0,0 +1,104 @@
+class PostViewModel:
+    """1件の投稿の表示状態（いいね数・コメント数・自分がいいね済みか）
+
+    値を変えると購読中の行に通知され、その投稿のボタンだけが更新される。
+    いいね・コメントは表示を先に変え（begin_*）、DBへの書き込み結果で確定（finish_*）
+    または元に戻す（rollback_*）。
+    """
+
+    def __init__(self, post):
+        self.post_id = post['post_id']
+        self.like_count = post.get('like_count', 0)
+        self.comment_count = post.get('comment_count', 0)
+        self.liked = post.get('liked')  # None は不明
+        self.like_pending = False
+        self.pending_comments = 0
+        self._listeners = []
+
+    def subscribe(self, listener):
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def update(self, **changes):
+        """値を変更して購読者に通知"""
+        for name, value in changes.items():
+            setattr(self, name, value)
+        for listener in list(self._listeners):
+            listener(self)
+
+    def refresh(self, post):
+        """DBから読み込んだ値で更新（書き込み中の値は上書きしない）"""
+        changes = {}
+        if not self.like_pending:
+            changes['like_count'] = post.get('like_count', 0)
+            if post.get('liked') is not None:
+                changes['liked'] = post['liked']
+        if not self.pending_comments:
+            changes['comment_count'] = post.get('comment_count', 0)
+        self.update(**changes)
+
+    def begin_like(self):
+        """いいねの切り替えを表示に先に反映し、元に戻すための値を返す"""
+        previous = {'liked': self.liked, 'like_count': self.like_count}
+        self.like_pending = True
+        if self.liked is not None:
+            delta = -1 if self.liked else 1
+            self.update(liked=not self.liked, like_count=max(self.like_count + delta, 0))
+        return previous
+
+    def finish_like(self, liked, previous):
+        """DBでの結果（いいね済みかどうか）で確定"""
+        self.like_pending = False
+        if self.liked != liked:
+            # いいね状態が不明だった場合や、別の画面で切り替えられていた場合
+            delta = 1 if liked else -1
+            self.update(liked=liked, like_count=max(previous['like_count'] + delta, 0))
+
+    def rollback_like(self, previous):
+        self.like_pending = False
+        self.update(**previous)
+
+    def begin_comment(self):
+        self.pending_comments += 1
+        self.update(comment_count=self.comment_count + 1)
+
+    def finish_comment(self):
+        self.pending_comments -= 1
+
+    def rollback_comment(self):
+        self.pending_comments -= 1
+        self.update(comment_count=max(self.comment_count - 1, 0))
+
+
+class PostViewModelRegistry:
+    """画面に表示中の投稿の PostViewModel を post_id ごとに保持する"""
+
+    def __init__(self):
+        self._models = {}
+
+    def get(self, post):
+        """投稿の PostViewModel を取得（なければ投稿の値から作成）"""
+        model = self._models.get(post['post_id'])
+        if model is None:
+            model = PostViewModel(post)
+            self._models[post['post_id']] = model
+        return model
+
+    def find(self, post_id):
+        return self._models.get(post_id)
+
+    def refresh(self, posts):
+        """DBから読み込んだ投稿の値を反映"""
+        for post in posts:
+            model = self._models.get(post['post_id'])
+            if model is None:
+                self._models[post['post_id']] = PostViewModel(post)
+            else:
+                model.refresh(post)
+
+    def clear(self):
+        self._models.clear()
@@ -8,12 +8,13 @@ from models.comment import Comment
 from views.follow_list_view import FollowListView
 from views.comment_dialog import CommentDialog
 from utils.notification import NotificationManager
-from utils.email_sender import EmailSender  # 既存のEmailSenderクラスをインポート
+from utils.background import BackgroundLoader
+from utils.query_counter import count_queries
+from views.virtual_list import VirtualList
+from views.post_row import PostRow
+from views.post_view_model import PostViewModelRegistry
+from views.toast import show_toast
 import logging
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -36,9 +37,9 @@ class ProfileView:
             self.comment_model = Comment()
             
             
-            # キャンバスとスクロール可能なフレームの参照を保持
-            self.canvas = None
-            self.scrollable_frame = None
+            # 投稿一覧の参照と、表示中の投稿のいいね数・コメント数（post_id ごと）を保持
+            self.post_list = None
+            self.post_models = PostViewModelRegistry()
             self.frame = None
             
             # 現在のユーザー情報を取得
@@ -46,49 +47,53 @@ class ProfileView:
             if not self.current_user:
                 raise ValueError("ユーザーがログインしていません")
             
-            try:
-                email_sender = EmailSender(
-                    smtp_server=os.getenv('SMTP_SERVER'),
-                    smtp_port=int(os.getenv('SMTP_PORT', 587)),
-                    username=os.getenv('SMTP_USERNAME'),
-                    password=os.getenv('SMTP_PASSWORD')
-                )
-                logger.debug(f"EmailSender initialized: {email_sender}")
-                self.notification_manager = NotificationManager(email_sender)
-                logger.debug("NotificationManager initialized successfully")
-            except Exception as e:
-                logger.error(f"Failed to initialize email services: {e}", exc_info=True)
-                self.notification_manager = None
-                
+            # フォロー通知は送信待ち（email_outbox）に登録するだけで、SMTPの設定は
+            # 送信する utils.email_worker.EmailOutboxWorker だけが使う
+            self.notification_manager = NotificationManager()
+
             self.profile_user_id = user_id if user_id else self.current_user['user_id']
-            self.profile_user = self.user_model.get_user(self.profile_user_id)
+
+            # メインフレーム（DB処理はワーカースレッドで行い、結果をこのフレームに反映する）
+            self.frame = ttk.Frame(self.parent, padding="20")
+            self.frame.pack(fill=tk.BOTH, expand=True)
+            self.loader = BackgroundLoader(self.frame)
             
             # プロフィールユーザーの設定
             if self.user_id:
-                self.profile_user = self.user_model.get_user(self.user_id)
-                if not self.profile_user:
-                    raise ValueError(f"ユーザーID {self.user_id} が見つかりません")
+                # 他のユーザーの情報は取得してから画面を作成
+                self.loader.run(
+                    "profile_user",
+                    lambda: self.user_model.get_user(self.user_id),
+                    self.on_profile_user_loaded,
+                    on_error=lambda e: self.show_error_message(f"プロフィール画面の初期化に失敗しました: {e}"),
+                    loading_parent=self.frame
+                )
             else:
                 self.profile_user = self.current_user
                 self.user_id = self.current_user['user_id']
-
-            # self.userの設定（互換性のため）
-            self.user = self.profile_user
-
-            print(f"Initialized ProfileView - Current user: {self.current_user['username']}, Profile user: {self.profile_user['username']}")
-
-            # ウィジェットの作成
-            self.create_widgets()
+                self.on_profile_user_loaded(self.profile_user)
 
         except Exception as e:
             print(f"Error in ProfileView initialization: {e}")
             self.show_error_message(f"プロフィール画面の初期化に失敗しました: {e}")
 
-    def create_widgets(self):
-        # メインフレーム
-        self.frame = ttk.Frame(self.parent, padding="20")
-        self.frame.pack(fill=tk.BOTH, expand=True)
+    def on_profile_user_loaded(self, profile_user):
+        """プロフィールユーザーの取得後に画面を作成"""
+        if not profile_user:
+            self.show_error_message(f"ユーザーID {self.user_id} が見つかりません")
+            return
+        self.profile_user = profile_user
+
+        # self.userの設定（互換性のため）
+        self.user = self.profile_user
+
+        print(f"Initialized ProfileView - Current user: {self.current_user['username']}, Profile user: {self.profile_user['username']}")
 
+        # ウィジェットの作成
+        self.create_widgets()
+
+    @count_queries()
+    def create_widgets(self):
         # ナビゲーションバー
         self.create_navigation_bar()
 
@@ -98,75 +103,17 @@ class ProfileView:
         # 投稿一覧
         self.create_posts_area()
 
-    def create_post_widget(self, post):
-        """投稿の表示ウィジェット作成（改良版）"""
-        # 投稿全体のコンテナ
-        post_container = ttk.Frame(self.scrollable_frame)
-        post_container.pack(fill=tk.X, pady=5)
-
-        # 上部の区切り線
-        ttk.Separator(post_container, orient="horizontal").pack(fill=tk.X, pady=(0, 5))
-
-        # 投稿本体のフレーム
-        post_frame = ttk.Frame(post_container, style="Post.TFrame")
-        post_frame.pack(fill=tk.X, padx=10)
-
-        # 中央寄せのための内部フレーム
-        inner_frame = ttk.Frame(post_frame)
-        inner_frame.pack(anchor=tk.CENTER)
-
-        # ヘッダー部分（ユーザー情報と時間）
-        header_frame = ttk.Frame(inner_frame, style="PostHeader.TFrame")
-        header_frame.pack(fill=tk.X, pady=5)
-
-        # 投稿時間を右側に配置
-        time_label = ttk.Label(
-            header_frame,
-            text=post['created_at'].strftime("%Y-%m-%d %H:%M"),
-            font=('Helvetica', 9),
-            foreground='gray'
-        )
-        time_label.pack(side=tk.RIGHT)
-
-        # 投稿内容（中央寄せ）
-        content_frame = ttk.Frame(inner_frame)
-        content_frame.pack(fill=tk.X, pady=10)
-        
-        content_label = ttk.Label(
-            content_frame,
-            text=post['content'],
-            wraplength=500,
-            justify=tk.CENTER,
-            font=('Helvetica', 10)
-        )
-        content_label.pack(expand=True)
-
-        # アクションボタンフレーム（いいね、コメント）
-        actions_frame = ttk.Frame(inner_frame)
-        actions_frame.pack(fill=tk.X, pady=5)
-
-        # いいねボタン
-        like_count = self.like_model.get_like_count(post['post_id'])
-        like_button = ttk.Button(
-            actions_frame,
-            text=f"❤ {like_count}",
-            command=lambda: self.toggle_like(post),
-            width=10
-        )
-        like_button.pack(side=tk.LEFT, padx=5)
-
-        # コメントボタン
-        comment_count = self.comment_model.get_comment_count(post['post_id'])
-        comment_button = ttk.Button(
-            actions_frame,
-            text=f"💬 {comment_count}",
-            command=lambda: self.show_comments(post['post_id']),
-            width=12
+    def create_post_row(self, parent):
+        """投稿の行ウィジェットを作成（表示内容は VirtualList が差し替える）"""
+        return PostRow(
+            parent,
+            on_hashtag_click=self.search_hashtag,
+            on_mention_click=self.show_user_by_username,
+            on_like=self.toggle_like,
+            on_comment=self.show_comments,
+            show_username=False,
+            registry=self.post_models
         )
-        comment_button.pack(side=tk.LEFT, padx=5)
-
-        # 下部の区切り線
-        ttk.Separator(post_container, orient="horizontal").pack(fill=tk.X, pady=(5, 0))
 
     def create_header(self):
         """ヘッダー部分の作成"""
@@ -199,47 +146,67 @@ class ProfileView:
             follow_frame = ttk.Frame(profile_frame)
             follow_frame.pack(fill=tk.X, pady=10)
 
-            # フォロー/フォロワー情報を取得
-            followers = self.follow_model.get_followers(self.profile_user['user_id'])
-            following = self.follow_model.get_following(self.profile_user['user_id'])
-
-            # フォロー中ボタン（クリックで一覧表示）
-            following_button = ttk.Button(
+            # フォロー中ボタン（クリックで一覧表示、件数は読み込み後に表示）
+            self.following_button = ttk.Button(
                 follow_frame,
-                text=f"フォロー中: {len(following) if following else 0}",
-                command=lambda: self.show_following_list(following if following else [])
+                text="フォロー中: -",
+                command=lambda: self.show_following_list([])
             )
-            following_button.pack(side=tk.LEFT, padx=5)
+            self.following_button.pack(side=tk.LEFT, padx=5)
             
             # フォロワーボタン（クリックで一覧表示）
-            followers_button = ttk.Button(
+            self.followers_button = ttk.Button(
                 follow_frame,
-                text=f"フォロワー: {len(followers) if followers else 0}",
-                command=lambda: self.show_followers_list(followers if followers else [])
+                text="フォロワー: -",
+                command=lambda: self.show_followers_list([])
             )
-            followers_button.pack(side=tk.LEFT, padx=5)
+            self.followers_button.pack(side=tk.LEFT, padx=5)
 
 
             # 他のユーザーのプロフィールの場合のみフォローボタンを表示
             if self.profile_user['user_id'] != self.current_user['user_id']:
-                is_following = self.follow_model.is_following(
-                    self.current_user['user_id'],
-                    self.profile_user['user_id']
-                )
-
                 self.follow_button = ttk.Button(
                     follow_frame,
-                    text="フォロー中" if is_following else "フォロー",
-                    command=self.toggle_follow
+                    text="...",
+                    command=self.toggle_follow,
+                    state=tk.DISABLED
                 )
                 self.follow_button.pack(side=tk.RIGHT, padx=5)
 
+            # フォロー数とフォロー状態をワーカースレッドで取得
+            self.loader.run("follow_info", self.fetch_follow_info, self.on_follow_info_loaded)
+
         except Exception as e:
             print(f"Error in create_profile_info: {e}")  # デバッグ出力追加
             messagebox.showerror("エラー", f"プロフィール情報の表示中にエラーが発生しました: {e}")
 
 # ProfileViewクラス内のメソッドを修正
 
+    def fetch_follow_info(self):
+        """フォロー数・フォロワー数・フォロー状態を取得（ワーカースレッドで実行）"""
+        profile_user_id = self.profile_user['user_id']
+        info = {
+            'following_count': self.follow_model.get_following_count(profile_user_id),
+            'follower_count': self.follow_model.get_follower_count(profile_user_id),
+            'is_following': None,
+        }
+        if profile_user_id != self.current_user['user_id']:
+            info['is_following'] = self.follow_model.is_following(
+                self.current_user['user_id'],
+                profile_user_id
+            )
+        return info
+
+    def on_follow_info_loaded(self, info):
+        """フォロー情報をボタンに反映"""
+        self.following_button.configure(text=f"フォロー中: {info['following_count']}")
+        self.followers_button.configure(text=f"フォロワー: {info['follower_count']}")
+        if info['is_following'] is not None:
+            self.follow_button.configure(
+                text="フォロー中" if info['is_following'] else "フォロー",
+                state=tk.NORMAL
+            )
+
     def show_followers_list(self, followers):
         """フォロワー一覧ページへの遷移"""
         try:
@@ -285,21 +252,15 @@ class ProfileView:
                 )
                 
                 # フォロー時のメール通知
-                if self.notification_manager:
-                    try:
-                        followed_user = self.user_model.get_user(self.profile_user['user_id'])
-                        logger.debug(f"Sending follow notification to: {followed_user['email']}")
-                        
-                        self.notification_manager.notify_new_follower(
-                            followed_user['email'],
-                            self.current_user['username']
-                        )
-                        logger.debug("Follow notification email sent successfully")
-                    except Exception as e:
-                        logger.error(f"Failed to send follow notification: {e}", exc_info=True)
-                        # メール送信の失敗は無視して続行
-                else:
-                    logger.warning("NotificationManager is not available, skipping email notification")
+                try:
+                    followed_user = self.user_model.get_user(self.profile_user['user_id'])
+                    logger.debug(f"Recording follow notification to: {followed_user['email']}")
+
+                    # フォロー通知はダイジェストにまとめて送信待ちに登録される
+                    self.notification_manager.notify_new_follower(followed_user, self.current_user)
+                except Exception as e:
+                    logger.error(f"Failed to record follow notification: {e}", exc_info=True)
+                    # メール登録の失敗は無視して続行
                 
                 self.follow_button.configure(text="フォロー中")
 
@@ -331,81 +292,44 @@ class ProfileView:
             messagebox.showerror("エラー", f"プロフィール表示中にエラーが発生しました: {e}")
 
     def create_posts_area(self):
-        """投稿一覧エリアの作成（エラー修正版）"""
+        """投稿一覧エリアの作成（表示範囲付近の投稿だけを描画する）"""
         posts_frame = ttk.LabelFrame(self.frame, text="投稿一覧", padding="10")
         posts_frame.pack(fill=tk.BOTH, expand=True)
 
-        # スクロール可能な領域
-        self.canvas = tk.Canvas(posts_frame)
-        scrollbar = ttk.Scrollbar(posts_frame, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas)
-
-        # スクロールバーの設定
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-        
-        # マウスホイールでのスクロールを有効化
-        def _on_mousewheel(event):
-            self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        
-        # マウスホイールイベントのバインド
-        self.canvas.bind_all("<MouseWheel>", _on_mousewheel)
-        
-        # キャンバスが非表示になった時にマウスホイールバインドを解除
-        def _unbind_mousewheel(event):
-            self.canvas.unbind_all("<MouseWheel>")
-        self.canvas.bind("<Unmap>", _unbind_mousewheel)
-
-        # スクロール領域の設定
-        def _configure_frame(event):
-            # キャンバスのスクロール範囲を設定
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-
-        self.scrollable_frame.bind("<Configure>", _configure_frame)
-        
-        # キャンバス内に投稿フレームを配置
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-
-        # キャンバスのサイズ変更時の処理
-        def _on_canvas_configure(event):
-            # 投稿フレームの幅をキャンバスの幅に合わせる
-            self.canvas.itemconfig(
-                self.canvas.find_withtag("all")[0],
-                width=event.width
-            )
-        self.canvas.bind("<Configure>", _on_canvas_configure)
-
-        # レイアウト
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.post_list = VirtualList(posts_frame, create_row=self.create_post_row)
+        self.post_list.pack(fill=tk.BOTH, expand=True)
 
         # 投稿の読み込み
         self.load_user_posts()
 
     def load_user_posts(self):
-        """ユーザーの投稿を読み込んで表示"""
-        try:
-            posts = self.post_model.get_user_posts(self.user['user_id'])
-            if not posts:
-                ttk.Label(
-                    self.scrollable_frame,
-                    text="投稿がありません。",
-                    font=('Helvetica', 10)
-                ).pack(pady=10)
-            else:
-                for post in posts:
-                    self.create_post_widget(post)
-        except Exception as e:
-            messagebox.showerror("エラー", f"投稿の読み込み中にエラーが発生しました: {e}")
+        """ユーザーの投稿を読み込んで表示（DB処理はワーカースレッドで実行）"""
+        user_id = self.user['user_id']
+        viewer_id = self.current_user['user_id']
+        self.loader.run(
+            "posts",
+            lambda: self.like_model.mark_liked(viewer_id, self.post_model.get_user_posts(user_id)),
+            self.on_user_posts_loaded,
+            on_error=lambda e: messagebox.showerror("エラー", f"投稿の読み込み中にエラーが発生しました: {e}"),
+            loading_parent=self.post_list.footer
+        )
+
+    def on_user_posts_loaded(self, posts):
+        """取得した投稿を表示"""
+        if not posts:
+            ttk.Label(
+                self.post_list.footer,
+                text="投稿がありません。",
+                font=('Helvetica', 10)
+            ).pack(pady=10)
+        else:
+            self.post_models.refresh(posts)
+            self.post_list.set_items(posts)
             
     def load_user_profile(self):
         """ユーザー情報の再読み込み"""
         try:
-            # ユーザー情報を再取得
-            if self.user_id:
-                self.profile_user = self.user_model.get_user(self.user_id)
-            else:
-                self.profile_user = self.current_user
-
+            # フォロー数などの変わりうる情報は create_profile_info でワーカースレッドから再取得する
             # UIの再構築
             self.create_navigation_bar()
             self.create_profile_info()
@@ -471,17 +395,46 @@ class ProfileView:
         except Exception as e:
             messagebox.showerror("エラー", f"ユーザーのプロフィール画面の表示中にエラーが発生しました: {e}")
 
-    def toggle_like(self, post):
-        """いいねの切り替え"""
-        try:
-            user = self.session_manager.get_current_user()
-            if self.like_model.toggle_like(user['user_id'], post['post_id']):
-                messagebox.showinfo("成功", "いいねしました！")
+    def show_user_by_username(self, mention):
+        """メンション（@ユーザー名）がクリックされたときの処理"""
+        username = mention.lstrip('@')
+
+        def on_user_loaded(user):
+            if user:
+                self.show_user_profile(user['user_id'])
             else:
-                messagebox.showinfo("成功", "いいねを取り消しました！")
-            self.refresh_posts()
-        except Exception as e:
-            messagebox.showerror("エラー", f"いいねの処理中にエラーが発生しました: {e}")
+                messagebox.showinfo("情報", f"ユーザー {mention} は見つかりませんでした。")
+
+        self.loader.run(
+            "mention",
+            lambda: self.user_model.get_user_by_username(username),
+            on_user_loaded,
+            on_error=lambda e: messagebox.showerror("エラー", f"ユーザーの取得中にエラーが発生しました: {e}")
+        )
+
+    def toggle_like(self, post):
+        """いいねの切り替え（表示を先に更新し、DBへの書き込みに失敗したら元に戻す）"""
+        model = self.post_models.get(post)
+        if model.like_pending:
+            return  # 前回の切り替えの結果待ち
+        user_id = self.current_user['user_id']
+        post_id = post['post_id']
+        previous = model.begin_like()
+
+        def on_success(liked):
+            model.finish_like(liked, previous)
+            show_toast(self.frame, "いいねしました！" if liked else "いいねを取り消しました！")
+
+        def on_error(error):
+            model.rollback_like(previous)
+            show_toast(self.frame, f"いいねの処理中にエラーが発生しました: {error}", error=True)
+
+        self.loader.run(
+            f"like:{post_id}",
+            lambda: self.like_model.toggle_like(user_id, post_id),
+            on_success,
+            on_error=on_error
+        )
 
     def show_comments(self, post_id):
         """コメントダイアログの表示"""
@@ -490,7 +443,8 @@ class ProfileView:
                 self.parent, 
                 post_id, 
                 self.session_manager,
-                refresh_callback=self.refresh_posts  # 更新用のコールバックを渡す
+                view_model=self.post_models.find(post_id),  # コメント数をその投稿だけ更新する
+                loader=self.loader
             )
             comment_dialog.grab_set()  # モーダルダイアログとして表示
         except Exception as e:
@@ -498,9 +452,7 @@ class ProfileView:
 
     def refresh_posts(self):
         """投稿の更新"""
-        # 投稿フレームをクリアして再作成
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+        self.post_list.clear()
         self.load_user_posts()
     
     def refresh_profile_info(self):
@@ -661,13 +613,10 @@ class ProfileView:
             if self.notification_manager:
                 try:
                     followed_user = self.user_model.get_user(self.profile_user_id)
-                    self.notification_manager.notify_new_follower(
-                        followed_user['email'],
-                        self.current_user['username']
-                    )
+                    self.notification_manager.notify_new_follower(followed_user, self.current_user)
                 except Exception as e:
-                    logger.error(f"Failed to send follow notification email: {e}")
-                    # メール送信の失敗は無視して続行
+                    logger.error(f"Failed to record follow notification: {e}")
+                    # メール登録の失敗は無視して続行
             
             # フォローボタンを解除ボタンに変更
             self.follow_button.configure(
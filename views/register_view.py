@@ -2,10 +2,10 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from models.user import User
 from utils.email_sender import EmailSender
+from utils.background import BackgroundLoader
 import os
 from dotenv import load_dotenv
 import logging
-import smtplib
 
 # ロガーの設定
 logging.basicConfig(level=logging.INFO)
@@ -27,6 +27,7 @@ class RegisterView(tk.Frame):
         self.show_login = show_login
         self.user_model = User()
         self.email_sender = EmailSender(SMTP_SERVER, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD)
+        self.loader = BackgroundLoader(self)
         self.create_widgets()
 
 
@@ -96,72 +97,60 @@ class RegisterView(tk.Frame):
             messagebox.showwarning("警告", "すべてのフィールドを入力してください。")
             return
 
+        # アクティベーションコードの生成
+        activation_code = EmailSender.generate_activation_code()
+
+        logger.info(f"Attempting to create user: {username}")
+        # ユーザーの作成（パスワードのハッシュ化を含むため、ワーカーで実行）
+        self.loader.run(
+            "register",
+            lambda: self.create_user_and_queue_activation(username, email, password, activation_code),
+            self.on_user_created,
+            on_error=self.on_register_error,
+            loading_parent=self,
+            loading_text="登録中..."
+        )
+
+    def create_user_and_queue_activation(self, username, email, password, activation_code):
+        """ユーザーを作成し、アクティベーションメールを送信待ちに登録（ワーカーで実行）"""
+        user_id = self.user_model.create_user(
+            username=username,
+            email=email,
+            password=password,
+            activation_code=activation_code
+        )
+        logger.info(f"User created successfully with ID: {user_id}")
+
+        # メールの送信は送信ワーカーが行うため、SMTPの応答は待たない
         try:
-            # アクティベーションコードの生成
-            activation_code = EmailSender.generate_activation_code()
-            
-            logger.info(f"Attempting to create user: {username}")
-            # ユーザーの作成（アクティベーションコードも保存）
-            user_id = self.user_model.create_user(
-                username=username,
-                email=email,
-                password=password,
+            self.email_sender.send_activation_email(
+                to_email=email,
                 activation_code=activation_code
             )
-            logger.info(f"User created successfully with ID: {user_id}")
-
-            try:
-                logger.info(f"Attempting to send activation email to: {email}")
-                logger.debug(f"SMTP Settings - Server: {self.email_sender.smtp_server}, Port: {self.email_sender.smtp_port}")
-                
-                # SMTPの接続テスト
-                try:
-                    with smtplib.SMTP(self.email_sender.smtp_server, self.email_sender.smtp_port, timeout=10) as server:
-                        server.starttls()
-                        logger.info("SMTP TLS connection successful")
-                        server.login(self.email_sender.username, self.email_sender.password)
-                        logger.info("SMTP login successful")
-                except smtplib.SMTPAuthenticationError as auth_error:
-                    logger.error(f"SMTP Authentication failed: {str(auth_error)}")
-                    raise
-                except Exception as conn_error:
-                    logger.error(f"SMTP Connection error: {str(conn_error)}")
-                    raise
-
-                # アクティベーションメールの送信
-                self.email_sender.send_activation_email(
-                    to_email=email,
-                    activation_code=activation_code
-                )
-                logger.info("Activation email sent successfully")
-                
-                messagebox.showinfo(
-                    "登録完了",
-                    "アカウントの登録が完了しました。\n"
-                    "登録したメールアドレスに確認メールを送信しましたので、"
-                    "メール内のリンクをクリックしてアカウントを有効化してください。"
-                )
-
-            except smtplib.SMTPAuthenticationError as auth_error:
-                logger.error(f"SMTP認証エラー: {str(auth_error)}", exc_info=True)
-                messagebox.showerror(
-                    "メール送信エラー",
-                    "メールサーバーの認証に失敗しました。\n"
-                    "アプリパスワードが正しく設定されているか確認してください。"
-                )
-            except Exception as e:
-                logger.error(f"メール送信エラー: {str(e)}", exc_info=True)
-                messagebox.showwarning(
-                    "警告",
-                    "ユーザー登録は完了しましたが、確認メールの送信に失敗しました。\n"
-                    f"エラー詳細: {str(e)}\n"
-                    "管理者に連絡してください。"
-                )
-            finally:
-                # 登録自体は成功しているので、ログイン画面に戻る
-                self.show_login()
-
+            return True
         except Exception as e:
-            # ユーザー登録自体の失敗
-            logger.error(f"ユーザー登録エラー: {str(e)}", exc_info=True)
-            messagebox.showerror("エラー", f"ユーザー登録に失敗しました: {str(e)}")
\ No newline at end of file
+            logger.error(f"アクティベーションメールの登録エラー: {str(e)}", exc_info=True)
+            return False
+
+    def on_register_error(self, e):
+        # ユーザー登録自体の失敗
+        logger.error(f"ユーザー登録エラー: {str(e)}")
+        messagebox.showerror("エラー", f"ユーザー登録に失敗しました: {str(e)}")
+
+    def on_user_created(self, email_queued):
+        """ユーザー作成後の案内を表示してログイン画面に戻る"""
+        if email_queued:
+            messagebox.showinfo(
+                "登録完了",
+                "アカウントの登録が完了しました。\n"
+                "登録したメールアドレスに確認メールを送信しますので、"
+                "メール内のコードでアカウントを有効化してください。"
+            )
+        else:
+            messagebox.showwarning(
+                "警告",
+                "ユーザー登録は完了しましたが、確認メールの送信に失敗しました。\n"
+                "管理者に連絡してください。"
+            )
+        # 登録自体は成功しているので、ログイン画面に戻る
+        self.show_login()
\ No newline at end of file
@@ -2,6 +2,37 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from models.post import Post
 from models.user import User
+from utils.background import BackgroundLoader
+from views.virtual_list import VirtualList
+from views.post_row import PostRow
+
+
+class UserRow:
+    """ユーザー検索結果の1行（VirtualList で使い回す）"""
+
+    def __init__(self, parent, on_show_profile):
+        self.user = None
+        self.frame = ttk.Frame(parent)
+
+        user_frame = ttk.Frame(self.frame)
+        user_frame.pack(fill=tk.X, pady=5)
+
+        self.username_label = ttk.Label(
+            user_frame,
+            font=('Helvetica', 11, 'bold')
+        )
+        self.username_label.pack(side=tk.LEFT)
+
+        ttk.Button(
+            user_frame,
+            text="プロフィールを見る",
+            command=lambda: on_show_profile(self.user['user_id'])
+        ).pack(side=tk.RIGHT)
+
+    def update(self, user):
+        self.user = user
+        self.username_label.configure(text=user['username'])
+
 
 class SearchView:
     def __init__(self, parent, session_manager, app):
@@ -17,6 +48,7 @@ class SearchView:
         # メインフレーム
         self.frame = ttk.Frame(self.parent, padding="20")
         self.frame.pack(fill=tk.BOTH, expand=True)
+        self.loader = BackgroundLoader(self.frame)
 
         # 検索タイプの選択
         self.search_type = tk.StringVar(value="user")
@@ -59,6 +91,16 @@ class SearchView:
         self.result_frame = ttk.LabelFrame(self.frame, text="検索結果", padding="10")
         self.result_frame.pack(fill=tk.BOTH, expand=True)
 
+        # 検索タイプごとの結果リスト（表示範囲付近の行だけを描画する）
+        self.user_list = VirtualList(
+            self.result_frame,
+            create_row=lambda parent: UserRow(parent, self.show_user_profile),
+            estimated_row_height=40
+        )
+        self.post_list = VirtualList(self.result_frame, create_row=self.create_post_row)
+        self.result_list = self.user_list
+        self.result_list.pack(fill=tk.BOTH, expand=True)
+
         # 戻るボタン
         back_button = ttk.Button(
             self.frame,
@@ -69,123 +111,93 @@ class SearchView:
 
     def search(self):
         # 検索結果をクリア
-        for widget in self.result_frame.winfo_children():
-            widget.destroy()
+        self.clear_results()
 
         query = self.search_entry.get().strip()
         if not query:
             messagebox.showwarning("警告", "検索キーワードを入力してください。")
             return
 
-        try:
-            if self.search_type.get() == "user":
-                self.search_users(query)
-            else:
-                self.search_hashtags(query)
-        except Exception as e:
-            messagebox.showerror("エラー", f"検索中にエラーが発生しました: {e}")
+        if self.search_type.get() == "user":
+            self.search_users(query)
+        else:
+            self.search_hashtags(query)
+
+    def clear_results(self):
+        """検索結果の表示をクリア"""
+        self.user_list.clear()
+        self.post_list.clear()
+
+    def show_result_list(self, result_list):
+        """表示する結果リストを切り替える"""
+        if self.result_list is not result_list:
+            self.result_list.pack_forget()
+            self.result_list = result_list
+            self.result_list.pack(fill=tk.BOTH, expand=True)
+
+    def on_search_error(self, error):
+        messagebox.showerror("エラー", f"検索中にエラーが発生しました: {error}")
 
     def search_users(self, query):
-        results = self.user_model.search_users(query)
+        """ユーザー検索（DB処理はワーカースレッドで実行）"""
+        self.show_result_list(self.user_list)
+        self.loader.run(
+            "search",
+            lambda: self.user_model.search_users(query),
+            self.show_user_results,
+            on_error=self.on_search_error,
+            loading_parent=self.user_list.footer,
+            loading_text="検索中..."
+        )
+
+    def show_user_results(self, results):
+        """ユーザー検索結果の表示"""
         if not results:
             ttk.Label(
-                self.result_frame,
+                self.user_list.footer,
                 text="ユーザーが見つかりませんでした。"
             ).pack(pady=10)
             return
 
-        for user in results:
-            user_frame = ttk.Frame(self.result_frame)
-            user_frame.pack(fill=tk.X, pady=5)
-            
-            ttk.Label(
-                user_frame,
-                text=user['username'],
-                font=('Helvetica', 11, 'bold')
-            ).pack(side=tk.LEFT)
-            
-            ttk.Button(
-                user_frame,
-                text="プロフィールを見る",
-                command=lambda u=user: self.show_user_profile(u['user_id'])
-            ).pack(side=tk.RIGHT)
+        self.user_list.set_items(results)
 
     def search_hashtags(self, query):
+        """ハッシュタグ検索（DB処理はワーカースレッドで実行）"""
         # #がない場合は自動的に追加
         if not query.startswith('#'):
             query = f"#{query}"
-            
-        results = self.post_model.search_posts_by_hashtag(query)
+
+        # 検索結果内のハッシュタグから再検索した場合も前の結果を置き換える
+        self.clear_results()
+        self.show_result_list(self.post_list)
+        self.loader.run(
+            "search",
+            lambda: self.post_model.search_posts_by_hashtag(query),
+            self.show_post_results,
+            on_error=self.on_search_error,
+            loading_parent=self.post_list.footer,
+            loading_text="検索中..."
+        )
+
+    def show_post_results(self, results):
+        """ハッシュタグ検索結果の表示"""
         if not results:
             ttk.Label(
-                self.result_frame,
+                self.post_list.footer,
                 text="投稿が見つかりませんでした。"
             ).pack(pady=10)
             return
 
-        for post in results:
-            self.create_post_widget(post)
-            
-    def create_post_widget(self, post):
-        """ハッシュタグ検索結果の投稿表示（改良版）"""
-        post_frame = ttk.Frame(self.result_frame, style="Post.TFrame")
-        post_frame.pack(fill=tk.X, pady=5, padx=20)
-
-        # ヘッダー（ユーザー名と時間）
-        header_frame = ttk.Frame(post_frame)
-        header_frame.pack(fill=tk.X, pady=5)
-
-        username_label = ttk.Label(
-            header_frame,
-            text=post['username'],
-            font=('Helvetica', 11, 'bold'),
-            cursor="hand2"
-        )
-        username_label.pack(side=tk.LEFT)
-        username_label.bind(
-            "<Button-1>",
-            lambda e, user_id=post['user_id']: self.show_user_profile(user_id)
-        )
+        self.post_list.set_items(results)
 
-        time_label = ttk.Label(
-            header_frame,
-            text=post['created_at'].strftime("%Y-%m-%d %H:%M"),
-            font=('Helvetica', 9),
-            foreground='gray'
+    def create_post_row(self, parent):
+        """ハッシュタグ検索結果の行ウィジェットを作成（ハッシュタグから再検索できる）"""
+        return PostRow(
+            parent,
+            on_user_click=self.show_user_profile,
+            on_hashtag_click=self.search_hashtags,
+            on_mention_click=self.show_user_by_username
         )
-        time_label.pack(side=tk.RIGHT)
-
-        # 投稿内容（ハッシュタグを青色でクリッカブルに）
-        content_frame = ttk.Frame(post_frame)
-        content_frame.pack(fill=tk.X, pady=5)
-
-        words = post['content'].split()
-        for word in words:
-            if word.startswith('#'):
-                # ハッシュタグの場合
-                label = ttk.Label(
-                    content_frame,
-                    text=word + " ",
-                    font=('Helvetica', 10),
-                    foreground='blue',
-                    cursor="hand2"
-                )
-                label.pack(side=tk.LEFT)
-                # 同じハッシュタグでの再検索が可能に
-                label.bind(
-                    "<Button-1>",
-                    lambda e, tag=word: self.search_hashtags(tag)
-                )
-            else:
-                # 通常のテキスト
-                label = ttk.Label(
-                    content_frame,
-                    text=word + " ",
-                    font=('Helvetica', 10)
-                )
-                label.pack(side=tk.LEFT)
-
-        ttk.Separator(self.result_frame).pack(fill=tk.X, pady=5)
 
     def show_user_profile(self, user_id):
         """ユーザープロフィール表示（画面遷移版）"""
@@ -207,6 +219,23 @@ class SearchView:
         except Exception as e:
             messagebox.showerror("エラー", f"プロフィール表示中にエラーが発生しました: {e}")
 
+    def show_user_by_username(self, mention):
+        """メンション（@ユーザー名）がクリックされたときの処理"""
+        username = mention.lstrip('@')
+
+        def on_user_loaded(user):
+            if user:
+                self.show_user_profile(user['user_id'])
+            else:
+                messagebox.showinfo("情報", f"ユーザー {mention} は見つかりませんでした。")
+
+        self.loader.run(
+            "mention",
+            lambda: self.user_model.get_user_by_username(username),
+            on_user_loaded,
+            on_error=lambda e: messagebox.showerror("エラー", f"ユーザーの取得中にエラーが発生しました: {e}")
+        )
+
     def back_to_timeline(self):
         """タイムラインに戻る"""
         self.frame.destroy()
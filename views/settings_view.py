@@ -6,6 +6,7 @@ import logging
 import secrets
 import string
 from utils.email_sender import EmailSender
+from utils.background import BackgroundLoader
 import os
 
 logger = logging.getLogger(__name__)
@@ -50,6 +51,7 @@ class SettingsView:
             # メインフレーム
             self.frame = ttk.Frame(self.parent, padding="20")
             self.frame.pack(fill=tk.BOTH, expand=True)
+            self.loader = BackgroundLoader(self.frame)
 
             self.create_widgets()
 
@@ -409,27 +411,30 @@ class SettingsView:
             messagebox.showerror("エラー", "パスワードが一致しません。")
             return
 
-        try:
-            # パスワードの更新
-            self.user_model.update_user(
+        # パスワードの更新（bcryptでのハッシュ化はワーカーで実行し、画面を止めない）
+        self.loader.run(
+            "password",
+            lambda: self.user_model.update_user(
                 self.current_user['user_id'],
                 {'password': new_password}
-            )
-            
-            # パスワードフィールドをクリア
-            self.password_entry.delete(0, tk.END)
-            self.confirm_entry.delete(0, tk.END)
-            
-            messagebox.showinfo(
-                "成功",
-                "パスワードを更新しました。"
-            )
-            
-        except Exception as e:
-            messagebox.showerror(
+            ),
+            self.on_password_updated,
+            on_error=lambda e: messagebox.showerror(
                 "エラー",
                 f"パスワードの更新中にエラーが発生しました：\n{str(e)}"
             )
+        )
+
+    def on_password_updated(self, result):
+        """パスワード更新後の処理"""
+        # パスワードフィールドをクリア
+        self.password_entry.delete(0, tk.END)
+        self.confirm_entry.delete(0, tk.END)
+        
+        messagebox.showinfo(
+            "成功",
+            "パスワードを更新しました。"
+        )
 
     def create_email_verification_view(self):
         """メール認証画面の作成"""
@@ -561,12 +566,13 @@ class SettingsView:
 
             # メール送信
             try:
-                logger.debug(f"Sending verification email to: {self.user_details['email']}")
+                logger.debug(f"Queueing verification email to: {self.user_details['email']}")
+                # 送信待ちに登録するだけで、SMTPの送信は送信ワーカーが行う
                 self.email_sender.send_verification_email(
                     self.user_details['email'],
                     verification_code
                 )
-                logger.info("Verification email sent successfully")
+                logger.info("Verification email queued successfully")
 
                 messagebox.showinfo(
                     "送信完了",
@@ -8,9 +8,19 @@ from views.comment_dialog import CommentDialog
 from views.profile_view import ProfileView
 from models.user import User
 from views.search_view import SearchView
+from utils.background import BackgroundLoader
+from utils.query_counter import count_queries
+from views.virtual_list import VirtualList
+from views.post_row import PostRow
+from views.post_view_model import PostViewModelRegistry
+from views.toast import show_toast
+from utils.post_text import tokenize_content
 import logging
 
 class TimelineView:
+    # 1ページあたりに読み込む投稿数
+    PAGE_SIZE = 20
+
     def __init__(self, parent, session_manager, app):
         self.parent = parent
         self.session_manager = session_manager
@@ -20,6 +30,13 @@ class TimelineView:
         self.comment_model = Comment()
         self.app = app
         self.current_user = self.session_manager.get_current_user()
+
+        # タイムラインのページング状態
+        self.next_cursor = None
+        self.load_more_button = None
+
+        # 表示中の投稿のいいね数・コメント数（post_id ごと）
+        self.post_models = PostViewModelRegistry()
         
         # スタイル設定
         self.style = ttk.Style()
@@ -38,6 +55,7 @@ class TimelineView:
         # メインフレーム
         self.frame = ttk.Frame(self.parent, padding="20")
         self.frame.pack(fill=tk.BOTH, expand=True)
+        self.loader = BackgroundLoader(self.frame)
 
         # 左のナビゲーションバー
         self.create_navigation_bar()
@@ -48,12 +66,9 @@ class TimelineView:
         # 投稿フォーム
         self.create_post_form()
 
-        # タイムライン表示エリア
+        # タイムライン表示エリア（初期投稿の読み込みを含む）
         self.create_timeline_area()
 
-        # 初期投稿の読み込み
-        self.load_posts()
-
     def create_navigation_bar(self):
         nav_frame = ttk.Frame(self.frame, style="Nav.TFrame")
         nav_frame.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 20))
@@ -70,6 +85,10 @@ class TimelineView:
         search_button = ttk.Button(nav_frame, text="🔍", command=self.show_search, width=3)
         search_button.pack(pady=(10, 20))
 
+        # ハッシュタグ・トレンドアイコン
+        hashtag_button = ttk.Button(nav_frame, text="#", command=self.show_hashtag_search, width=3)
+        hashtag_button.pack(pady=(10, 20))
+
         # 設定アイコン（新規追加）
         settings_button = ttk.Button(nav_frame, text="⚙️", command=self.show_settings, width=3)
         settings_button.pack(pady=(10, 20))
@@ -164,230 +183,138 @@ class TimelineView:
         post_btn.pack(side=tk.RIGHT)
 
     def create_timeline_area(self):
-        """タイムライン表示エリアの作成（エラー修正版）"""
-        # スクロール可能なタイムラインエリア
+        """タイムライン表示エリアの作成（表示範囲付近の投稿だけを描画する）"""
         timeline_frame = ttk.LabelFrame(self.frame, text="フォロー中", padding="10")
         timeline_frame.pack(fill=tk.BOTH, expand=True)
 
-        # スクロール可能な領域
-        self.canvas = tk.Canvas(timeline_frame)
-        scrollbar = ttk.Scrollbar(timeline_frame, orient="vertical", command=self.canvas.yview)
-        self.posts_frame = ttk.Frame(self.canvas)
-
-        # スクロールバーの設定
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-        
-        # マウスホイールでのスクロールを有効化
-        def _on_mousewheel(event):
-            self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        
-        # マウスホイールイベントのバインド
-        self.canvas.bind_all("<MouseWheel>", _on_mousewheel)
-        
-        # キャンバスが非表示になった時にマウスホイールバインドを解除
-        def _unbind_mousewheel(event):
-            self.canvas.unbind_all("<MouseWheel>")
-        self.canvas.bind("<Unmap>", _unbind_mousewheel)
-
-        # スクロール領域の設定
-        def _configure_frame(event):
-            # キャンバスのスクロール範囲を設定
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-
-        self.posts_frame.bind("<Configure>", _configure_frame)
-        
-        # キャンバス内に投稿フレームを配置
-        self.canvas.create_window((0, 0), window=self.posts_frame, anchor="nw")
-
-        # キャンバスのサイズ変更時の処理
-        def _on_canvas_configure(event):
-            # 投稿フレームの幅をキャンバスの幅に合わせる
-            self.canvas.itemconfig(
-                self.canvas.find_withtag("all")[0],
-                width=event.width
-            )
-        self.canvas.bind("<Configure>", _on_canvas_configure)
-
-        # レイアウト
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.post_list = VirtualList(timeline_frame, create_row=self.create_post_row)
+        self.post_list.pack(fill=tk.BOTH, expand=True)
 
         # 投稿の読み込み
         self.load_posts()
 
+    @count_queries()
     def load_posts(self):
-        """投稿の読み込みと表示"""
-        try:
-            # 既存のウィジェットをクリア
-            for widget in self.posts_frame.winfo_children():
-                widget.destroy()
-
-            # フォロー中と自分の投稿を取得
-            posts = self.post_model.get_timeline_posts(self.current_user['user_id'])
-            
-            if not posts:
-                no_posts_label = ttk.Label(
-                    self.posts_frame,
-                    text="まだ投稿がありません。\n新しい投稿を作成するか、ユーザーをフォローしてみましょう！",
-                    font=('Helvetica', 10),
-                    justify=tk.CENTER
-                )
-                no_posts_label.pack(pady=20)
-                
-                # ユーザー検索ボタンの追加
-                search_button = ttk.Button(
-                    self.posts_frame,
-                    text="ユーザーを探す",
-                    command=self.show_search_view
-                )
-                search_button.pack(pady=10)
-            else:
-                for post in posts:
-                    self.create_post_widget(post)
-
-        except Exception as e:
-            logging.error(f"Error loading posts: {e}")
-            messagebox.showerror("エラー", f"投稿の読み込み中にエラーが発生しました: {e}")
-
-    def create_post_widget(self, post):
-        """投稿の表示ウィジェットを作成（中央寄せ改良版）"""
-        # 外側のコンテナ（中央寄せ用）
-        outer_container = ttk.Frame(self.posts_frame)
-        outer_container.pack(fill=tk.X, pady=5)
-        
-        # 中央寄せ用のフレーム
-        centering_frame = ttk.Frame(outer_container)
-        centering_frame.pack(pady=5)
-
-        # 投稿コンテナ（固定幅で中央寄せ）
-        post_container = ttk.Frame(centering_frame)
-        post_container.pack(pady=5, padx=100)  # 左右のパディングで中央寄せ効果を作成
-        
-        # 投稿の最大幅を設定
-        max_width = 600  # 投稿の最大幅を設定
-        
-        # 上部の区切り線
-        ttk.Separator(post_container, orient="horizontal").pack(fill=tk.X)
-
-        # 投稿本体のフレーム
-        post_frame = ttk.Frame(post_container, style="Post.TFrame", width=max_width)
-        post_frame.pack(fill=tk.X, padx=20, pady=10)
-        
-        # 投稿の内容が最大幅を超えないように設定
-        post_frame.pack_propagate(False)
-        post_frame.configure(height=150)  # 適切な高さを設定
-
-        # ヘッダー部分（ユーザー情報と時間）
-        header_frame = ttk.Frame(post_frame, style="PostHeader.TFrame")
-        header_frame.pack(fill=tk.X, pady=5)
-
-        # ユーザー名と時間の表示
-        username_label = ttk.Label(
-            header_frame,
-            text=post['username'],
-            font=('Helvetica', 11, 'bold'),
-            cursor="hand2"
-        )
-        username_label.pack(side=tk.LEFT)
-        username_label.bind(
-            "<Button-1>",
-            lambda e, user_id=post['user_id']: self.show_user_profile(user_id)
+        """投稿の読み込みと表示（最初のページ、DB処理はワーカースレッドで実行）"""
+        # 既存の表示をクリア
+        self.post_list.clear()
+        self.load_more_button = None
+        self.next_cursor = None
+
+        # フォロー中と自分の投稿を取得
+        self.loader.run(
+            "timeline",
+            self.fetch_timeline_page,
+            self.on_posts_loaded,
+            on_error=self.on_posts_load_error,
+            loading_parent=self.post_list.footer
         )
 
-        time_label = ttk.Label(
-            header_frame,
-            text=post['created_at'].strftime("%Y-%m-%d %H:%M"),
-            font=('Helvetica', 9),
-            foreground='gray'
-        )
-        time_label.pack(side=tk.RIGHT)
-
-        # 投稿内容フレーム
-        content_frame = ttk.Frame(post_frame)
-        content_frame.pack(fill=tk.X, pady=10)
-
-        # 投稿内容を単語単位で分割して処理
-        content = post['content']
-        words = content.split()
-        current_line_frame = ttk.Frame(content_frame)
-        current_line_frame.pack(fill=tk.X)
-        
-        line_width = 0
-        text_max_width = max_width - 40  # 左右のパディングを考慮
-
-        for word in words:
-            # 単語の推定幅
-            word_width = len(word) * 7
-
-            # 新しい行が必要かチェック
-            if line_width + word_width > text_max_width:
-                current_line_frame = ttk.Frame(content_frame)
-                current_line_frame.pack(fill=tk.X)
-                line_width = 0
-
-            # ハッシュタグかどうかで分岐
-            if word.startswith('#'):
-                word_label = ttk.Label(
-                    current_line_frame,
-                    text=word,
-                    font=('Helvetica', 10),
-                    foreground='blue',
-                    cursor="hand2"
-                )
-                word_label.bind(
-                    "<Button-1>",
-                    lambda e, tag=word: self.search_hashtag(tag)
-                )
-            else:
-                word_label = ttk.Label(
-                    current_line_frame,
-                    text=word,
-                    font=('Helvetica', 10)
-                )
+    def on_posts_loaded(self, page):
+        """最初のページの投稿を表示"""
+        posts = page['posts']
+        if not posts:
+            no_posts_label = ttk.Label(
+                self.post_list.footer,
+                text="まだ投稿がありません。\n新しい投稿を作成するか、ユーザーをフォローしてみましょう！",
+                font=('Helvetica', 10),
+                justify=tk.CENTER
+            )
+            no_posts_label.pack(pady=20)
             
-            word_label.pack(side=tk.LEFT, padx=(0, 3))
-            line_width += word_width
-
-        # アクションボタンフレーム
-        actions_frame = ttk.Frame(post_frame)
-        actions_frame.pack(fill=tk.X, pady=5)
-
-        # いいねボタン
-        like_count = self.like_model.get_like_count(post['post_id'])
-        like_button = ttk.Button(
-            actions_frame,
-            text=f"❤ {like_count}",
-            command=lambda: self.toggle_like(post),
-            width=10
-        )
-        like_button.pack(side=tk.LEFT, padx=5)
-
-        # コメントボタン
-        comment_count = self.comment_model.get_comment_count(post['post_id'])
-        comment_button = ttk.Button(
-            actions_frame,
-            text=f"💬 {comment_count}",
-            command=lambda: self.show_comments(post['post_id']),
-            width=12
+            # ユーザー検索ボタンの追加
+            search_button = ttk.Button(
+                self.post_list.footer,
+                text="ユーザーを探す",
+                command=self.show_search_view
+            )
+            search_button.pack(pady=10)
+        else:
+            self.post_models.refresh(posts)
+            self.post_list.set_items(posts)
+        self.update_load_more_button(page['next_cursor'])
+
+    def on_posts_load_error(self, error):
+        logging.error(f"Error loading posts: {error}")
+        messagebox.showerror("エラー", f"投稿の読み込み中にエラーが発生しました: {error}")
+
+    def load_more_posts(self):
+        """次のページの投稿を読み込んで末尾に追加"""
+        if not self.next_cursor:
+            return
+        cursor = self.next_cursor
+        # 読み込み中は二重クリックを防ぐためボタンを削除
+        self.update_load_more_button(None)
+        self.loader.run(
+            "timeline",
+            lambda: self.fetch_timeline_page(cursor),
+            self.on_more_posts_loaded,
+            on_error=self.on_posts_load_error,
+            loading_parent=self.post_list.footer
         )
-        comment_button.pack(side=tk.LEFT, padx=5)
 
-        # 下部の区切り線
-        ttk.Separator(post_container, orient="horizontal").pack(fill=tk.X)
-    
-        
+    def fetch_timeline_page(self, cursor=None):
+        """タイムラインの1ページと、各投稿にいいね済みかどうかを取得（ワーカースレッドで実行）"""
+        user_id = self.current_user['user_id']
+        page = self.post_model.get_timeline_page(user_id, cursor=cursor, limit=self.PAGE_SIZE)
+        self.like_model.mark_liked(user_id, page['posts'])
+        return page
+
+    def on_more_posts_loaded(self, page):
+        """次のページの投稿を末尾に追加"""
+        self.post_models.refresh(page['posts'])
+        self.post_list.append_items(page['posts'])
+        self.update_load_more_button(page['next_cursor'])
+
+    def update_load_more_button(self, next_cursor):
+        """「さらに読み込む」ボタンの表示を次ページの有無に合わせる"""
+        self.next_cursor = next_cursor
+        if self.load_more_button is not None:
+            self.load_more_button.destroy()
+            self.load_more_button = None
+        if next_cursor:
+            self.load_more_button = ttk.Button(
+                self.post_list.footer,
+                text="さらに読み込む",
+                command=self.load_more_posts
+            )
+            self.load_more_button.pack(pady=10)
+
+    def create_post_row(self, parent):
+        """投稿の行ウィジェットを作成（表示内容は VirtualList が差し替える）"""
+        return PostRow(
+            parent,
+            on_user_click=self.show_user_profile,
+            on_hashtag_click=self.search_hashtag,
+            on_mention_click=self.show_user_by_username,
+            on_like=self.toggle_like,
+            on_comment=self.show_comments,
+            registry=self.post_models
+        )
 
     def toggle_like(self, post):
-        """いいねの切り替え"""
-        try:
-            user = self.session_manager.get_current_user()
-            if self.like_model.toggle_like(user['user_id'], post['post_id']):
-                messagebox.showinfo("成功", "いいねしました！")
-            else:
-                messagebox.showinfo("成功", "いいねを取り消しました！")
-            self.refresh_timeline()
-        except Exception as e:
-            messagebox.showerror("エラー", f"いいねの処理中にエラーが発生しました: {e}")
+        """いいねの切り替え（表示を先に更新し、DBへの書き込みに失敗したら元に戻す）"""
+        model = self.post_models.get(post)
+        if model.like_pending:
+            return  # 前回の切り替えの結果待ち
+        user_id = self.current_user['user_id']
+        post_id = post['post_id']
+        previous = model.begin_like()
+
+        def on_success(liked):
+            model.finish_like(liked, previous)
+            show_toast(self.frame, "いいねしました！" if liked else "いいねを取り消しました！")
+
+        def on_error(error):
+            model.rollback_like(previous)
+            show_toast(self.frame, f"いいねの処理中にエラーが発生しました: {error}", error=True)
+
+        self.loader.run(
+            f"like:{post_id}",
+            lambda: self.like_model.toggle_like(user_id, post_id),
+            on_success,
+            on_error=on_error
+        )
 
     def show_comments(self, post_id):
         """コメントダイアログの表示"""
@@ -396,7 +323,8 @@ class TimelineView:
                 self.parent, 
                 post_id, 
                 self.session_manager,
-                refresh_callback=self.refresh_timeline  # タイムライン更新用のコールバックを渡す
+                view_model=self.post_models.find(post_id),  # コメント数をその投稿だけ更新する
+                loader=self.loader
             )
             comment_dialog.grab_set()  # モーダルダイアログとして表示
         except Exception as e:
@@ -404,9 +332,6 @@ class TimelineView:
 
     def refresh_timeline(self):
         """タイムラインの更新"""
-        # 投稿フレームをクリアして再作成
-        for widget in self.posts_frame.winfo_children():
-            widget.destroy()
         self.load_posts()
 
     def on_post(self):
@@ -479,6 +404,23 @@ class TimelineView:
         except Exception as e:
             messagebox.showerror("エラー", f"ユーザープロフィール画面の表示中にエラーが発生しました: {e}")
 
+    def show_user_by_username(self, mention):
+        """メンション（@ユーザー名）がクリックされたときの処理"""
+        username = mention.lstrip('@')
+
+        def on_user_loaded(user):
+            if user:
+                self.show_user_profile(user['user_id'])
+            else:
+                messagebox.showinfo("情報", f"ユーザー {mention} は見つかりませんでした。")
+
+        self.loader.run(
+            "mention",
+            lambda: self.user_model.get_user_by_username(username),
+            on_user_loaded,
+            on_error=lambda e: messagebox.showerror("エラー", f"ユーザーの取得中にエラーが発生しました: {e}")
+        )
+
     def show_timeline(self):
         """タイムライン画面の表示"""
         try:
@@ -501,6 +443,16 @@ class TimelineView:
         except Exception as e:
             messagebox.showerror("エラー", f"検索画面の表示中にエラーが発生しました: {e}")
 
+    def show_hashtag_search(self):
+        """ハッシュタグ検索・トレンド画面の表示"""
+        try:
+            from views.hashtag_search_view import HashtagSearchView  # 遅延インポート
+            for widget in self.parent.winfo_children():
+                widget.destroy()
+            HashtagSearchView(self.parent, self.session_manager, self.app)
+        except Exception as e:
+            messagebox.showerror("エラー", f"ハッシュタグ画面の表示中にエラーが発生しました: {e}")
+
     def show(self):
         self.frame.pack(fill=tk.BOTH, expand=True)
     
@@ -525,25 +477,12 @@ class TimelineView:
         # 既存のハッシュタグ強調表示をクリア
         self.post_text.tag_remove("hashtag", "1.0", tk.END)
 
-        # テキスト全体を取得
-        content = self.post_text.get("1.0", tk.END)
-        
-        # 単語単位で処理
-        start = "1.0"
-        for word in content.split():
-            if word.startswith('#'):
-                # ハッシュタグの位置を検索
-                pos = self.post_text.search(word, start, tk.END)
-                if pos:
-                    # ハッシュタグの終わりの位置を計算
-                    end = f"{pos}+{len(word)}c"
-                    # タグを適用
-                    self.post_text.tag_add("hashtag", pos, end)
-            if word:
-                # 次の検索開始位置を更新
-                start = self.post_text.search(word, start, tk.END)
-                if start:
-                    start = f"{start}+{len(word)}c"
+        # 表示時と同じ規則で分割し、ハッシュタグの位置にタグを適用
+        offset = 0
+        for text, kind in tokenize_content(self.post_text.get("1.0", "end-1c")):
+            if kind == 'hashtag':
+                self.post_text.tag_add("hashtag", f"1.0+{offset}c", f"1.0+{offset + len(text)}c")
+            offset += len(text)
                     
     def show_settings(self):
         """設定画面への遷移"""
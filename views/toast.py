@@ -0,0 +1,37 @@
+import tkinter as tk
+
+# ウィンドウごとに表示中のトースト
+_toasts = {}
+
+
+def show_toast(widget, message, duration_ms=2000, error=False):
+    """ウィンドウ下部にメッセージを一定時間だけ表示（messagebox と違い操作をブロックしない）"""
+    toplevel = widget.winfo_toplevel()
+    key = str(toplevel)
+
+    # 前のトーストは置き換える
+    previous = _toasts.pop(key, None)
+    if previous is not None:
+        previous.destroy()
+
+    toast = tk.Label(
+        toplevel,
+        text=message,
+        background="#b00020" if error else "#333333",
+        foreground="white",
+        font=('Helvetica', 10),
+        padx=16,
+        pady=8
+    )
+    toast.place(relx=0.5, rely=1.0, anchor="s", y=-30)
+    toast.lift()
+    _toasts[key] = toast
+
+    def hide():
+        if _toasts.get(key) is toast:
+            del _toasts[key]
+        toast.destroy()
+
+    # トーストは置き換えで先に破棄されることがあるため、タイマーはウィンドウ側に登録する
+    toplevel.after(duration_ms, hide)
+    return toast
@@ -0,0 +1,191 @@
+import tkinter as tk
+from tkinter import ttk
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+
+class VirtualList(ttk.Frame):
+    """表示範囲付近の行だけウィジェットを作り、スクロールに合わせて使い回すリスト
+
+    行は create_row(parent) で作成する。戻り値は行のルートウィジェット frame と
+    表示内容を差し替える update(item) を持つオブジェクトとする。
+    行の高さは表示後に実測し（未表示の行は推定値）、累積和からスクロール位置を求める。
+    行の後ろには footer フレームがあり、空表示・読み込み中・「さらに読み込む」などを置ける。
+    """
+
+    def __init__(self, parent, create_row, estimated_row_height=150, overscan=2, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.create_row = create_row
+        self.estimated_row_height = estimated_row_height
+        self.overscan = overscan
+
+        self.items = []
+        self._heights = []
+        self._offsets = [0]        # 各行の上端のy座標（要素数は行数 + 1）
+        self._offsets_dirty = False
+        self._visible = {}         # 行番号 -> (行, キャンバスのウィンドウID)
+        self._row_index = {}       # 行 -> 表示中の行番号（プール内はNone）
+        self._pool = []            # 再利用待ちの (行, ウィンドウID)
+        self._scrollregion = None
+        self._update_pending = False
+
+        # スクロール可能な領域
+        self.canvas = tk.Canvas(self, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # 行の後ろに置くフッター
+        self.footer = ttk.Frame(self.canvas)
+        self._footer_window = self.canvas.create_window(0, 0, window=self.footer, anchor="nw")
+        self.footer.bind("<Configure>", lambda e: self._schedule_update())
+
+        self.canvas.bind("<Configure>", self._on_canvas_configure)
+
+        # マウスホイールはポインタが乗っているリストでのみ有効にする
+        self.bind("<Enter>", self._bind_mousewheel)
+        self.canvas.bind("<Enter>", self._bind_mousewheel)
+
+    # ---- 公開API ----
+
+    def set_items(self, items):
+        """表示する項目を差し替えて先頭までスクロール"""
+        for index in list(self._visible):
+            self._release(index)
+        self.items = list(items)
+        self._heights = [self.estimated_row_height] * len(self.items)
+        self._offsets_dirty = True
+        self.canvas.yview_moveto(0)
+        self._schedule_update()
+
+    def append_items(self, items):
+        """項目を末尾に追加"""
+        items = list(items)
+        self.items.extend(items)
+        self._heights.extend([self.estimated_row_height] * len(items))
+        self._offsets_dirty = True
+        self._schedule_update()
+
+    def update_item(self, index, item):
+        """項目を差し替え、表示中なら行を更新"""
+        self.items[index] = item
+        if index in self._visible:
+            row, _ = self._visible[index]
+            row.update(item)
+
+    def clear(self):
+        """項目とフッターの中身をすべて消す"""
+        self.clear_footer()
+        self.set_items([])
+
+    def clear_footer(self):
+        for widget in self.footer.winfo_children():
+            widget.destroy()
+
+    # ---- 内部処理 ----
+
+    def _schedule_update(self):
+        if not self._update_pending:
+            self._update_pending = True
+            self.after_idle(self._update_visible)
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._schedule_update()
+
+    def _on_canvas_configure(self, event):
+        # 行とフッターの幅をキャンバスの幅に合わせる
+        for _, window in self._visible.values():
+            self.canvas.itemconfigure(window, width=event.width)
+        for _, window in self._pool:
+            self.canvas.itemconfigure(window, width=event.width)
+        self.canvas.itemconfigure(self._footer_window, width=event.width)
+        self._schedule_update()
+
+    def _on_row_configure(self, row, height):
+        """行の実際の高さを記録し、後続の行の位置を更新する"""
+        index = self._row_index.get(row)
+        if index is None or index >= len(self._heights):
+            return
+        if self._heights[index] != height:
+            self._heights[index] = height
+            self._offsets_dirty = True
+            self._schedule_update()
+
+    def _acquire(self, index):
+        """プールから行を取り出す（なければ作成）"""
+        if self._pool:
+            row, window = self._pool.pop()
+            self.canvas.itemconfigure(window, state="normal")
+        else:
+            row = self.create_row(self.canvas)
+            window = self.canvas.create_window(
+                0, 0, window=row.frame, anchor="nw", width=self.canvas.winfo_width()
+            )
+            row.frame.bind("<Configure>", lambda e, r=row: self._on_row_configure(r, e.height))
+            row.frame.bind("<Enter>", self._bind_mousewheel)
+        self._row_index[row] = index
+        self._visible[index] = (row, window)
+        row.update(self.items[index])
+        return row, window
+
+    def _release(self, index):
+        """表示範囲外の行をプールに戻す"""
+        row, window = self._visible.pop(index)
+        self.canvas.itemconfigure(window, state="hidden")
+        self._row_index[row] = None
+        self._pool.append((row, window))
+
+    def _update_visible(self):
+        """表示範囲付近の行だけを配置する"""
+        self._update_pending = False
+        if not self.winfo_exists():
+            return
+        if self._offsets_dirty:
+            self._offsets = [0] + list(accumulate(self._heights))
+            self._offsets_dirty = False
+
+        count = len(self.items)
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        if count:
+            first = max(0, bisect_right(self._offsets, top) - 1 - self.overscan)
+            last = min(count - 1, bisect_left(self._offsets, bottom) + self.overscan)
+            wanted = range(first, last + 1)
+        else:
+            wanted = range(0)
+
+        for index in [i for i in self._visible if i not in wanted]:
+            self._release(index)
+        for index in wanted:
+            if index not in self._visible:
+                self._acquire(index)
+            _, window = self._visible[index]
+            self.canvas.coords(window, 0, self._offsets[index])
+
+        # フッターは最後の行の後ろ
+        total_height = self._offsets[count]
+        self.canvas.coords(self._footer_window, 0, total_height)
+        scrollregion = (0, 0, self.canvas.winfo_width(), total_height + self.footer.winfo_reqheight())
+        if scrollregion != self._scrollregion:
+            self._scrollregion = scrollregion
+            self.canvas.configure(scrollregion=scrollregion)
+
+    def _bind_mousewheel(self, event):
+        self.bind_all("<MouseWheel>", self._on_mousewheel)
+        self.bind_all("<Button-4>", self._on_mousewheel)
+        self.bind_all("<Button-5>", self._on_mousewheel)
+
+    def _on_mousewheel(self, event):
+        # ポインタがこのリストの上にない場合は無視
+        widget = self.winfo_containing(event.x_root, event.y_root)
+        if widget is None or not str(widget).startswith(str(self)):
+            return
+        if event.num == 4:
+            delta = -1
+        elif event.num == 5:
+            delta = 1
+        else:
+            delta = int(-1 * (event.delta / 120))
+        self.canvas.yview_scroll(delta, "units")